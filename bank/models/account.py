@@ -1,28 +1,97 @@
 # bank/models/account.py
 from __future__ import annotations
 from datetime import datetime
-from decimal import Decimal
-from typing import List
+from typing import List, Optional, Tuple
 
-from bank.models.transaction import Transaction
+from bank.models.balance_index import FenwickBalanceIndex
+from bank.models.ledger import TransactionLedger, day_month_key, month_first_day
+from bank.models.money import Money
+from bank.models.transaction import TRANSACTION_TYPES, Transaction
 
 class BankAccount:
-    def __init__(self, account_id: str):
+    def __init__(self, account_id: str, indexed_balances: bool = False):
         self.account_id = account_id
-        self.transactions: List[Transaction] = []
-        self.balance = Decimal('0')
+        self.ledger = TransactionLedger(account_id)
+        self.balance = Money(0)
+        self.balance_index = FenwickBalanceIndex() if indexed_balances else None
+        self.closed_through: Optional[int] = None  # month key of the latest closed month
+    
+    @classmethod
+    def from_ledger(cls, ledger: TransactionLedger, balance: Money,
+                    indexed_balances: bool = False,
+                    closed_through: Optional[int] = None) -> BankAccount:
+        """Wraps an already populated ledger, e.g. one loaded from a snapshot"""
+        account = cls(ledger.account_id, indexed_balances)
+        account.ledger = ledger
+        account.balance = balance
+        account.closed_through = closed_through
+        account._index_balances()
+        return account
+    
+    @property
+    def transactions(self) -> TransactionLedger:
+        return self.ledger
     
     def add_transaction(self, transaction: 'Transaction'):
-        self.balance = transaction.apply(self.balance)
-        self.transactions.append(transaction)
+        day = transaction.date.toordinal()
+        if self.closed_through is not None and day_month_key(day) <= self.closed_through:
+            raise ValueError("Month is closed")
+        balance = transaction.apply(self.balance)
+        self.ledger.insert(transaction)
+        self.balance = balance
+        if self.balance_index is not None:
+            self.balance_index.add(day, transaction.signed_cents)
+    
+    def add_entry(self, day: int, code: int, cents: int, sequence: int):
+        """Adds an already validated entry given as ledger columns"""
+        delta = TRANSACTION_TYPES[code].sign * cents
+        self.ledger.insert_entry(day, code, cents, sequence)
+        self.balance = Money(self.balance.cents + delta)
+        if self.balance_index is not None:
+            self.balance_index.add(day, delta)
+
+    def close_through(self, key: int):
+        """Closes every month up to the keyed one to new transactions"""
+        if self.closed_through is None or key > self.closed_through:
+            self.closed_through = key
+    
+    @property
+    def archived_through(self) -> Optional[int]:
+        """Month key of the last month compacted into a balance-forward entry"""
+        return self.ledger.archived_through()
+    
+    def compact(self, through_key: int) -> List[Tuple[int, int, int, int]]:
+        """Folds the entries of closed months up to through_key into one balance-forward entry"""
+        if self.closed_through is None or through_key > self.closed_through:
+            raise ValueError("Only closed months can be compacted")
+        removed = self.ledger.compact_through(month_first_day(through_key + 1) - 1)
+        if removed:
+            self._index_balances()
+        return removed
     
     def get_transactions_for_month(self, year: int, month: int) -> List[Transaction]:
-        return [t for t in self.transactions 
-                if t.date.year == year and t.date.month == month]
-    
-    def calculate_balance_up_to(self, date: datetime) -> Decimal:
-        balance = Decimal('0')
-        for transaction in sorted(self.transactions, key=lambda t: t.date):
-            if transaction.date <= date:
-                balance = transaction.apply(balance)
-        return balance
\ No newline at end of file
+        return self.ledger.month_slice(year, month)
+    
+    def get_transactions_between(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+        return self.ledger.range_slice(start_date, end_date)
+    
+    def get_movements_for_month(self, year: int, month: int) -> List[Tuple[int, int]]:
+        return self.ledger.movements(*self.ledger.month_bounds(year, month))
+    
+    def get_movements_between(self, start_date: datetime, end_date: datetime) -> List[Tuple[int, int]]:
+        return self.ledger.movements(*self.ledger.range_bounds(start_date, end_date))
+    
+    def count_transactions_on(self, date: datetime) -> int:
+        return self.ledger.count_on_day(date)
+    
+    def get_month_end_balance(self, year: int, month: int) -> Money:
+        return self.ledger.month_end_balance(year, month)
+    
+    def calculate_balance_up_to(self, date: datetime) -> Money:
+        return self.ledger.balance_up_to(date)
+    
+    def _index_balances(self):
+        if self.balance_index is not None:
+            self.balance_index = FenwickBalanceIndex()
+            for day, delta in self.ledger.movements(0, len(self.ledger)):
+                self.balance_index.add(day, delta)
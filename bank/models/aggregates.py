@@ -0,0 +1,130 @@
+# bank/models/aggregates.py
+from __future__ import annotations
+import threading
+from bisect import bisect_left, insort
+from typing import Dict, List, Optional, Tuple
+
+from bank.models.transaction import TRANSACTION_TYPES, BalanceForward, Interest, InterestReversal
+from bank.utils.date_utils import day_month_key
+
+INTEREST_CODES = (Interest.code, InterestReversal.code)
+
+class RankedIndex:
+    """Integer values per key, ordered from the largest for threshold and top-N queries.
+
+    Updates are O(1): a changed key is only moved in the ordering by the
+    next query, by bisection, and a query finding many moved keys re-sorts
+    everything instead. Queries are then O(log n) plus the keys returned.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, int] = {}
+        self._order: List[Tuple[int, str]] = []  # (-value, key), ascending
+        # Keys changed since the last query -> value they are ordered under (None if unordered)
+        self._moved: Dict[str, Optional[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def get(self, key: str) -> int:
+        return self._values.get(key, 0)
+
+    def add(self, key: str, delta: int):
+        old = self._values.get(key)
+        if key not in self._moved:
+            self._moved[key] = old
+        self._values[key] = (old or 0) + delta
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        """Returns the n largest (key, value) pairs, largest first"""
+        self._settle()
+        return [(key, -value) for value, key in self._order[:max(n, 0)]]
+
+    def above(self, threshold: int) -> List[Tuple[str, int]]:
+        """Returns the (key, value) pairs with a value over threshold, largest first"""
+        self._settle()
+        end = bisect_left(self._order, (-threshold,))
+        return [(key, -value) for value, key in self._order[:end]]
+
+    def _settle(self):
+        if not self._moved:
+            return
+        if len(self._moved) * 8 > len(self._order):
+            self._order = sorted((-value, key) for key, value in self._values.items())
+        else:
+            for key, ordered in self._moved.items():
+                if ordered is not None:
+                    del self._order[bisect_left(self._order, (-ordered, key))]
+                insort(self._order, (-self._values[key], key))
+        self._moved.clear()
+
+class BankAggregates:
+    """Bank-wide totals kept up to date as entries are posted.
+
+    Holds per-month totals in cents for each transaction type, account
+    balances and interest paid per account in ranked indexes, and the
+    month-end interest attributed to each rule. Balance-forward entries
+    only move balances. Updates and queries take the aggregates' own lock,
+    so account operations on different stripes can share it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._month_totals: Dict[int, List[int]] = {}
+        self._balances = RankedIndex()
+        self._interest_paid = RankedIndex()
+        self._rule_interest: Dict[str, int] = {}
+
+    def add_account(self, account_id: str, balance: int = 0):
+        with self._lock:
+            self._balances.add(account_id, balance)
+
+    def add_entry(self, account_id: str, day: int, code: int, cents: int):
+        """Records a ledger entry given as an unsigned amount in cents"""
+        with self._lock:
+            self._count_entry(account_id, day, code, cents)
+            self._balances.add(account_id, TRANSACTION_TYPES[code].sign * cents)
+
+    def add_history(self, account_id: str, balance: int, entries: List[Tuple[int, int, int]]):
+        """Records an existing account's balance and its (day, code, cents) entries"""
+        with self._lock:
+            self._balances.add(account_id, balance)
+            for day, code, cents in entries:
+                self._count_entry(account_id, day, code, cents)
+
+    def add_rule_interest(self, shares: Dict[str, int]):
+        """Adds signed month-end interest in cents to each rule"""
+        with self._lock:
+            for rule_id, cents in shares.items():
+                self._rule_interest[rule_id] = self._rule_interest.get(rule_id, 0) + cents
+
+    def month_totals(self, key: int) -> List[int]:
+        """Returns the keyed month's total in cents per transaction type code"""
+        with self._lock:
+            return list(self._month_totals.get(key, [0] * len(TRANSACTION_TYPES)))
+
+    def rule_interest(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._rule_interest)
+
+    def top_balances(self, n: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._balances.top(n)
+
+    def balances_above(self, cents: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._balances.above(cents)
+
+    def top_interest_paid(self, n: int) -> List[Tuple[str, int]]:
+        with self._lock:
+            return self._interest_paid.top(n)
+
+    def _count_entry(self, account_id: str, day: int, code: int, cents: int):
+        if code == BalanceForward.code:
+            return
+        totals = self._month_totals.get(day_month_key(day))
+        if totals is None:
+            totals = self._month_totals[day_month_key(day)] = [0] * len(TRANSACTION_TYPES)
+        totals[code] += cents
+        if code in INTEREST_CODES:
+            self._interest_paid.add(account_id, TRANSACTION_TYPES[code].sign * cents)
@@ -0,0 +1,82 @@
+# bank/models/balance_index.py
+from __future__ import annotations
+from typing import List
+
+class FenwickBalanceIndex:
+    """Day-indexed prefix sums of balance deltas and delta x day, in cents.
+
+    Two Fenwick trees over day offsets answer the balance on a day and the
+    sum of daily closing balances over a date range in O(log n). The tree
+    re-bases and grows when a day falls outside the covered window.
+    """
+
+    def __init__(self):
+        self._base = 0  # day ordinal stored at position 1
+        self._size = 0
+        self._deltas: List[int] = [0]
+        self._weighted: List[int] = [0]
+
+    def add(self, day: int, delta: int):
+        """Records a balance change in cents effective from the given day ordinal"""
+        if self._size == 0 or not self._base <= day < self._base + self._size:
+            self._rebase(day)
+        position = day - self._base + 1
+        weighted = delta * position
+        while position <= self._size:
+            self._deltas[position] += delta
+            self._weighted[position] += weighted
+            position += position & -position
+
+    def balance_on(self, day: int) -> int:
+        """Returns the closing balance in cents of the given day ordinal"""
+        return self._prefix(self._deltas, self._position(day))
+
+    def balance_days(self, start_day: int, end_day: int) -> int:
+        """Returns the sum of daily closing balances in cents over [start_day, end_day]"""
+        if end_day < start_day:
+            return 0
+        return self._balance_days_through(end_day) - self._balance_days_through(start_day - 1)
+
+    def _balance_days_through(self, day: int) -> int:
+        """Sum of daily balances from the first covered day through day"""
+        if self._size == 0 or day < self._base:
+            return 0
+        # sum over entries i <= t of delta_i * (t - i + 1) = (t + 1) * D(t) - W(t)
+        t = day - self._base + 1
+        position = min(t, self._size)
+        return (t + 1) * self._prefix(self._deltas, position) - self._prefix(self._weighted, position)
+
+    def _position(self, day: int) -> int:
+        if self._size == 0 or day < self._base:
+            return 0
+        return min(day - self._base + 1, self._size)
+
+    def _prefix(self, tree: List[int], position: int) -> int:
+        total = 0
+        while position > 0:
+            total += tree[position]
+            position -= position & -position
+        return total
+
+    def _rebase(self, day: int):
+        """Rebuilds the trees over a window that also covers day"""
+        points = []
+        previous = 0
+        for position in range(1, self._size + 1):
+            current = self._prefix(self._deltas, position)
+            if current != previous:
+                points.append((self._base + position - 1, current - previous))
+            previous = current
+
+        low = min([day] + [d for d, _ in points])
+        high = max([day] + [d for d, _ in points])
+        size = 64
+        while size < 2 * (high - low + 1):
+            size *= 2
+        # Leave headroom on both sides so neighbouring days do not re-base again
+        self._base = low - (size - (high - low + 1)) // 4
+        self._size = size
+        self._deltas = [0] * (size + 1)
+        self._weighted = [0] * (size + 1)
+        for point_day, delta in points:
+            self.add(point_day, delta)
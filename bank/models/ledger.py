@@ -0,0 +1,272 @@
+# bank/models/ledger.py
+from __future__ import annotations
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from bank.models.money import MAX_CENTS, Money
+from bank.models.transaction import TRANSACTION_TYPES, BalanceForward, Transaction
+from bank.utils.date_utils import (day_month_key, format_date, format_day, month_first_day,
+                                   month_key)
+
+_SIGNS = tuple(t.sign for t in TRANSACTION_TYPES)
+_MAX_SEQUENCE = (1 << 8 * array('I').itemsize) - 1
+
+def format_transaction_id(day: int, sequence: int) -> str:
+    """Builds the <YYYYMMDD>-<NN> ID of a day's sequence number; 0 means no ID"""
+    if not sequence:
+        return ""
+    return f"{format_day(day)}-{sequence:02d}"
+
+def transaction_sequence(transaction: Transaction) -> int:
+    """Returns the day's sequence number from a canonical <YYYYMMDD>-<NN> ID; 0 for no ID"""
+    if not transaction.transaction_id:
+        return 0
+    prefix, _, number = transaction.transaction_id.rpartition('-')
+    if prefix != format_date(transaction.date) or not number.isdigit():
+        raise ValueError("Transaction ID must be in <Date>-<Sequence> format")
+    return int(number)
+
+class TransactionLedger(Sequence):
+    """Transactions kept in date order as compact columns with month-end checkpoints.
+
+    Each entry is a day ordinal, an unsigned amount in cents, a type code and
+    the day's sequence number, held in array-backed columns (about 25 bytes
+    per entry). Transaction objects are only built when an entry is read.
+    Entries on the same day keep their arrival order. Each entry also carries
+    its month-to-date net movement, and closing balances are checkpointed per
+    month. A back-dated insert only marks its own month for recomputation
+    and drops the checkpoints from that month onward.
+    """
+
+    def __init__(self, account_id: str = ""):
+        self.account_id = account_id
+        self._days = array('i')
+        self._cents = array('q')
+        self._codes = array('b')
+        self._sequences = array('I')
+        self._month_to_date = array('q')  # month net cents after each entry
+        self._stale_months: Set[int] = set()
+        self._month_net: Dict[int, int] = {}
+        self._checkpoints: Dict[int, int] = {}  # month key -> closing balance in cents
+        self._checkpoint_through: Optional[int] = None  # checkpoints valid up to this month key
+
+    def __len__(self) -> int:
+        return len(self._days)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._build(i) for i in range(*index.indices(len(self._days)))]
+        if index < 0:
+            index += len(self._days)
+        if not 0 <= index < len(self._days):
+            raise IndexError("ledger index out of range")
+        return self._build(index)
+
+    def __iter__(self):
+        return (self._build(i) for i in range(len(self._days)))
+
+    @classmethod
+    def from_state(cls, account_id: str, columns: Tuple[array, ...], month_net: Dict[int, int],
+                   checkpoints: Dict[int, int], stale_months: Set[int],
+                   checkpoint_through: Optional[int]) -> TransactionLedger:
+        """Rebuilds a ledger from the pieces returned by export_state"""
+        ledger = cls(account_id)
+        (ledger._days, ledger._cents, ledger._codes, ledger._sequences,
+         ledger._month_to_date) = columns
+        ledger._month_net = month_net
+        ledger._checkpoints = checkpoints
+        ledger._stale_months = stale_months
+        ledger._checkpoint_through = checkpoint_through
+        return ledger
+
+    def export_state(self) -> Tuple:
+        """Returns the columns and checkpoint tables that make up the ledger"""
+        columns = (self._days, self._cents, self._codes, self._sequences, self._month_to_date)
+        return (columns, self._month_net, self._checkpoints, self._stale_months,
+                self._checkpoint_through)
+
+    def copy(self) -> TransactionLedger:
+        """Returns an independent copy; each column is duplicated with a single memcpy"""
+        columns, month_net, checkpoints, stale_months, through = self.export_state()
+        return TransactionLedger.from_state(
+            self.account_id, tuple(column[:] for column in columns), dict(month_net),
+            dict(checkpoints), set(stale_months), through)
+
+    def memory_usage(self) -> int:
+        """Returns the bytes allocated by the entry columns"""
+        columns = (self._days, self._cents, self._codes, self._sequences, self._month_to_date)
+        return sum(column.buffer_info()[1] * column.itemsize for column in columns)
+
+    def insert(self, transaction: Transaction) -> int:
+        """Inserts a transaction after any existing entries on the same day"""
+        return self.insert_entry(transaction.date.toordinal(), transaction.code,
+                                 transaction.amount.cents, transaction_sequence(transaction))
+
+    def insert_entry(self, day: int, code: int, cents: int, sequence: int) -> int:
+        """Inserts an entry given as column values after any entries on the same day"""
+        if not -MAX_CENTS <= cents <= MAX_CENTS:
+            raise ValueError("Amount is out of range")
+        if not 0 <= sequence <= _MAX_SEQUENCE:
+            raise ValueError("Sequence number is out of range")
+        key = day_month_key(day)
+        days = self._days
+        delta = _SIGNS[code] * cents
+
+        if not days or day >= days[-1]:
+            # In-order appends are the common case and need no bisect or shifting
+            index = len(days)
+            month_to_date = 0
+            if key not in self._stale_months:
+                same_month = index > 0 and days[-1] >= month_first_day(key)
+                month_to_date = (self._month_to_date[-1] if same_month else 0) + delta
+                if not -MAX_CENTS <= month_to_date <= MAX_CENTS:
+                    raise ValueError("Month total is out of range")
+            # Every check is done, so the columns cannot be left half-updated
+            self._month_to_date.append(month_to_date)
+            days.append(day)
+            self._cents.append(cents)
+            self._codes.append(code)
+            self._sequences.append(sequence)
+        else:
+            index = bisect_right(days, day)
+            days.insert(index, day)
+            self._cents.insert(index, cents)
+            self._codes.insert(index, code)
+            self._sequences.insert(index, sequence)
+            self._month_to_date.insert(index, 0)
+            self._stale_months.add(key)
+
+        self._month_net[key] = self._month_net.get(key, 0) + delta
+        self.invalidate_from(key)
+        return index
+
+    def invalidate_from(self, key: int):
+        """Drops month-end checkpoints from the keyed month onward"""
+        if self._checkpoint_through is not None and self._checkpoint_through >= key:
+            self._checkpoint_through = key - 1
+
+    def archived_through(self) -> Optional[int]:
+        """Returns the key of the last month folded into a balance-forward entry"""
+        if self._codes and self._codes[0] == BalanceForward.code:
+            return day_month_key(self._days[0])
+        return None
+
+    def compact_through(self, day: int) -> List[Tuple[int, int, int, int]]:
+        """Replaces the entries dated on or before day with one balance-forward entry.
+
+        Returns the removed (day, code, cents, sequence) entries, leaving out
+        any earlier balance-forward entry.
+        """
+        end = bisect_right(self._days, day)
+        removed = [(self._days[i], self._codes[i], self._cents[i], self._sequences[i])
+                   for i in range(end) if self._codes[i] != BalanceForward.code]
+        if not removed:
+            return []
+        closing = sum(_SIGNS[self._codes[i]] * self._cents[i] for i in range(end))
+        self._days = array('i', [day]) + self._days[end:]
+        self._cents = array('q', [closing]) + self._cents[end:]
+        self._codes = array('b', [BalanceForward.code]) + self._codes[end:]
+        self._sequences = array('I', [0]) + self._sequences[end:]
+        self._rebuild_tables()
+        return removed
+
+    def count_on_day(self, date: datetime) -> int:
+        day = date.toordinal()
+        return bisect_right(self._days, day) - bisect_left(self._days, day)
+
+    def month_bounds(self, year: int, month: int) -> Tuple[int, int]:
+        """Returns the [start, end) entry indices of the given month"""
+        key = month_key(year, month)
+        return (bisect_left(self._days, month_first_day(key)),
+                bisect_left(self._days, month_first_day(key + 1)))
+
+    def range_bounds(self, start_date: datetime, end_date: datetime) -> Tuple[int, int]:
+        """Returns the [start, end) entry indices dated within [start_date, end_date]"""
+        return (bisect_left(self._days, start_date.toordinal()),
+                bisect_right(self._days, end_date.toordinal()))
+
+    def month_slice(self, year: int, month: int) -> List[Transaction]:
+        return self[slice(*self.month_bounds(year, month))]
+
+    def range_slice(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+        """Returns the entries dated within [start_date, end_date]"""
+        return self[slice(*self.range_bounds(start_date, end_date))]
+
+    def movements(self, start: int, end: int) -> List[Tuple[int, int]]:
+        """Returns (day ordinal, signed cents) of entries in [start, end) without building objects"""
+        days, cents, codes = self._days, self._cents, self._codes
+        return [(days[i], _SIGNS[codes[i]] * cents[i]) for i in range(start, end)]
+
+    def month_end_balance(self, year: int, month: int) -> Money:
+        """Returns the closing balance of the given month"""
+        return Money(self._closing_balance(month_key(year, month)))
+
+    def balance_up_to(self, date: datetime) -> Money:
+        """Returns the balance after every entry dated on or before date"""
+        key = month_key(date.year, date.month)
+        opening = self._closing_balance(key - 1)
+        start = bisect_left(self._days, month_first_day(key))
+        index = bisect_right(self._days, date.toordinal())
+        if index == start:
+            return Money(opening)
+        self._refresh_month(key, start)
+        return Money(opening + self._month_to_date[index - 1])
+
+    def _build(self, index: int) -> Transaction:
+        day = self._days[index]
+        return TRANSACTION_TYPES[self._codes[index]](
+            self.account_id, datetime.fromordinal(day), Money(self._cents[index]),
+            format_transaction_id(day, self._sequences[index]))
+
+    def _closing_balance(self, key: int) -> int:
+        """Returns the checkpointed closing balance in cents, extending checkpoints as needed"""
+        if not self._days:
+            return 0
+        first_key = day_month_key(self._days[0])
+        if key < first_key:
+            return 0
+
+        through = self._checkpoint_through
+        if through is None or through < first_key:
+            through = first_key - 1
+            balance = 0
+        else:
+            if key <= through:
+                return self._checkpoints[key]
+            balance = self._checkpoints[through]
+
+        for k in range(through + 1, key + 1):
+            balance += self._month_net.get(k, 0)
+            self._checkpoints[k] = balance
+        self._checkpoint_through = key
+        return balance
+
+    def _rebuild_tables(self):
+        """Recomputes month nets and month-to-date nets and drops every checkpoint"""
+        self._month_to_date = array('q', bytes(8 * len(self._days)))
+        self._month_net = {}
+        current, running = None, 0
+        for i, day in enumerate(self._days):
+            key = day_month_key(day)
+            if key != current:
+                current, running = key, 0
+            running += _SIGNS[self._codes[i]] * self._cents[i]
+            self._month_to_date[i] = running
+            self._month_net[key] = running
+        self._stale_months = set()
+        self._checkpoints = {}
+        self._checkpoint_through = None
+
+    def _refresh_month(self, key: int, start: int):
+        """Recomputes month-to-date nets for a month touched by a back-dated insert"""
+        if key not in self._stale_months:
+            return
+        end = bisect_left(self._days, month_first_day(key + 1))
+        running = 0
+        for i in range(start, end):
+            running += _SIGNS[self._codes[i]] * self._cents[i]
+            self._month_to_date[i] = running
+        self._stale_months.discard(key)
@@ -0,0 +1,123 @@
+# bank/models/money.py
+from __future__ import annotations
+from decimal import Context, Decimal, MAX_PREC
+from fractions import Fraction
+from typing import Union
+
+# Converting cents to Decimal must never round, whatever the magnitude
+_EXACT = Context(prec=MAX_PREC)
+# Amounts are stored in int64 ledger columns
+MAX_CENTS = (1 << 63) - 1
+_MAX_UNITS = Decimal(MAX_CENTS).scaleb(-2)
+
+class Money:
+    """Fixed-point amount stored as an integer number of cents.
+
+    Arithmetic between Money values is exact integer arithmetic at any
+    magnitude. Amounts are accepted only in whole cents; computed values
+    such as interest are rounded to the cent half-even by round_cents.
+    """
+    __slots__ = ('cents',)
+
+    def __init__(self, cents: int = 0):
+        self.cents = cents
+
+    def __reduce__(self):
+        # Much cheaper to pickle than the default slots state, which matters
+        # when statements are sent between processes
+        return (Money, (self.cents,))
+
+    @classmethod
+    def of(cls, value: Union[Money, Decimal, int, str]) -> Money:
+        """Converts an amount in currency units to Money"""
+        if isinstance(value, Money):
+            return value
+        if isinstance(value, str):
+            value = Decimal(value)
+        if not isinstance(value, (Decimal, int)):
+            raise TypeError(f"Cannot convert {type(value).__name__} to Money")
+        if isinstance(value, Decimal) and not value.is_finite():
+            raise ValueError("Amount must be a finite number")
+        # Checked before scaling, as a huge exponent would overflow or expand digit by digit
+        if not -_MAX_UNITS <= value <= _MAX_UNITS:
+            raise ValueError("Amount is out of range")
+        if isinstance(value, int):
+            return cls(value * 100)
+        cents = value.scaleb(2, _EXACT)
+        if cents != cents.to_integral_value():
+            raise ValueError("Amount cannot have more than 2 decimal places")
+        return cls(int(cents))
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.cents).scaleb(-2, _EXACT)
+
+    def __add__(self, other) -> Money:
+        if isinstance(other, Money):
+            return Money(self.cents + other.cents)
+        if isinstance(other, (Decimal, int)):
+            return Money(self.cents + Money.of(other).cents)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other) -> Money:
+        if isinstance(other, Money):
+            return Money(self.cents - other.cents)
+        if isinstance(other, (Decimal, int)):
+            return Money(self.cents - Money.of(other).cents)
+        return NotImplemented
+
+    def __rsub__(self, other) -> Money:
+        if isinstance(other, (Decimal, int)):
+            return Money(Money.of(other).cents - self.cents)
+        return NotImplemented
+
+    def __neg__(self) -> Money:
+        return Money(-self.cents)
+
+    def __bool__(self) -> bool:
+        return self.cents != 0
+
+    def _operands(self, other):
+        if isinstance(other, Money):
+            return self.cents, other.cents
+        if isinstance(other, (Decimal, int)):
+            return self.to_decimal(), other
+        return None
+
+    def __eq__(self, other) -> bool:
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] == operands[1]
+
+    def __lt__(self, other) -> bool:
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] < operands[1]
+
+    def __le__(self, other) -> bool:
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] <= operands[1]
+
+    def __gt__(self, other) -> bool:
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] > operands[1]
+
+    def __ge__(self, other) -> bool:
+        operands = self._operands(other)
+        return NotImplemented if operands is None else operands[0] >= operands[1]
+
+    def __hash__(self) -> int:
+        # Equal Decimals and ints must hash alike
+        return hash(self.to_decimal())
+
+    def __format__(self, format_spec: str) -> str:
+        return format(self.to_decimal(), format_spec)
+
+    def __str__(self) -> str:
+        return str(self.to_decimal())
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+def round_cents(value: Fraction) -> Money:
+    """Rounds an exact amount of cents to the nearest cent, ties to even"""
+    return Money(round(value))
@@ -0,0 +1,58 @@
+# bank/models/rule_timeline.py
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from collections.abc import Sequence
+from datetime import datetime
+from typing import List, Optional
+
+from bank.models.interest_rule import InterestRule
+
+class InterestRuleTimeline(Sequence):
+    """Interest rules kept sorted by effective date, at most one per day"""
+
+    def __init__(self):
+        self._days: List[int] = []
+        self._rules: List[InterestRule] = []
+        self.version = 0  # bumped on every change
+
+    def __len__(self) -> int:
+        return len(self._rules)
+
+    def __getitem__(self, index):
+        return self._rules[index]
+
+    def __iter__(self):
+        return iter(self._rules)
+
+    def copy(self) -> InterestRuleTimeline:
+        timeline = InterestRuleTimeline()
+        timeline._days = list(self._days)
+        timeline._rules = list(self._rules)
+        timeline.version = self.version
+        return timeline
+
+    def upsert(self, rule: InterestRule):
+        """Adds a rule, replacing any existing rule effective on the same day"""
+        self.version += 1
+        day = rule.date.toordinal()
+        index = bisect_left(self._days, day)
+        if index < len(self._days) and self._days[index] == day:
+            self._rules[index] = rule
+        else:
+            self._days.insert(index, day)
+            self._rules.insert(index, rule)
+
+    def next_after(self, date: datetime) -> Optional[InterestRule]:
+        """Returns the first rule effective after date, if any"""
+        index = bisect_right(self._days, date.toordinal())
+        return self._rules[index] if index < len(self._rules) else None
+
+    def rules_in_window(self, start_date: datetime, end_date: datetime) -> List[InterestRule]:
+        """Returns the rule in effect on start_date followed by rules starting up to end_date"""
+        return self.rules_between_days(start_date.toordinal(), end_date.toordinal())
+
+    def rules_between_days(self, first_day: int, last_day: int) -> List[InterestRule]:
+        """rules_in_window for an inclusive range of day ordinals"""
+        start = bisect_right(self._days, first_day)
+        end = bisect_right(self._days, last_day)
+        return self._rules[max(start - 1, 0):end]
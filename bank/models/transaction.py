@@ -3,28 +3,74 @@ from __future__ import annotations
 from abc import ABC, abstractmethod
 from datetime import datetime
 from decimal import Decimal
+from typing import Union
+
+from bank.models.money import Money
 
 class Transaction(ABC):
-    def __init__(self, account_id: str, date: datetime, amount: Decimal, transaction_id: str = ""):
+    __slots__ = ('account_id', 'date', 'amount', 'transaction_id')
+    sign = 1
+    code = -1  # compact type code used by the ledger
+
+    def __init__(self, account_id: str, date: datetime, amount: Union[Money, Decimal],
+                 transaction_id: str = ""):
         self.account_id = account_id
         self.date = date
-        self.amount = amount
+        self.amount = Money.of(amount)
         self.transaction_id = transaction_id
     
+    @property
+    def signed_amount(self) -> Money:
+        return self.amount if self.sign > 0 else -self.amount
+    
+    @property
+    def signed_cents(self) -> int:
+        return self.sign * self.amount.cents
+    
     @abstractmethod
-    def apply(self, balance: Decimal) -> Decimal:
+    def apply(self, balance: Money) -> Money:
         pass
 
 class Deposit(Transaction):
-    def apply(self, balance: Decimal) -> Decimal:
+    __slots__ = ()
+    code = 0
+
+    def apply(self, balance: Money) -> Money:
         return balance + self.amount
 
 class Withdrawal(Transaction):
-    def apply(self, balance: Decimal) -> Decimal:
+    __slots__ = ()
+    sign = -1
+    code = 1
+
+    def apply(self, balance: Money) -> Money:
         if balance < self.amount:
             raise ValueError("Insufficient funds")
         return balance - self.amount
 
 class Interest(Transaction):
-    def apply(self, balance: Decimal) -> Decimal:
-        return balance + self.amount
\ No newline at end of file
+    __slots__ = ()
+    code = 2
+
+    def apply(self, balance: Money) -> Money:
+        return balance + self.amount
+
+class BalanceForward(Transaction):
+    """Closing balance of compacted months, carried forward as a single entry"""
+    __slots__ = ()
+    code = 3
+
+    def apply(self, balance: Money) -> Money:
+        return balance + self.amount
+
+class InterestReversal(Interest):
+    """Takes back interest over-posted on a closed month's last day after a rate correction"""
+    __slots__ = ()
+    sign = -1
+    code = 4
+
+    def apply(self, balance: Money) -> Money:
+        return balance - self.amount
+
+# Indexed by Transaction.code
+TRANSACTION_TYPES = (Deposit, Withdrawal, Interest, BalanceForward, InterestReversal)
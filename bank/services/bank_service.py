@@ -1,34 +1,662 @@
-from datetime import datetime, timedelta
-from decimal import Decimal, getcontext
-from typing import Dict, List, Tuple
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple, Union
 
 from bank.models.account import BankAccount
+from bank.models.aggregates import BankAggregates
 from bank.models.interest_rule import InterestRule
-from bank.models.transaction import Deposit, Transaction, Withdrawal, Interest
+from bank.models.money import Money, round_cents
+from bank.models.rule_timeline import InterestRuleTimeline
+from bank.models.transaction import (TRANSACTION_TYPES, BalanceForward, Deposit, Interest,
+                                     InterestReversal, Transaction, Withdrawal)
+from bank.services.interest import (AccountSnapshot, Movement, RatePeriod, accrue_interest,
+                                    accrue_interest_batch, allocate_cents, period_balance_days)
+from bank.storage.account_cache import AccountCache
+from bank.storage.journal import (CLOSE_RECORD, RULE_RECORD, TRANSACTION_RECORD, Journal,
+                                  pack_close, pack_compaction, pack_rule, pack_transaction,
+                                  read_journal)
+from bank.storage.snapshot import load_snapshot, take_snapshot
+from bank.storage.sqlite_repository import SqliteRepository
+from bank.utils.date_utils import (day_date, day_month_key, format_day, get_last_day_of_month,
+                                   is_month_end, month_bounds, month_first_day, month_key)
+from bank.utils.locks import DEFAULT_STRIPES, ReadWriteLock, StripedLock
+from bank.utils.metrics import MetricsRegistry
 
-getcontext().prec = 6
+BALANCE_ENGINES = ('ledger', 'fenwick')
+INTEREST_BACKENDS = ('decimal', 'numpy')
+DEFAULT_SHARD_SIZE = 10_000
+DEFAULT_RESULT_CACHE_SIZE = 10_000
+INSTRUMENTED_METHODS = (
+    'add_transaction', 'add_transactions_bulk', 'add_interest_rule', 'get_account_statement',
+    'calculate_interest_for_month', 'calculate_interest_for_range', 'close_month',
+    'post_month_end_interest', 'post_interest', 'compact_closed_months')
+# Helpers that read an account's ledger, timed under the BankAccount method they call
+INSTRUMENTED_ACCOUNT_READS = {'_get_monthly_transactions': 'get_transactions_for_month',
+                              '_get_starting_balance': 'get_month_end_balance'}
+
+# (day ordinal, transaction id, type code, amount in cents)
+StatementEntry = Tuple[int, str, int, int]
+# (account id, opening balance in cents, the month's entries,
+#  interest posted when the month was closed or None while it is open)
+StatementSnapshot = Tuple[str, int, List[StatementEntry], Optional[int]]
+
+class InterestCorrection:
+    """Interest re-posted for a closed month after a back-dated rule change"""
+
+    def __init__(self, account_id: str, year: int, month: int, posted: Money, corrected: Money):
+        self.account_id = account_id
+        self.year = year
+        self.month = month
+        self.posted = posted
+        self.corrected = corrected
+
+    @property
+    def delta(self) -> Money:
+        return self.corrected - self.posted
+
+    def __repr__(self) -> str:
+        return (f"InterestCorrection({self.account_id!r}, {self.year}, {self.month}, "
+                f"{self.posted} -> {self.corrected})")
 
 class BankService:
-    def __init__(self):
+    def __init__(self, balance_engine: str = 'ledger', interest_backend: str = 'decimal',
+                 journal: Optional[Journal] = None,
+                 repository: Optional[SqliteRepository] = None,
+                 cache_accounts: Optional[int] = None, cache_bytes: Optional[int] = None,
+                 result_cache_size: int = DEFAULT_RESULT_CACHE_SIZE,
+                 thread_safe: bool = False, lock_stripes: int = DEFAULT_STRIPES,
+                 metrics: Optional[MetricsRegistry] = None):
+        if balance_engine not in BALANCE_ENGINES:
+            raise ValueError("Invalid balance engine")
+        cached = cache_accounts is not None or cache_bytes is not None
+        if cached and repository is None:
+            raise ValueError("An account cache needs a repository")
+        if repository is not None and not cached and balance_engine == 'fenwick':
+            raise ValueError("The fenwick engine needs in-memory accounts")
+        if interest_backend not in INTEREST_BACKENDS:
+            raise ValueError("Invalid interest backend")
+        if thread_safe and repository is not None:
+            raise ValueError("Thread-safe mode needs in-memory accounts")
+        self.balance_engine = balance_engine
+        self.interest_backend = interest_backend
+        self.journal = journal
+        self.repository = repository
+        self.account_cache: Optional[AccountCache] = None
+        self.snapshot_path: Optional[str] = None
+        self.snapshot_interval = 0
+        self._snapshot_position = 0
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._snapshot_guard = threading.Lock()
+        self.thread_safe = thread_safe
+        # Thread-safe mode: account operations hold their account's stripe and a
+        # shared rules lock; rule changes and whole-bank operations hold it exclusively
+        self._account_locks = StripedLock(lock_stripes) if thread_safe else None
+        self._rules_lock = ReadWriteLock() if thread_safe else None
+        self._accrue_batch = accrue_interest_batch
+        if interest_backend == 'numpy':
+            # Optional dependency, only needed when the backend is selected
+            from bank.services.interest_numpy import accrue_interest_batch_numpy
+            self._accrue_batch = accrue_interest_batch_numpy
         self.accounts: Dict[str, BankAccount] = {}
-        self.interest_rules: List[InterestRule] = []
+        self.interest_rules = InterestRuleTimeline()
+        if repository is not None:
+            # Accounts stay in the database; rules are few enough to keep in memory
+            self.accounts = repository.accounts
+            if cached:
+                # Hot accounts stay loaded; cold ones are read back on demand
+                self.account_cache = AccountCache(repository, cache_accounts, cache_bytes,
+                                                  indexed_balances=balance_engine == 'fenwick')
+                self.accounts = self.account_cache
+            for rule in repository.load_rules():
+                self.interest_rules.upsert(rule)
+        self._month_periods: Dict[int, List[RatePeriod]] = {}
+        # (kind, account id, month key) -> ((account version, rules version), result),
+        # split by lock stripe so each part is only touched under its stripe's lock
+        stripes = len(self._account_locks) if thread_safe else 1
+        self._stripe_cache_size = -(-result_cache_size // stripes)
+        self._results: List['OrderedDict[Tuple[str, str, int], Tuple[Tuple[int, int], object]]'] = [
+            OrderedDict() for _ in range(stripes)]
+        # Versions are kept only for accounts with memoized results, counted per account
+        self._account_versions: Dict[str, int] = {}
+        self._memoized_counts: Dict[str, int] = {}
+        # (rules version, first month key, last month key or None) of each rule change
+        self._rule_changes: List[Tuple[int, int, Optional[int]]] = []
+        # Built from the ledgers by the first reporting query, then kept up to date
+        self._aggregates: Optional[BankAggregates] = None
+        # Latest closed month key -> ids of in-memory accounts closed through it,
+        # built by the first back-dated rule change, then kept up to date
+        self._closed_index: Optional[Dict[int, Set[str]]] = None
+        self.metrics = metrics
+        if metrics is not None:
+            self._instrument(metrics)
+
+    @classmethod
+    def restore(cls, journal_path: str, snapshot_path: Optional[str] = None,
+                snapshot_interval: int = 0, durable: bool = True,
+                **options) -> 'BankService':
+        """Rebuilds a service from its latest snapshot and journal, then keeps appending.
+
+        Only journal records written after the snapshot are replayed. With a
+        snapshot_interval, a new snapshot is written in the background every
+        that many journal records. A durable journal returns from each change
+        only once it is fsynced; without it, changes are written behind and a
+        crash can lose the last group.
+        """
+        service = cls(**options)
+        start = 0
+        if snapshot_path is not None and os.path.exists(snapshot_path):
+            start = load_snapshot(service, snapshot_path)
+        service.replay_journal(journal_path, start)
+        service.journal = Journal(journal_path, durable=durable)
+        service.snapshot_path = snapshot_path
+        service.snapshot_interval = snapshot_interval
+        service._snapshot_position = service.journal.record_count
+        return service
+
+    def replay_journal(self, journal_path: str, start: int = 0):
+        """Loads journal records straight into the ledgers and rule timeline"""
+        with self._exclusive():
+            for record in read_journal(journal_path, start):
+                if record[0] == TRANSACTION_RECORD:
+                    _, account_id, day, code, cents, sequence = record
+                    self.create_account_if_not_exists(account_id).add_entry(
+                        day, code, cents, sequence)
+                elif record[0] == RULE_RECORD:
+                    _, rule_id, date, rate = record
+                    # Corrections were journaled after the rule as entries of their own
+                    self.add_interest_rule(date, rule_id, rate, correct_closed_months=False)
+                elif record[0] == CLOSE_RECORD:
+                    _, account_id, day = record
+                    self.accounts[account_id].close_through(day_month_key(day))
+                else:
+                    _, account_id, day = record
+                    self.accounts[account_id].compact(day_month_key(day))
+            # Replayed entries bypass _post, so drop every memoized result and aggregate
+            for results in self._results:
+                results.clear()
+            self._account_versions.clear()
+            self._memoized_counts.clear()
+            self._aggregates = None
+            self._closed_index = None
+
+    def snapshot(self, path: str, background: bool = False) -> Optional[threading.Thread]:
+        """Writes a snapshot of all accounts and rules, optionally in the background"""
+        if self.repository is not None:
+            raise ValueError("Snapshots need in-memory accounts")
+        with self._snapshot_guard:
+            if self._snapshot_thread is not None:
+                self._snapshot_thread.join()
+            self._start_snapshot(path, background)
+        return self._snapshot_thread
+
+    def close(self):
+        """Waits for a running snapshot, then commits and closes the journal and repository"""
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        if self.journal is not None:
+            self.journal.close()
+        if self.account_cache is not None:
+            self.account_cache.flush()
+        if self.repository is not None:
+            self.repository.close()
 
     def get_account_statement(self, account_id: str, year: int, month: int) -> List[Dict]:
-        """Generates monthly statement with running balances and interest"""
-        account = self._get_account(account_id)
+        """Generates monthly statement with running balances and interest.
+
+        Statements are memoized until the account or the interest rules
+        change, so the returned lines are shared and must not be modified.
+        """
+        with self._shared(), self._account_lock(account_id):
+            account = self._get_account(account_id)
+            last_day = self._get_last_day_of_month(year, month)
+            key = month_key(year, month)
+            self._check_not_archived(account, key)
+            return self._memoized('statement', account_id, key,
+                                  lambda: self._build_statement(account, year, month, last_day))
+
+    def get_account_statements(self, account_ids: Iterable[str], year: int,
+                               month: int) -> Dict[str, List[Dict]]:
+        """Generates the month's statement for each of the given accounts"""
+        return {account_id: self.get_account_statement(account_id, year, month)
+                for account_id in account_ids}
+
+    def statement_snapshots(self, account_ids: Iterable[str], year: int,
+                            month: int) -> List[StatementSnapshot]:
+        """Returns what each account's month statement is built from, in plain values.
+
+        With month_rate_periods this is enough to rebuild the statements
+        away from the service, e.g. in another process. Accounts whose month
+        has been archived are left out.
+        """
         last_day = self._get_last_day_of_month(year, month)
+        key = month_key(year, month)
+        snapshots = []
+        for account_id in account_ids:
+            with self._shared(), self._account_lock(account_id):
+                account = self._get_account(account_id)
+                if account.archived_through is not None and key <= account.archived_through:
+                    continue
+                transactions = self._get_monthly_transactions(account, year, month)
+                posted = None
+                if self._is_closed(account, key):
+                    posted = self._posted_interest(transactions, last_day).cents
+                snapshots.append((
+                    account_id, self._get_starting_balance(account, year, month).cents,
+                    [(t.date.toordinal(), t.transaction_id, t.code, t.amount.cents)
+                     for t in transactions],
+                    posted))
+        return snapshots
+
+    def month_rate_periods(self, year: int, month: int) -> List[RatePeriod]:
+        """Returns the month's (first day, last day, rate) periods as day ordinals"""
+        with self._shared():
+            return list(self._get_month_periods(year, month))
+
+    def account_ids(self) -> Iterator[str]:
+        """Iterates account ids; a thread-safe service iterates a copy"""
+        if self._account_locks is not None:
+            return iter(list(self.accounts))
+        return iter(self.accounts)
+
+    def calculate_interest_for_month(self, account_id: str, year: int, month: int) -> Money:
+        """Calculates monthly interest based on daily balances and interest rules"""
+        with self._shared(), self._account_lock(account_id):
+            account = self._get_account(account_id)
+            key = month_key(year, month)
+            self._check_not_archived(account, key)
+            return self._memoized('interest', account_id, key,
+                                  lambda: self._calculate_month_interest(account, year, month))
+
+    def calculate_interest_for_range(self, account_id: str, start_date: datetime,
+                                     end_date: datetime) -> Money:
+        """Calculates interest accrued over an inclusive date range"""
+        with self._shared(), self._account_lock(account_id):
+            account = self._get_account(account_id)
+            if end_date < start_date:
+                raise ValueError("End date must not be before start date")
+            self._check_not_archived(account, month_key(start_date.year, start_date.month))
+            
+            first_day, last_day = start_date.toordinal(), end_date.toordinal()
+            applicable_rules = self.interest_rules.rules_between_days(first_day, last_day)
+            periods = self._calculate_interest_periods(first_day, last_day, applicable_rules)
+            if account.balance_index is not None:
+                return self._calculate_indexed_interest(account, periods)
+            
+            starting_balance = account.calculate_balance_up_to(
+                datetime.fromordinal(first_day - 1))
+            movements = account.get_movements_between(start_date, end_date)
+            return self._calculate_interest(periods, movements, starting_balance)
+
+    def has_account(self, account_id: str) -> bool:
+        return account_id in self.accounts
+
+    def create_account_if_not_exists(self, account_id: str) -> BankAccount:
+        """Creates account if it doesn't exist, otherwise returns existing"""
+        with self._shared(), self._account_lock(account_id):
+            account = self.accounts.get(account_id)
+            if account is None:
+                if self.repository is not None:
+                    account = self.accounts.create(account_id)
+                else:
+                    account = self.accounts[account_id] = BankAccount(
+                        account_id, indexed_balances=self.balance_engine == 'fenwick')
+                if self._aggregates is not None:
+                    self._aggregates.add_account(account_id)
+            return account
+    
+    def add_transaction(self, account_id: str, date: Union[datetime, int], 
+                       transaction_type: str, amount: Decimal) -> Transaction:
+        """Adds a new transaction to the specified account; date may be a day ordinal"""
+        day = date if isinstance(date, int) else date.toordinal()
+        date = day_date(day)
+        with self._shared(), self._account_lock(account_id):
+            account = self.create_account_if_not_exists(account_id)
+            
+            # Generate transaction ID
+            date_str = format_day(day)
+            same_day_count = account.count_transactions_on(date)
+            transaction_id = f"{date_str}-{same_day_count+1:02d}"
+            
+            transaction = self._build_transaction(account_id, date, transaction_type,
+                                                  amount, transaction_id)
+            self._post(account, transaction, same_day_count + 1)
+            return transaction
+    
+    def add_transactions_bulk(self, records: Iterable[Tuple[Union[datetime, int], str, str,
+                                                            Decimal]]
+                              ) -> List[Tuple[int, str]]:
+        """Adds (date, account_id, type, amount) records grouped per account in date order.
+
+        Dates may be datetimes or day ordinals; rows are grouped and sorted by
+        ordinal, and one datetime is built per distinct day. Rejected records
+        do not stop the batch; their position in records and the error
+        message are returned, ordered by position.
+        """
+        by_account: Dict[str, List[Tuple[int, int, str, Decimal]]] = {}
+        for position, (date, account_id, transaction_type, amount) in enumerate(records):
+            day = date if isinstance(date, int) else date.toordinal()
+            by_account.setdefault(account_id, []).append(
+                (day, position, transaction_type, amount))
         
+        errors = []
+        for account_id, rows in by_account.items():
+            with self._shared(), self._account_lock(account_id):
+                account = self.create_account_if_not_exists(account_id)
+                rows.sort(key=lambda row: (row[0], row[1]))
+                date_str, sequence, current_day, date = "", 0, None, None
+                for day, position, transaction_type, amount in rows:
+                    if day != current_day:
+                        current_day = day
+                        date = day_date(day)
+                        date_str = format_day(day)
+                        sequence = account.count_transactions_on(date)
+                    try:
+                        transaction = self._build_transaction(
+                            account_id, date, transaction_type, amount,
+                            f"{date_str}-{sequence+1:02d}")
+                        self._post(account, transaction, sequence + 1)
+                    except Exception as e:  # one bad row must not abort the batch
+                        errors.append((position, str(e)))
+                    else:
+                        sequence += 1
+        
+        errors.sort()
+        return errors
+    
+    def add_interest_rule(self, date: datetime, rule_id: str, rate: Decimal,
+                          correct_closed_months: bool = True) -> List[InterestCorrection]:
+        """Adds or updates an interest rate rule.
+
+        A rule only changes interest from its month until the next rule
+        takes over. Memoized results outside that window stay valid, and
+        months inside it that were closed with interest get the difference
+        posted on their last day. Later closed months are corrected too while earlier
+        corrections move their opening balance. Returns the corrections.
+        Loaders replaying already corrected history pass
+        correct_closed_months=False.
+        """
+        record = pack_rule(date.toordinal(), rule_id, rate) if self.journal else None
+        rule = InterestRule(date, rule_id, rate)
+        with self._exclusive():
+            previous_rules = None
+            if self._aggregates is not None:
+                if correct_closed_months:
+                    previous_rules = self.interest_rules.copy()
+                else:
+                    self._aggregates = None  # rule totals would go stale; rebuilt on demand
+            self.interest_rules.upsert(rule)
+            if self.repository is not None:
+                self.repository.save_rule(rule)
+            if record is not None:
+                self.journal.append(record)
+            changed_from = month_key(date.year, date.month)
+            next_rule = self.interest_rules.next_after(date)
+            changed_to = None
+            if next_rule is not None:
+                changed_to = day_month_key(next_rule.date.toordinal() - 1)
+            self._rule_changes.append((self.interest_rules.version, changed_from, changed_to))
+            for key in [k for k in self._month_periods
+                        if changed_from <= k and (changed_to is None or k <= changed_to)]:
+                del self._month_periods[key]
+            corrections = []
+            if correct_closed_months:
+                for account in self._accounts_closed_from(changed_from):
+                    corrections.extend(self._correct_closed_months(account, changed_from,
+                                                                   changed_to, previous_rules))
+        if record is not None or corrections:
+            self._maybe_snapshot()
+        return corrections
+
+    def close_month(self, account_id: str, year: int, month: int) -> Money:
+        """Posts the month's interest exactly once and freezes the month.
+
+        Once closed, transactions dated in the month or earlier are rejected.
+        Earlier months still open are closed first, in order, each with its
+        own interest. Interest is posted on the month's last day unless it is
+        zero; the closed state itself is kept on the account. Closing a month
+        again returns the interest posted when it was closed.
+        """
+        last_day = self._get_last_day_of_month(year, month)
+        with self._shared(), self._account_lock(account_id):
+            account = self._get_account(account_id)
+            key = month_key(year, month)
+            if self._is_closed(account, key):
+                return self._posted_interest(
+                    account.get_transactions_between(last_day, last_day), last_day)
+            for open_key in range(self._first_open_month(account, key), key + 1):
+                year, month0 = divmod(open_key, 12)
+                interest = self.calculate_interest_for_month(account_id, year, month0 + 1)
+                self._close_with_interest(account, year, month0 + 1, interest)
+            return interest
+
+    def _first_open_month(self, account: BankAccount, key: int) -> int:
+        """Returns the first month to close so that every month up to the keyed one is closed"""
+        if account.closed_through is not None:
+            return account.closed_through + 1
+        transactions = account.transactions
+        if not transactions:
+            return key
+        first = transactions[0].date
+        return min(month_key(first.year, first.month), key)
+
+    def _close_with_interest(self, account: BankAccount, year: int, month: int,
+                             interest: Money, shares: Optional[Dict[str, int]] = None):
+        """Posts an open month's interest, unless it is zero, and closes the month"""
+        key = month_key(year, month)
+        last_day = self._get_last_day_of_month(year, month)
+        record = None
+        if self.journal is not None:
+            record = pack_close(account.account_id, last_day.toordinal())
+        if interest.cents:
+            if shares is None and self._aggregates is not None:
+                shares = self._month_interest_shares(account, year, month, interest.cents)
+            self._post(account, Interest(account.account_id, last_day, interest))
+            self._add_rule_interest(shares)
+        closed_through = account.closed_through
+        account.close_through(key)
+        self._account_changed(account.account_id)
+        self._index_closed(account, closed_through)
+        if record is not None:
+            self.journal.append(record)
+
+    def compact_closed_months(self, archive_path: str) -> int:
+        """Folds every account's closed months into a single balance-forward entry.
+
+        The removed entries are appended to the journal-format archive at
+        archive_path; statements and interest for compacted months are no
+        longer available. Returns the number of archived entries.
+        """
+        if self.repository is not None:
+            raise ValueError("Compaction needs in-memory accounts")
+        with self._exclusive():
+            archive = Journal(archive_path)
+            compacted = []
+            archived = 0
+            try:
+                for account in self.accounts.values():
+                    through = account.closed_through
+                    if through is None or through == account.archived_through:
+                        continue
+                    removed = account.compact(through)
+                    for day, code, cents, sequence in removed:
+                        archive.append(pack_transaction(account.account_id, day, code, cents,
+                                                        sequence))
+                    if removed:
+                        self._account_changed(account.account_id)
+                        self._aggregates = None  # archived entries leave the totals
+                        compacted.append((account.account_id, month_first_day(through + 1) - 1))
+                        archived += len(removed)
+            finally:
+                archive.close()
+            # Journal the compactions only once the archive is durable
+            if self.journal is not None:
+                for account_id, last_day in compacted:
+                    self.journal.append(pack_compaction(account_id, last_day))
+                self.journal.sync()
+            return archived
+
+    def post_month_end_interest(self, year: int, month: int, workers: Optional[int] = None,
+                                shard_size: int = DEFAULT_SHARD_SIZE) -> Dict[str, Money]:
+        """Closes the month for every account still open, posting interest in one step.
+
+        Like close_month, earlier months an account left open are closed
+        first, in order, each with its own interest. Each month's accounts
+        are split into shards of compact snapshots (opening balance, the
+        month's movements and rate periods) that are accrued in a process
+        pool. Interest is only posted once every shard has finished; accounts
+        that already closed the month are skipped, and accounts changed since
+        their snapshot are accrued again. Returns the positive amounts posted
+        for the requested month.
+        """
+        key = month_key(year, month)
+        with self._shared():
+            first_open = {}
+            for account in self._all_accounts():
+                with self._account_lock(account.account_id):
+                    if not self._is_closed(account, key):
+                        first_open[account.account_id] = self._first_open_month(account, key)
+        posted = {}
+        for open_key in range(min(first_open.values(), default=key), key + 1):
+            open_year, month0 = divmod(open_key, 12)
+            posted = self._post_month_interest(
+                open_year, month0 + 1, [account_id for account_id, first in first_open.items()
+                                        if first <= open_key], workers, shard_size)
+        return posted
+
+    def _post_month_interest(self, year: int, month: int, account_ids: List[str],
+                             workers: Optional[int], shard_size: int) -> Dict[str, Money]:
+        """Accrues one month for the given accounts in the pool and closes it for each"""
+        key = month_key(year, month)
+        with self._shared():
+            rules_version = self.interest_rules.version
+            periods = self._get_month_periods(year, month)
+            snapshots = []
+            versions = {}
+            for account_id in account_ids:
+                account = self.accounts[account_id]
+                with self._account_lock(account_id):
+                    if not self._is_closed(account, key):
+                        snapshots.append(self._snapshot_month(account, year, month))
+                        # Tracked until posting, so changes made in between are seen
+                        versions[account_id] = self._account_versions.setdefault(account_id, 0)
+        shards = [snapshots[i:i + shard_size] for i in range(0, len(snapshots), shard_size)]
+        workers = min(workers or os.cpu_count() or 1, len(shards))
+        
+        if workers <= 1:
+            results = [r for shard in shards for r in self._accrue_batch(periods, shard)]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(self._accrue_batch, periods, shard) for shard in shards]
+                results = [r for future in futures for r in future.result()]
+        
+        inputs = {account_id: (starting_balance, movements)
+                  for account_id, starting_balance, movements in snapshots}
+        posted = {}
+        for account_id, interest in results:
+            with self._shared(), self._account_lock(account_id):
+                account = self.accounts[account_id]
+                changed = (self._account_versions.get(account_id) != versions[account_id]
+                           or self.interest_rules.version != rules_version)
+                if account_id not in self._memoized_counts:
+                    self._account_versions.pop(account_id, None)
+                if self._is_closed(account, key):
+                    continue  # closed by another caller in the meantime
+                # A back-dated post may have opened an earlier month since the scan
+                for open_key in range(self._first_open_month(account, key), key):
+                    open_year, month0 = divmod(open_key, 12)
+                    self._close_with_interest(account, open_year, month0 + 1,
+                                              self.calculate_interest_for_month(
+                                                  account_id, open_year, month0 + 1))
+                    changed = True
+                if changed:
+                    # Posted to or re-rated since its snapshot, so accrued again as it is now
+                    snapshot = self._snapshot_month(account, year, month)
+                    [(_, interest)] = self._accrue_batch(self._get_month_periods(year, month),
+                                                         [snapshot])
+                    inputs[account_id] = snapshot[1:]
+                shares = None
+                if self._aggregates is not None:
+                    starting_balance, movements = inputs[account_id]
+                    shares = self._interest_shares(self.interest_rules, year, month,
+                                                   interest.cents, movements, starting_balance)
+                self._close_with_interest(account, year, month, interest, shares)
+            if interest > 0:
+                posted[account_id] = interest
+        return posted
+
+    def post_interest(self, account_id: str, date: datetime, amount: Money) -> Transaction:
+        """Posts an interest transaction to the specified account"""
+        with self._shared(), self._account_lock(account_id):
+            account = self._get_account(account_id)
+            transaction = Interest(account_id, date, amount)
+            self._post(account, transaction)
+            return transaction
+
+    # ========== REPORTING ==========
+
+    def monthly_totals(self, year: int, month: int) -> Dict[str, Money]:
+        """Returns the month's total amount per transaction type, bank-wide, in O(1).
+
+        Like every reporting query, the first call scans all ledgers once;
+        the totals are then kept up to date as entries are posted. Entries
+        archived by compact_closed_months are no longer counted.
+        """
+        totals = self._reporting().month_totals(month_key(year, month))
+        return {transaction_type.__name__: Money(totals[transaction_type.code])
+                for transaction_type in TRANSACTION_TYPES
+                if transaction_type is not BalanceForward}
+
+    def accounts_with_balance_above(self, amount: Union[Money, Decimal]
+                                    ) -> List[Tuple[str, Money]]:
+        """Returns the accounts whose balance exceeds amount, largest balance first"""
+        return [(account_id, Money(cents)) for account_id, cents
+                in self._reporting().balances_above(Money.of(amount).cents)]
+
+    def top_accounts_by_balance(self, n: int) -> List[Tuple[str, Money]]:
+        return [(account_id, Money(cents))
+                for account_id, cents in self._reporting().top_balances(n)]
+
+    def top_accounts_by_interest(self, n: int) -> List[Tuple[str, Money]]:
+        """Returns the n accounts paid the most net interest, largest first"""
+        return [(account_id, Money(cents))
+                for account_id, cents in self._reporting().top_interest_paid(n)]
+
+    def interest_by_rule(self) -> Dict[str, Money]:
+        """Returns the month-end interest accrued under each rule.
+
+        Each closed month's interest is split over the rules in force during
+        the month in proportion to what their periods accrued, and re-split
+        when a back-dated rule change corrects the month.
+        """
+        return {rule_id: Money(cents)
+                for rule_id, cents in self._reporting().rule_interest().items()}
+
+    # ========== HELPER METHODS ==========
+
+    def _build_statement(self, account: BankAccount, year: int, month: int,
+                         last_day: datetime) -> List[Dict]:
         starting_balance = self._get_starting_balance(account, year, month)
         monthly_transactions = self._get_monthly_transactions(account, year, month)
+        if self.metrics is not None:
+            self.metrics.observe(self._statement_scans, len(monthly_transactions))
         
         # Process all transactions except those on last day
         regular_transactions = [t for t in monthly_transactions if t.date != last_day]
         running_balance, statement_lines = self._process_transactions(
             regular_transactions, starting_balance)
         
-        # Add interest if applicable
+        # Add interest if applicable; a closed month shows what was posted
         if monthly_transactions:
-            interest = self.calculate_interest_for_month(account_id, year, month)
+            if self._is_closed(account, month_key(year, month)):
+                interest = self._posted_interest(monthly_transactions, last_day)
+            else:
+                interest = self.calculate_interest_for_month(account.account_id, year, month)
             if interest > 0:
                 running_balance += interest
                 statement_lines.append({
@@ -41,85 +669,342 @@ class BankService:
         
         return statement_lines
 
-    def calculate_interest_for_month(self, account_id: str, year: int, month: int) -> Decimal:
-        """Calculates monthly interest based on daily balances and interest rules"""
-        account = self._get_account(account_id)
-        first_day = datetime(year, month, 1)
-        last_day = self._get_last_day_of_month(year, month)
+    def _calculate_month_interest(self, account: BankAccount, year: int, month: int) -> Money:
+        periods = self._get_month_periods(year, month)
+        if account.balance_index is not None:
+            return self._calculate_indexed_interest(account, periods)
         
         starting_balance = self._get_starting_balance(account, year, month)
-        monthly_transactions = self._get_monthly_transactions(account, year, month)
-        applicable_rules = sorted(
-            [r for r in self.interest_rules if r.date <= last_day],
-            key=lambda r: r.date
-        )
-        
-        periods = self._calculate_interest_periods(first_day, last_day, applicable_rules)
-        return self._calculate_interest(periods, monthly_transactions, starting_balance)
+        movements = account.get_movements_for_month(year, month)
+        return self._calculate_interest(periods, movements, starting_balance)
 
-    def create_account_if_not_exists(self, account_id: str) -> BankAccount:
-        """Creates account if it doesn't exist, otherwise returns existing"""
-        if account_id not in self.accounts:
-            self.accounts[account_id] = BankAccount(account_id)
-        return self.accounts[account_id]
-    
-    def add_transaction(self, account_id: str, date: datetime, 
-                       transaction_type: str, amount: Decimal) -> Transaction:
-        """Adds a new transaction to the specified account"""
-        account = self.create_account_if_not_exists(account_id)
-        
-        # Generate transaction ID
-        date_str = date.strftime("%Y%m%d")
-        same_day_transactions = [t for t in account.transactions 
-                               if t.date.strftime("%Y%m%d") == date_str]
-        transaction_id = f"{date_str}-{len(same_day_transactions)+1:02d}"
-        
-        if transaction_type.upper() == 'D':
-            transaction = Deposit(account_id, date, amount, transaction_id)
-        elif transaction_type.upper() == 'W':
-            transaction = Withdrawal(account_id, date, amount, transaction_id)
-        else:
-            raise ValueError("Invalid transaction type")
-        
+    def _memoized(self, kind: str, account_id: str, key: int, compute):
+        """Returns a cached month result while its account and the month's rates are unchanged"""
+        if not self._stripe_cache_size:
+            return compute()
+        results = self._results[self._account_locks.index(account_id) if self._account_locks else 0]
+        cache_key = (kind, account_id, key)
+        version = (self._account_versions.setdefault(account_id, 0), self.interest_rules.version)
+        entry = results.get(cache_key)
+        if entry is not None and entry[0][0] == version[0] and (
+                entry[0][1] == version[1] or not self._rates_changed(key, entry[0][1])):
+            if entry[0] != version:
+                results[cache_key] = (version, entry[1])
+            results.move_to_end(cache_key)
+            if self.metrics is not None:
+                self.metrics.inc(self._memo_hits)
+            return entry[1]
+        if self.metrics is not None:
+            self.metrics.inc(self._memo_misses)
+        result = compute()
+        if entry is None:
+            self._memoized_counts[account_id] = self._memoized_counts.get(account_id, 0) + 1
+        results[cache_key] = (version, result)
+        if len(results) > self._stripe_cache_size:
+            (_, evicted_id, _), _ = results.popitem(last=False)
+            # Same stripe, so the evicted account's lock is held too
+            self._memoized_counts[evicted_id] -= 1
+            if not self._memoized_counts[evicted_id]:
+                del self._memoized_counts[evicted_id]
+                del self._account_versions[evicted_id]
+        return result
+
+    def _rates_changed(self, key: int, since_version: int) -> bool:
+        """Whether a rule change after since_version touched the keyed month's rates"""
+        for version, changed_from, changed_to in reversed(self._rule_changes):
+            if version <= since_version:
+                break
+            if changed_from <= key and (changed_to is None or key <= changed_to):
+                return True
+        return False
+
+    def _accounts_closed_from(self, key: int) -> Iterator[BankAccount]:
+        """Yields the accounts with a closed month at or after the keyed month.
+
+        Repository accounts are found by query and loaded one at a time, so a
+        cached account is never evicted while the caller is still posting to
+        it; in-memory accounts are looked up in the closed-month index.
+        """
+        if self.repository is not None:
+            if self.account_cache is not None:
+                self.account_cache.flush()
+            for account_id in self.repository.accounts_closed_from(key):
+                yield self.accounts[account_id]
+            return
+        if self._closed_index is None:
+            self._closed_index = {}
+            for account in self.accounts.values():
+                if account.closed_through is not None:
+                    self._closed_index.setdefault(account.closed_through, set()).add(
+                        account.account_id)
+        # Listed up front, as correcting an account can move it within the index
+        account_ids = sorted(account_id for closed_through, ids in self._closed_index.items()
+                             if closed_through >= key for account_id in ids)
+        for account_id in account_ids:
+            yield self.accounts[account_id]
+
+    def _correct_closed_months(self, account: BankAccount, changed_from: int,
+                               changed_to: Optional[int],
+                               previous_rules: Optional[InterestRuleTimeline] = None
+                               ) -> List[InterestCorrection]:
+        """Re-posts the interest of an account's closed months under the current rules.
+
+        With previous_rules, the rules before the change, each month's
+        interest is also re-attributed in the per-rule totals.
+        """
+        corrections = []
+        start = changed_from
+        if account.archived_through is not None:
+            start = max(start, account.archived_through + 1)
+        carried = 0  # corrections so far, which move every later opening balance
+        for key in range(start, account.closed_through + 1):
+            if changed_to is not None and key > changed_to and not carried:
+                break
+            year, month0 = divmod(key, 12)
+            last_day = self._get_last_day_of_month(year, month0 + 1)
+            transactions = self._get_monthly_transactions(account, year, month0 + 1)
+            posted = self._posted_interest(transactions, last_day)
+            # Interest is accrued as it was at closing, before its own entries were posted
+            movements = [(t.date.toordinal(), t.signed_cents) for t in transactions
+                         if not (isinstance(t, Interest) and t.date == last_day)]
+            starting_balance = self._get_starting_balance(account, year, month0 + 1)
+            corrected = self._calculate_interest(
+                self._get_month_periods(year, month0 + 1), movements, starting_balance)
+            if previous_rules is not None:
+                # Taken back as attributed when posted, before this pass moved the opening
+                self._add_rule_interest(self._interest_shares(
+                    previous_rules, year, month0 + 1, -posted.cents, movements,
+                    starting_balance.cents - carried))
+                self._add_rule_interest(self._interest_shares(
+                    self.interest_rules, year, month0 + 1, corrected.cents, movements,
+                    starting_balance.cents))
+            delta = corrected.cents - posted.cents
+            if delta:
+                code = Interest.code if delta > 0 else InterestReversal.code
+                self._post_entry(account, last_day.toordinal(), code, abs(delta))
+                corrections.append(InterestCorrection(account.account_id, year, month0 + 1,
+                                                      posted, corrected))
+                carried += delta
+        return corrections
+
+    def _post_entry(self, account: BankAccount, day: int, code: int, cents: int):
+        """Adds a ledger entry that bypasses the closed-month check, and journals it"""
+        record = None
+        if self.journal is not None:
+            record = pack_transaction(account.account_id, day, code, cents, 0)
+        account.add_entry(day, code, cents, 0)
+        self._account_changed(account.account_id)
+        if self._aggregates is not None:
+            self._aggregates.add_entry(account.account_id, day, code, cents)
+        if record is not None:
+            self.journal.append(record)
+
+    def _reporting(self) -> BankAggregates:
+        """Returns the aggregates, building them from the ledgers on first use"""
+        aggregates = self._aggregates
+        if aggregates is None:
+            with self._exclusive():
+                if self._aggregates is None:
+                    self._aggregates = self._build_aggregates()
+                aggregates = self._aggregates
+        return aggregates
+
+    def _build_aggregates(self) -> BankAggregates:
+        if self.account_cache is not None:
+            self.account_cache.flush()
+        aggregates = BankAggregates()
+        for account in self._all_accounts():
+            entries = []
+            closed_months = set()  # corrections may add more interest on the same day
+            for transaction in account.transactions:
+                day = transaction.date.toordinal()
+                entries.append((day, transaction.code, transaction.amount.cents))
+                if (isinstance(transaction, Interest) and is_month_end(day)
+                        and self._is_closed(account, day_month_key(day))):
+                    closed_months.add(day_month_key(day))
+            aggregates.add_history(account.account_id, account.balance.cents, entries)
+            for key in sorted(closed_months):
+                year, month0 = divmod(key, 12)
+                last_day = self._get_last_day_of_month(year, month0 + 1)
+                posted = self._posted_interest(
+                    self._get_monthly_transactions(account, year, month0 + 1), last_day)
+                aggregates.add_rule_interest(
+                    self._month_interest_shares(account, year, month0 + 1, posted.cents))
+        return aggregates
+
+    def _month_interest_shares(self, account: BankAccount, year: int, month: int,
+                               cents: int) -> Dict[str, int]:
+        """Attributes interest posted on the month's last day to the month's rules.
+
+        Interest is attributed as accrued before its own entries were posted.
+        """
+        last_day = self._get_last_day_of_month(year, month)
+        movements = [(t.date.toordinal(), t.signed_cents)
+                     for t in self._get_monthly_transactions(account, year, month)
+                     if not (isinstance(t, Interest) and t.date == last_day)]
+        return self._interest_shares(self.interest_rules, year, month, cents, movements,
+                                     self._get_starting_balance(account, year, month).cents)
+
+    def _interest_shares(self, rules: InterestRuleTimeline, year: int, month: int, cents: int,
+                         movements: List[Movement], starting_balance: int) -> Dict[str, int]:
+        """Splits a month's interest over rules in proportion to what their periods accrued"""
+        first_day, last_day = month_bounds(year, month)
+        window = rules.rules_between_days(first_day, last_day)
+        if not window:
+            return {}
+        periods = self._calculate_interest_periods(first_day, last_day, window)
+        weights = [Fraction(rate) * balance_days for (_, _, rate), balance_days
+                   in zip(periods, period_balance_days(periods, movements, starting_balance))]
+        shares: Dict[str, int] = {}
+        for (period_start, _, _), part in zip(periods, allocate_cents(cents, weights)):
+            # Days before the month's first rule accrue at that rule's rate
+            rule = (rules.rules_between_days(period_start, period_start) or window)[0]
+            shares[rule.rule_id] = shares.get(rule.rule_id, 0) + part
+        return shares
+
+    def _add_rule_interest(self, shares: Optional[Dict[str, int]]):
+        if shares and self._aggregates is not None:
+            self._aggregates.add_rule_interest(shares)
+
+    def _instrument(self, metrics: MetricsRegistry):
+        """Times the public operations and the account reads behind statements and interest"""
+        metrics.instrument(self, INSTRUMENTED_METHODS)
+        for helper, method in INSTRUMENTED_ACCOUNT_READS.items():
+            setattr(self, helper, metrics.timed(getattr(self, helper),
+                                                "bank_account_read_seconds", method=method))
+        self._statement_scans = metrics.summary(
+            "bank_statement_transactions_scanned", "Transactions read per statement")
+        self._memo_hits = metrics.counter(
+            "bank_result_cache_total", "Memoized statement and interest lookups", result="hit")
+        self._memo_misses = metrics.counter(
+            "bank_result_cache_total", "Memoized statement and interest lookups", result="miss")
+        if self.account_cache is not None:
+            cache = self.account_cache
+            metrics.gauge("bank_account_cache_hits", lambda: cache.hits, "Account cache hits")
+            metrics.gauge("bank_account_cache_misses", lambda: cache.misses,
+                          "Account cache misses")
+            metrics.gauge("bank_account_cache_evictions", lambda: cache.evictions,
+                          "Account cache evictions")
+            metrics.gauge("bank_account_cache_hit_ratio",
+                          lambda: cache.hits / max(cache.hits + cache.misses, 1),
+                          "Share of account lookups served from the cache")
+
+    def _account_changed(self, account_id: str):
+        # Only accounts with memoized results carry a version
+        if account_id in self._account_versions:
+            self._account_versions[account_id] += 1
+
+    def _index_closed(self, account: BankAccount, closed_through: Optional[int]):
+        """Moves an account in the closed-month index once it is closed through a later month"""
+        if self._closed_index is not None and account.closed_through != closed_through:
+            if closed_through is not None:
+                self._closed_index[closed_through].discard(account.account_id)
+            self._closed_index.setdefault(account.closed_through, set()).add(account.account_id)
+
+    def _post(self, account: BankAccount, transaction: Transaction, sequence: int = 0):
+        """Applies a transaction to its account and journals it"""
+        record = None
+        if self.journal is not None:
+            # Packing first rejects records the journal cannot hold before any state changes
+            record = pack_transaction(account.account_id, transaction.date.toordinal(),
+                                      transaction.code, transaction.amount.cents, sequence)
         account.add_transaction(transaction)
-        return transaction
-    
-    def add_interest_rule(self, date: datetime, rule_id: str, rate: Decimal):
-        """Adds or updates an interest rate rule"""
-        # Remove any existing rule for the same date
-        self.interest_rules = [r for r in self.interest_rules if r.date != date]
-        self.interest_rules.append(InterestRule(date, rule_id, rate))
-        # Keep rules sorted by date
-        self.interest_rules.sort(key=lambda r: r.date)
+        self._account_changed(account.account_id)
+        if self._aggregates is not None:
+            self._aggregates.add_entry(account.account_id, transaction.date.toordinal(),
+                                       transaction.code, transaction.amount.cents)
+        if record is not None:
+            self.journal.append(record)
+            self._maybe_snapshot()
 
-    # ========== HELPER METHODS ==========
+    def _build_transaction(self, account_id: str, date: datetime, transaction_type: str,
+                           amount: Decimal, transaction_id: str) -> Transaction:
+        """Creates a deposit or withdrawal from its one-letter type code"""
+        if transaction_type.upper() == 'D':
+            return Deposit(account_id, date, amount, transaction_id)
+        if transaction_type.upper() == 'W':
+            return Withdrawal(account_id, date, amount, transaction_id)
+        raise ValueError("Invalid transaction type")
+
+    def _maybe_snapshot(self):
+        """Starts a background snapshot once enough journal records have piled up"""
+        if (self.snapshot_interval and self.snapshot_path is not None
+                and self.journal.record_count - self._snapshot_position >= self.snapshot_interval
+                and self._snapshot_guard.acquire(blocking=False)):
+            try:
+                # Never wait for a running snapshot here: the caller may hold a shared lock
+                if self._snapshot_thread is None or not self._snapshot_thread.is_alive():
+                    self._start_snapshot(self.snapshot_path, background=True)
+            finally:
+                self._snapshot_guard.release()
+
+    def _start_snapshot(self, path: str, background: bool):
+        if self.journal is not None:
+            self._snapshot_position = self.journal.record_count
+        self._snapshot_thread = take_snapshot(
+            self, path, background, self._exclusive if self._rules_lock is not None else None)
+
+    def _shared(self):
+        """Holds the rules lock in shared mode for an account-level operation"""
+        return self._rules_lock.read() if self._rules_lock is not None else nullcontext()
+
+    def _exclusive(self):
+        """Holds the rules lock exclusively, for rule changes and whole-bank operations"""
+        return self._rules_lock.write() if self._rules_lock is not None else nullcontext()
+
+    def _account_lock(self, account_id: str):
+        return self._account_locks(account_id) if self._account_locks is not None else nullcontext()
+
+    def _all_accounts(self) -> Iterable[BankAccount]:
+        # Other threads may add accounts while a thread-safe service iterates them
+        if self._account_locks is not None:
+            return list(self.accounts.values())
+        return self.accounts.values()
+
+    def _is_closed(self, account: BankAccount, key: int) -> bool:
+        return account.closed_through is not None and key <= account.closed_through
+
+    def _check_not_archived(self, account: BankAccount, key: int):
+        if account.archived_through is not None and key <= account.archived_through:
+            raise ValueError("Month has been archived")
+
+    def _posted_interest(self, transactions: List[Transaction], last_day: datetime) -> Money:
+        """Returns the interest posted on a closed month's last day"""
+        return sum((t.signed_amount for t in transactions
+                    if isinstance(t, Interest) and t.date == last_day), Money(0))
 
     def _get_account(self, account_id: str) -> BankAccount:
         """Returns account or raises error if not found"""
-        if account_id not in self.accounts:
+        account = self.accounts.get(account_id)
+        if account is None:
             raise ValueError("Account not found")
-        return self.accounts[account_id]
+        return account
 
     def _get_monthly_transactions(self, account: BankAccount, 
                                 year: int, month: int) -> List[Transaction]:
         """Returns sorted transactions for specified month"""
-        return sorted(
-            [t for t in account.transactions 
-             if t.date.year == year and t.date.month == month],
-            key=lambda t: t.date
-        )
+        return account.get_transactions_for_month(year, month)
+
+    def _get_month_periods(self, year: int, month: int) -> List[RatePeriod]:
+        """Returns the month's interest rate periods, cached until a rule changes"""
+        key = month_key(year, month)
+        periods = self._month_periods.get(key)
+        if periods is None:
+            first_day, last_day = month_bounds(year, month)
+            rules = self.interest_rules.rules_between_days(first_day, last_day)
+            periods = self._calculate_interest_periods(first_day, last_day, rules)
+            self._month_periods[key] = periods
+        return periods
 
     def _get_starting_balance(self, account: BankAccount, 
-                            year: int, month: int) -> Decimal:
+                            year: int, month: int) -> Money:
         """Calculates balance at start of month (end of previous month)"""
         prev_month = month - 1 if month > 1 else 12
         prev_year = year if month > 1 else year - 1
-        return account.calculate_balance_up_to(
-            self._get_last_day_of_month(prev_year, prev_month)
-        )
+        return account.get_month_end_balance(prev_year, prev_month)
 
     def _process_transactions(self, transactions: List[Transaction], 
-                            start_balance: Decimal) -> Tuple[Decimal, List[Dict]]:
+                            start_balance: Money) -> Tuple[Money, List[Dict]]:
         """Processes transactions and returns final balance with statement lines"""
         running_balance = start_balance
         statement_lines = []
@@ -136,90 +1021,56 @@ class BankService:
         
         return running_balance, statement_lines
 
-    def _calculate_interest_periods(self, start_date: datetime, end_date: datetime, 
-                                  rules: List[InterestRule]) -> List[Dict]:
-        """Calculates interest periods between dates based on rules"""
-        periods = []
-        current_date = start_date
-        
+    def _calculate_interest_periods(self, first_day: int, last_day: int,
+                                    rules: List[InterestRule]) -> List[RatePeriod]:
+        """Calculates (first day, last day, rate) periods between day ordinals based on rules"""
         # If no rules, use 0% for whole period
         if not rules:
-            return [{
-                'start': start_date,
-                'end': end_date,
-                'rate': Decimal('0')
-            }]
-        
+            return [(first_day, last_day, Decimal('0'))]
+
+        periods = []
+        current_day = first_day
         # Create periods between rule changes
-        for i in range(len(rules)):
-            rule = rules[i]
-            period_start = max(rule.date, current_date)
-            
+        for i, rule in enumerate(rules):
+            period_start = max(rule.date.toordinal(), current_day)
             if i < len(rules) - 1:
-                period_end = rules[i+1].date - timedelta(days=1)
+                period_end = rules[i + 1].date.toordinal() - 1
             else:
-                period_end = end_date
-                
+                period_end = last_day
             if period_start <= period_end:
-                periods.append({
-                    'start': period_start,
-                    'end': period_end,
-                    'rate': Decimal(str(rule.rate / 100))
-                })
-                current_date = period_end + timedelta(days=1)
-        
+                periods.append((period_start, period_end, Decimal(str(rule.rate / 100))))
+                current_day = period_end + 1
+
         # Add initial period if needed
-        if not periods or periods[0]['start'] > start_date:
-            initial_rate = Decimal(str(rules[0].rate / 100)) if rules else Decimal('0')
-            periods.insert(0, {
-                'start': start_date,
-                'end': periods[0]['start'] - timedelta(days=1) if periods else end_date,
-                'rate': initial_rate
-            })
-        
+        if not periods or periods[0][0] > first_day:
+            initial_end = periods[0][0] - 1 if periods else last_day
+            periods.insert(0, (first_day, initial_end, Decimal(str(rules[0].rate / 100))))
         return periods
 
-    def _calculate_interest(self, periods: List[Dict], 
-                          transactions: List[Transaction],
-                          starting_balance: Decimal) -> Decimal:
-        """Calculates interest for given periods and transactions"""
-        total_interest = Decimal('0')
-        current_balance = starting_balance
-        transaction_index = 0
-        
-        for period in periods:
-            period_start = period['start']
-            period_end = period['end']
-            rate = period['rate']
-            
-            # Process transactions during this period
-            while (transaction_index < len(transactions) and
-                   transactions[transaction_index].date <= period_end):
-                txn = transactions[transaction_index]
-                
-                if txn.date < period_start:
-                    transaction_index += 1
-                    continue
-                
-                # Calculate interest before this transaction
-                days_before = (txn.date - period_start).days
-                if days_before > 0:
-                    total_interest += current_balance * rate * Decimal(days_before) / Decimal('365')
-                
-                # Update balance with transaction
-                current_balance = txn.apply(current_balance)
-                period_start = txn.date
-                transaction_index += 1
-            
-            # Calculate interest for remaining days
-            days_remaining = (period_end - period_start).days + 1
-            if days_remaining > 0:
-                total_interest += current_balance * rate * Decimal(days_remaining) / Decimal('365')
-        
-        return total_interest.quantize(Decimal('0.00'))
+    def _calculate_interest(self, periods: List[RatePeriod],
+                          movements: List[Movement],
+                          starting_balance: Money) -> Money:
+        """Calculates interest for given periods and (day, signed cents) movements"""
+        if self._accrue_batch is accrue_interest_batch:
+            return accrue_interest(periods, movements, starting_balance.cents)
+        [(_, interest)] = self._accrue_batch(periods, [('', starting_balance.cents, movements)])
+        return interest
+
+    def _snapshot_month(self, account: BankAccount, year: int, month: int) -> AccountSnapshot:
+        """Returns the opening balance and movements the month's interest depends on"""
+        movements = account.get_movements_for_month(year, month)
+        return (account.account_id, self._get_starting_balance(account, year, month).cents,
+                movements)
+
+    def _calculate_indexed_interest(self, account: BankAccount,
+                                    periods: List[RatePeriod]) -> Money:
+        """Calculates interest from balance-day sums kept by the account's balance index"""
+        total_interest = Fraction(0)
+        for first_day, last_day, rate in periods:
+            balance_days = account.balance_index.balance_days(first_day, last_day)
+            total_interest += Fraction(rate) * balance_days
+        return round_cents(total_interest / 365)
 
     def _get_last_day_of_month(self, year: int, month: int) -> datetime:
         """Returns the last day of the specified month"""
-        if month == 12:
-            return datetime(year, 12, 31)
-        return datetime(year, month + 1, 1) - timedelta(days=1)
\ No newline at end of file
+        return get_last_day_of_month(year, month)
\ No newline at end of file
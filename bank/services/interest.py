@@ -0,0 +1,75 @@
+from decimal import Decimal
+from fractions import Fraction
+from typing import List, Sequence, Tuple
+
+from bank.models.money import Money, round_cents
+
+# (first day ordinal, last day ordinal, annual rate as a fraction)
+RatePeriod = Tuple[int, int, Decimal]
+# (day ordinal, signed amount in cents), sorted by day
+Movement = Tuple[int, int]
+# (account id, balance in cents before the first movement, movements)
+AccountSnapshot = Tuple[str, int, List[Movement]]
+
+def accrue_interest(periods: Sequence[RatePeriod], movements: Sequence[Movement],
+                    starting_balance: int) -> Money:
+    """Accrues interest on daily closing balances across rate periods.
+
+    Balance x days is summed in integer cents per period and scaled by the
+    exact period rate, so the only rounding is the final one to the cent.
+    """
+    total_interest = Fraction(0)
+    for (_, _, rate), balance_days in zip(
+            periods, period_balance_days(periods, movements, starting_balance)):
+        if balance_days:
+            total_interest += Fraction(rate) * balance_days
+    return round_cents(total_interest / 365)
+
+def period_balance_days(periods: Sequence[RatePeriod], movements: Sequence[Movement],
+                        starting_balance: int) -> List[int]:
+    """Sums each period's daily closing balances, in cents x days"""
+    sums = []
+    current_balance = starting_balance
+    index = 0
+
+    for period_start, period_end, _ in periods:
+        balance_days = 0
+        # Process movements during this period
+        while index < len(movements) and movements[index][0] <= period_end:
+            day, delta = movements[index]
+            index += 1
+            if day < period_start:
+                continue
+
+            balance_days += current_balance * (day - period_start)
+            current_balance += delta
+            period_start = day
+
+        balance_days += current_balance * (period_end - period_start + 1)
+        sums.append(balance_days)
+
+    return sums
+
+def allocate_cents(cents: int, weights: Sequence[Fraction]) -> List[int]:
+    """Splits cents in proportion to weights so the parts add up exactly.
+
+    Parts are rounded down and the cents left over go to the largest
+    remainders, earlier parts first on ties. Without any weight the whole
+    amount goes to the last part.
+    """
+    total = sum(weights)
+    if not total:
+        return [0] * (len(weights) - 1) + [cents]
+    sign = -1 if cents < 0 else 1
+    exact = [abs(cents) * Fraction(weight) / total for weight in weights]
+    parts = [int(share) for share in exact]
+    by_remainder = sorted(range(len(exact)), key=lambda i: exact[i] - parts[i], reverse=True)
+    for i in by_remainder[:abs(cents) - sum(parts)]:
+        parts[i] += 1
+    return [sign * part for part in parts]
+
+def accrue_interest_batch(periods: Sequence[RatePeriod],
+                          snapshots: Sequence[AccountSnapshot]) -> List[Tuple[str, Money]]:
+    """Accrues one month of interest for a shard of account snapshots"""
+    return [(account_id, accrue_interest(periods, movements, starting_balance))
+            for account_id, starting_balance, movements in snapshots]
@@ -0,0 +1,73 @@
+from decimal import Decimal
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+from bank.models.money import Money
+from bank.services.interest import AccountSnapshot, RatePeriod, accrue_interest_batch
+
+_INT64_MAX = np.iinfo(np.int64).max
+
+def accrue_interest_batch_numpy(periods: Sequence[RatePeriod],
+                                snapshots: Sequence[AccountSnapshot]) -> List[Tuple[str, Money]]:
+    """Accrues interest for a shard of accounts as one balance x rate dot product.
+
+    Daily closing balances are laid out as an (accounts x days) int64 matrix
+    of cents and each day's rate as an integer scaled by a power of ten, so
+    the result is exact and rounded to cents half-even like the Decimal
+    engine.
+    """
+    if not snapshots:
+        return []
+    first_day = periods[0][0]
+    days = periods[-1][1] - first_day + 1
+
+    scale = max(max(-rate.as_tuple().exponent, 0) for _, _, rate in periods)
+    scaled_rates = [_scaled(rate, scale) for _, _, rate in periods]
+    if max(abs(rate) for rate in scaled_rates) * days > _INT64_MAX:
+        # Rates this precise do not fit the int64 rate vector
+        return accrue_interest_batch(periods, snapshots)
+    daily_rates = np.zeros(days, dtype=np.int64)
+    for (start, end, _), rate in zip(periods, scaled_rates):
+        daily_rates[start - first_day:end - first_day + 1] = rate
+
+    # Every daily balance lies within opening +/- the month's total movement
+    if max(abs(opening) + sum(abs(delta) for _, delta in movements)
+           for _, opening, movements in snapshots) > _INT64_MAX:
+        # Balances this large do not fit the int64 matrix
+        return accrue_interest_batch(periods, snapshots)
+
+    rows, columns, deltas = [], [], []
+    for row, (_, _, movements) in enumerate(snapshots):
+        for day, delta in movements:
+            rows.append(row)
+            columns.append(day - first_day)
+            deltas.append(delta)
+    openings = np.array([opening for _, opening, _ in snapshots], dtype=np.int64)
+
+    changes = np.zeros((len(snapshots), days), dtype=np.int64)
+    np.add.at(changes, (np.array(rows, dtype=np.intp), np.array(columns, dtype=np.intp)),
+              np.array(deltas, dtype=np.int64))
+    balances = np.cumsum(changes, axis=1) + openings[:, None]
+
+    # Fall back to Python ints when the dot product could overflow int64
+    bound = int(np.abs(balances).max()) * int(daily_rates.sum())
+    if bound < _INT64_MAX:
+        numerators = balances @ daily_rates
+    else:
+        numerators = balances.astype(object) @ daily_rates.astype(object)
+
+    # cents = numerator / (365 * 10**scale), rounded half-even
+    divisor = 365 * 10 ** scale
+    results = []
+    for (account_id, _, _), numerator in zip(snapshots, numerators.tolist()):
+        quotient, remainder = divmod(numerator, divisor)
+        if 2 * remainder > divisor or (2 * remainder == divisor and quotient % 2):
+            quotient += 1
+        results.append((account_id, Money(quotient)))
+    return results
+
+def _scaled(rate: Decimal, scale: int) -> int:
+    """rate x 10**scale as an exact integer, however many digits the rate has"""
+    numerator, denominator = rate.as_integer_ratio()
+    return numerator * 10 ** scale // denominator
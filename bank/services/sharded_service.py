@@ -0,0 +1,220 @@
+import multiprocessing
+import threading
+import zlib
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+from bank.models.interest_rule import InterestRule
+from bank.models.money import Money
+from bank.models.rule_timeline import InterestRuleTimeline
+from bank.models.transaction import Transaction
+from bank.services.bank_service import BankService, InterestCorrection
+
+
+def shard_of(account_id: str, shards: int) -> int:
+    """Shard owning an account; crc32 keeps the mapping stable across processes"""
+    return zlib.crc32(account_id.encode("utf-8")) % shards
+
+def _serve_shard(connection, options: Dict):
+    """Worker loop: runs (method, args) requests against its own BankService"""
+    service = BankService(**options)
+    try:
+        while True:
+            request = connection.recv()
+            if request is None:
+                break
+            method, args = request
+            try:
+                connection.send((True, getattr(service, method)(*args)))
+            except Exception as e:  # handed back to the caller; the shard keeps serving
+                try:
+                    connection.send((False, e))
+                except Exception:
+                    connection.send((False, RuntimeError(f"{type(e).__name__}: {e}")))
+    finally:
+        service.close()
+        connection.close()
+
+class ShardedBankService:
+    """BankService API spread over worker processes, each owning a slice of the accounts.
+
+    Accounts are assigned to shards by a crc32 of their id, so every
+    operation on one account runs in the same process and gives the same
+    result as a single BankService. Interest rules are broadcast to every
+    shard and mirrored here for listing. Requests travel over pipes: single
+    calls pay a round trip each, while add_transactions_bulk,
+    get_account_statements and post_month_end_interest send one request to
+    every shard before collecting the replies, so the shards work in
+    parallel.
+
+    options are passed to each shard's BankService; they must be picklable,
+    so journals and repositories cannot be shared this way.
+    """
+
+    def __init__(self, shards: Optional[int] = None, **options):
+        shards = shards or multiprocessing.cpu_count()
+        if shards < 1:
+            raise ValueError("At least one shard is needed")
+        self.interest_rules = InterestRuleTimeline()
+        self._connections = []
+        self._processes = []
+        self._locks = [threading.Lock() for _ in range(shards)]
+        for index in range(shards):
+            parent, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=_serve_shard, args=(child, options),
+                                              name=f"bank-shard-{index}", daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            self._processes.append(process)
+
+    @property
+    def shards(self) -> int:
+        return len(self._connections)
+
+    def close(self):
+        """Stops the shard processes"""
+        for connection, process in zip(self._connections, self._processes):
+            if process.is_alive():
+                connection.send(None)
+            process.join()
+            connection.close()
+        self._connections, self._processes = [], []
+
+    def __enter__(self) -> 'ShardedBankService':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def add_transaction(self, account_id: str, date: Union[datetime, int],
+                        transaction_type: str, amount: Decimal) -> Transaction:
+        return self._call(account_id, 'add_transaction',
+                          account_id, date, transaction_type, amount)
+
+    def add_transactions_bulk(self, records: Iterable[Tuple[Union[datetime, int], str, str,
+                                                            Decimal]]
+                              ) -> List[Tuple[int, str]]:
+        """Splits (date, account_id, type, amount) records by shard and adds them in parallel.
+
+        Returns the rejected records' positions in records and their error
+        messages, ordered by position.
+        """
+        batches: Dict[int, List[Tuple]] = {}
+        positions: Dict[int, List[int]] = {}
+        for position, record in enumerate(records):
+            shard = shard_of(record[1], self.shards)
+            batches.setdefault(shard, []).append(record)
+            positions.setdefault(shard, []).append(position)
+        replies = self._call_each({shard: ('add_transactions_bulk', (batch,))
+                                   for shard, batch in batches.items()})
+        errors = [(positions[shard][index], message)
+                  for shard, shard_errors in replies.items() for index, message in shard_errors]
+        errors.sort()
+        return errors
+
+    def add_interest_rule(self, date: datetime, rule_id: str,
+                          rate: Decimal) -> List[InterestCorrection]:
+        """Adds or updates a rule on every shard; returns every shard's corrections"""
+        replies = self._call_each({shard: ('add_interest_rule', (date, rule_id, rate))
+                                   for shard in range(self.shards)})
+        self.interest_rules.upsert(InterestRule(date, rule_id, rate))
+        return [correction for shard in sorted(replies) for correction in replies[shard]]
+
+    def has_account(self, account_id: str) -> bool:
+        return self._call(account_id, 'has_account', account_id)
+
+    def get_account_statement(self, account_id: str, year: int, month: int) -> List[Dict]:
+        return self._call(account_id, 'get_account_statement', account_id, year, month)
+
+    def get_account_statements(self, account_ids: Iterable[str], year: int,
+                               month: int) -> Dict[str, List[Dict]]:
+        """Generates the month's statement for each account, all shards at once"""
+        by_shard: Dict[int, List[str]] = {}
+        for account_id in account_ids:
+            by_shard.setdefault(shard_of(account_id, self.shards), []).append(account_id)
+        replies = self._call_each({shard: ('get_account_statements', (ids, year, month))
+                                   for shard, ids in by_shard.items()})
+        statements = {}
+        for reply in replies.values():
+            statements.update(reply)
+        return statements
+
+    def calculate_interest_for_month(self, account_id: str, year: int, month: int) -> Money:
+        return self._call(account_id, 'calculate_interest_for_month', account_id, year, month)
+
+    def close_month(self, account_id: str, year: int, month: int) -> Money:
+        return self._call(account_id, 'close_month', account_id, year, month)
+
+    def post_interest(self, account_id: str, date: datetime, amount: Money) -> Transaction:
+        return self._call(account_id, 'post_interest', account_id, date, amount)
+
+    def post_month_end_interest(self, year: int, month: int) -> Dict[str, Money]:
+        """Closes the month on every shard in parallel; returns the positive amounts posted"""
+        # Each shard is already its own process, so it accrues in-process
+        replies = self._call_each({shard: ('post_month_end_interest', (year, month, 1))
+                                   for shard in range(self.shards)})
+        posted = {}
+        for reply in replies.values():
+            posted.update(reply)
+        return posted
+
+    def monthly_totals(self, year: int, month: int) -> Dict[str, Money]:
+        totals: Dict[str, Money] = {}
+        for reply in self._call_all('monthly_totals', year, month):
+            for name, amount in reply.items():
+                totals[name] = totals.get(name, Money(0)) + amount
+        return totals
+
+    def accounts_with_balance_above(self, amount: Union[Money, Decimal]
+                                    ) -> List[Tuple[str, Money]]:
+        return _ranked(self._call_all('accounts_with_balance_above', amount))
+
+    def top_accounts_by_balance(self, n: int) -> List[Tuple[str, Money]]:
+        # The overall top n are among each shard's top n
+        return _ranked(self._call_all('top_accounts_by_balance', n))[:n]
+
+    def top_accounts_by_interest(self, n: int) -> List[Tuple[str, Money]]:
+        return _ranked(self._call_all('top_accounts_by_interest', n))[:n]
+
+    def interest_by_rule(self) -> Dict[str, Money]:
+        totals: Dict[str, Money] = {}
+        for reply in self._call_all('interest_by_rule'):
+            for rule_id, amount in reply.items():
+                totals[rule_id] = totals.get(rule_id, Money(0)) + amount
+        return totals
+
+    def _call_all(self, method: str, *args) -> List:
+        replies = self._call_each({shard: (method, args) for shard in range(self.shards)})
+        return [replies[shard] for shard in sorted(replies)]
+
+    def _call(self, account_id: str, method: str, *args):
+        shard = shard_of(account_id, self.shards)
+        return self._call_each({shard: (method, args)})[shard]
+
+    def _call_each(self, requests: Dict[int, Tuple[str, Tuple]]) -> Dict:
+        """Sends every shard its request, then gathers the replies.
+
+        Shard locks are taken in index order so concurrent callers cannot
+        deadlock; the first error reply is raised once all replies are in.
+        """
+        shards = sorted(requests)
+        for shard in shards:
+            self._locks[shard].acquire()
+        try:
+            for shard in shards:
+                self._connections[shard].send(requests[shard])
+            replies = {shard: self._connections[shard].recv() for shard in shards}
+        finally:
+            for shard in shards:
+                self._locks[shard].release()
+        for ok, result in replies.values():
+            if not ok:
+                raise result
+        return {shard: result for shard, (_, result) in replies.items()}
+
+def _ranked(replies: List[List[Tuple[str, Money]]]) -> List[Tuple[str, Money]]:
+    """Merges per-shard (account id, amount) rankings, largest amount first"""
+    return sorted((pair for reply in replies for pair in reply),
+                  key=lambda pair: (-pair[1].cents, pair[0]))
@@ -0,0 +1,146 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Iterator, List, Optional, Sequence, Tuple
+
+from bank.models.transaction import Deposit, TRANSACTION_TYPES
+from bank.services.bank_service import BankService, StatementSnapshot
+from bank.services.interest import RatePeriod, accrue_interest
+from bank.utils.date_utils import format_day
+
+EXPORT_FORMATS = ('csv', 'text')
+DEFAULT_CHUNK_SIZE = 1_000
+OUTPUT_BUFFER_SIZE = 1 << 20
+CSV_HEADER = "account,date,txn_id,type,amount,balance\n"
+TEXT_HEADER = "| Date     | Txn Id      | Type | Amount | Balance |\n"
+
+class ExportReport:
+    def __init__(self):
+        self.accounts = 0
+        self.lines = 0
+
+def export_statements(bank_service: BankService, year: int, month: int, path: str,
+                      export_format: str = 'csv', per_account: bool = False,
+                      workers: Optional[int] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> ExportReport:
+    """Writes every account's statement for a month to path.
+
+    Accounts are read lazily in chunks of plain-value snapshots that a
+    process pool turns into formatted rows, at most two chunks per worker
+    in flight, so memory stays bounded however many accounts there are.
+    Output is written in account order, to one combined file or, with
+    per_account, one file per account in the path directory; an account id
+    that is not a plain file name raises ValueError. Rows match
+    get_account_statement; archived months are skipped.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError("Invalid export format")
+    periods = bank_service.month_rate_periods(year, month)
+    last_day = periods[-1][1]  # the periods cover the whole month
+    chunks = _snapshot_chunks(bank_service, year, month, chunk_size)
+    workers = workers or os.cpu_count() or 1
+
+    report = ExportReport()
+    output = None
+    if per_account:
+        os.makedirs(path, exist_ok=True)
+    else:
+        output = open(path, "w", encoding="utf-8", buffering=OUTPUT_BUFFER_SIZE)
+    try:
+        if output is not None and export_format == 'csv':
+            output.write(CSV_HEADER)
+        for statements in _format_chunks(chunks, periods, last_day, export_format, workers):
+            for account_id, text, lines in statements:
+                if output is not None:
+                    output.write(text)
+                else:
+                    extension = "csv" if export_format == 'csv' else "txt"
+                    with open(os.path.join(path, _account_file_name(account_id, extension)),
+                              "w", encoding="utf-8") as account_output:
+                        if export_format == 'csv':
+                            account_output.write(CSV_HEADER)
+                        account_output.write(text)
+                report.accounts += 1
+                report.lines += lines
+    finally:
+        if output is not None:
+            output.close()
+    return report
+
+def format_statements(periods: Sequence[RatePeriod], snapshots: Sequence[StatementSnapshot],
+                      last_day: int, export_format: str) -> List[Tuple[str, str, int]]:
+    """Builds (account id, formatted statement, line count) for a chunk of snapshots"""
+    format_line = _csv_line if export_format == 'csv' else _text_line
+    statements = []
+    for account_id, opening, entries, posted in snapshots:
+        rows = [] if export_format == 'csv' else [f"\nAccount: {account_id}\n", TEXT_HEADER]
+        balance = opening
+        lines = 0
+        # Last-day entries only show through the interest line, as on screen
+        for day, txn_id, code, cents in entries:
+            if day == last_day:
+                continue
+            balance += TRANSACTION_TYPES[code].sign * cents
+            rows.append(format_line(account_id, day, txn_id,
+                                    'D' if code == Deposit.code else 'W', cents, balance))
+            lines += 1
+        if entries:
+            if posted is None:
+                movements = [(day, TRANSACTION_TYPES[code].sign * cents)
+                             for day, _, code, cents in entries]
+                posted = accrue_interest(periods, movements, opening).cents
+            if posted > 0:
+                balance += posted
+                rows.append(format_line(account_id, last_day, '', 'I', posted, balance))
+                lines += 1
+        statements.append((account_id, "".join(rows), lines))
+    return statements
+
+def _account_file_name(account_id: str, extension: str) -> str:
+    """Returns an account's file name, rejecting ids that could leave the directory"""
+    if not account_id or '..' in account_id or any(c in account_id for c in '/\\\0'):
+        raise ValueError(f"Account id is not a valid file name: {account_id!r}")
+    return f"{account_id}.{extension}"
+
+def _snapshot_chunks(bank_service: BankService, year: int, month: int,
+                     chunk_size: int) -> Iterator[List[StatementSnapshot]]:
+    account_ids = bank_service.account_ids()
+    while True:
+        chunk = list(islice(account_ids, chunk_size))
+        if not chunk:
+            return
+        yield bank_service.statement_snapshots(chunk, year, month)
+
+def _format_chunks(chunks: Iterator[List[StatementSnapshot]], periods: List[RatePeriod],
+                   last_day: int, export_format: str,
+                   workers: int) -> Iterator[List[Tuple[str, str, int]]]:
+    """Formats chunks in order, in a process pool when there is more than one worker"""
+    if workers <= 1:
+        for chunk in chunks:
+            yield format_statements(periods, chunk, last_day, export_format)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(format_statements, periods, chunk, last_day,
+                                       export_format))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _format_amount(cents: int) -> str:
+    sign = "-" if cents < 0 else ""
+    whole, fraction = divmod(abs(cents), 100)
+    return f"{sign}{whole}.{fraction:02d}"
+
+def _csv_line(account_id: str, day: int, txn_id: str, txn_type: str, cents: int,
+              balance: int) -> str:
+    return (f"{account_id},{format_day(day)},{txn_id},{txn_type},"
+            f"{_format_amount(cents)},{_format_amount(balance)}\n")
+
+def _text_line(account_id: str, day: int, txn_id: str, txn_type: str, cents: int,
+               balance: int) -> str:
+    return (f"| {format_day(day)} | {txn_id:11} | {txn_type:4} | "
+            f"{_format_amount(cents):>6} | {_format_amount(balance):>7} |\n")
@@ -0,0 +1,64 @@
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import IO, Iterator, List, Tuple, Union
+
+from bank.services.bank_service import BankService
+from bank.utils.date_utils import parse_day
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+class LoadReport:
+    def __init__(self):
+        self.loaded = 0
+        self.errors: List[Tuple[int, str]] = []  # (line number, message)
+
+def load_transactions(bank_service: BankService, source: Union[str, IO[str]],
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> LoadReport:
+    """Streams <Date> <Account> <Type> <Amount> lines into the bank in chunks.
+
+    Fields may be separated by whitespace or commas. Only one chunk of rows
+    is held in memory at a time; bad lines are reported and skipped.
+    """
+    if isinstance(source, str):
+        with open(source, encoding="utf-8") as stream:
+            return load_transactions(bank_service, stream, chunk_size)
+
+    report = LoadReport()
+    rows = _parse_lines(source, report)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        line_numbers = [line_number for line_number, _ in chunk]
+        errors = bank_service.add_transactions_bulk(record for _, record in chunk)
+        for position, message in errors:
+            report.errors.append((line_numbers[position], message))
+        report.loaded += len(chunk) - len(errors)
+    report.errors.sort()
+    return report
+
+def _parse_lines(stream: IO[str], report: LoadReport) -> Iterator[Tuple[int, Tuple]]:
+    """Yields (line number, record) for each well-formed line"""
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            parts = line.split(",") if "," in line else line.split()
+            if len(parts) != 4:
+                raise ValueError("Invalid input format")
+
+            date_str, account_id, txn_type, amount_str = (p.strip() for p in parts)
+            day = parse_day(date_str)
+            try:
+                amount = Decimal(amount_str)
+            except InvalidOperation:
+                raise ValueError("Invalid amount")
+            if not amount.is_finite():
+                raise ValueError("Invalid amount")
+            if amount <= 0:
+                raise ValueError("Amount must be positive")
+        except ValueError as e:
+            report.errors.append((line_number, str(e)))
+            continue
+        yield line_number, (day, account_id, txn_type, amount)
@@ -0,0 +1,141 @@
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from bank.models.account import BankAccount
+from bank.models.ledger import TransactionLedger, transaction_sequence
+from bank.models.money import Money
+from bank.models.transaction import TRANSACTION_TYPES, Transaction
+from bank.storage.sqlite_repository import SqliteRepository, entry_cents
+
+# Rough per-account cost of the objects around the ledger columns
+ACCOUNT_OVERHEAD = 1024
+
+class CachedAccount(BankAccount):
+    """BankAccount that remembers the entries not yet written back to the repository"""
+
+    def __init__(self, account_id: str, indexed_balances: bool = False):
+        super().__init__(account_id, indexed_balances)
+        self.unsaved: List[Tuple[int, int, int, int]] = []
+        self.unsaved_close = False
+
+    def add_transaction(self, transaction: Transaction):
+        super().add_transaction(transaction)
+        self.unsaved.append((transaction.date.toordinal(), transaction.code,
+                             transaction.amount.cents, transaction_sequence(transaction)))
+
+    def add_entry(self, day: int, code: int, cents: int, sequence: int):
+        super().add_entry(day, code, cents, sequence)
+        self.unsaved.append((day, code, cents, sequence))
+
+    def close_through(self, key: int):
+        super().close_through(key)
+        self.unsaved_close = True
+
+    def memory_usage(self) -> int:
+        return self.ledger.memory_usage() + ACCOUNT_OVERHEAD
+
+class AccountCache(Mapping):
+    """LRU cache of fully loaded accounts in front of a SqliteRepository.
+
+    An account missing from the cache is loaded from the repository into an
+    in-memory ledger. Once more than max_accounts accounts or max_bytes of
+    ledger memory are cached, the least recently used accounts are evicted
+    and their new entries written back. Sizes are re-measured each time an
+    account is fetched, so the budget may be exceeded by the entries posted
+    since.
+    """
+
+    def __init__(self, repository: SqliteRepository, max_accounts: Optional[int] = None,
+                 max_bytes: Optional[int] = None, indexed_balances: bool = False):
+        if max_accounts is None and max_bytes is None:
+            raise ValueError("Account cache needs a size or memory budget")
+        self.repository = repository
+        self.max_accounts = max_accounts
+        self.max_bytes = max_bytes
+        self.indexed_balances = indexed_balances
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._accounts: 'OrderedDict[str, CachedAccount]' = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._total_bytes = 0
+
+    def __getitem__(self, account_id: str) -> CachedAccount:
+        account = self._accounts.get(account_id)
+        if account is not None:
+            self.hits += 1
+            self._accounts.move_to_end(account_id)
+        else:
+            self.misses += 1
+            if not self.repository.has_account(account_id):
+                raise KeyError(account_id)
+            account = self._load(account_id)
+            self._accounts[account_id] = account
+        self._resize(account)
+        self._evict()
+        return account
+
+    def __contains__(self, account_id) -> bool:
+        return account_id in self._accounts or self.repository.has_account(account_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return self.repository.account_ids()
+
+    def __len__(self) -> int:
+        return self.repository.account_count()
+
+    @property
+    def memory_usage(self) -> int:
+        """Estimated bytes held by the cached accounts"""
+        return self._total_bytes
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'accounts': len(self._accounts), 'bytes': self._total_bytes}
+
+    def create(self, account_id: str) -> CachedAccount:
+        """Adds a new empty account to the repository and the cache"""
+        self.repository.create_account(account_id)
+        account = self._accounts[account_id] = CachedAccount(account_id, self.indexed_balances)
+        self._resize(account)
+        self._evict()
+        return account
+
+    def flush(self):
+        """Writes back every cached account's new entries and commits them"""
+        for account in self._accounts.values():
+            self._write_back(account)
+        self.repository.flush()
+
+    def _load(self, account_id: str) -> CachedAccount:
+        ledger = TransactionLedger(account_id)
+        for day, code, delta, sequence in self.repository.all_entries(account_id):
+            ledger.insert_entry(day, code, entry_cents(code, delta), sequence)
+        return CachedAccount.from_ledger(ledger, Money(self.repository.balance(account_id)),
+                                         self.indexed_balances,
+                                         self.repository.closed_through(account_id))
+
+    def _resize(self, account: CachedAccount):
+        size = account.memory_usage()
+        self._total_bytes += size - self._sizes.get(account.account_id, 0)
+        self._sizes[account.account_id] = size
+
+    def _evict(self):
+        # The most recently used account is never evicted
+        while len(self._accounts) > 1 and (
+                (self.max_accounts is not None and len(self._accounts) > self.max_accounts)
+                or (self.max_bytes is not None and self._total_bytes > self.max_bytes)):
+            account_id, account = self._accounts.popitem(last=False)
+            self._total_bytes -= self._sizes.pop(account_id)
+            self._write_back(account)
+            self.evictions += 1
+
+    def _write_back(self, account: CachedAccount):
+        for day, code, cents, sequence in account.unsaved:
+            self.repository.add_entry(account.account_id, day, code,
+                                      TRANSACTION_TYPES[code].sign * cents, sequence)
+        account.unsaved.clear()
+        if account.unsaved_close:
+            self.repository.close_through(account.account_id, account.closed_through)
+            account.unsaved_close = False
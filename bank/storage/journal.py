@@ -0,0 +1,198 @@
+import mmap
+import os
+import struct
+import threading
+import time
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterator, Tuple
+
+TRANSACTION_RECORD = 1
+RULE_RECORD = 2
+COMPACT_RECORD = 3
+CLOSE_RECORD = 4
+
+# kind, transaction code, rate exponent, pad, day ordinal, sequence, cents or rate mantissa, key
+_RECORD = struct.Struct('<BbbxiIq32s')
+RECORD_SIZE = _RECORD.size
+KEY_SIZE = 32
+
+DEFAULT_GROUP_SIZE = 512
+DEFAULT_MAX_DELAY = 0.05  # seconds
+
+class Journal:
+    """Append-only log of fixed-width binary records with group-commit fsync.
+
+    A durable journal's append returns only once its record is fsynced: the
+    first appender writes every pending record, and appenders arriving
+    during that fsync wait and are committed together by the next one.
+    Otherwise append is write-behind: records are buffered and written with
+    a single fsync once group_size records are pending or, by a background
+    timer if no later append does it, max_delay seconds after the oldest
+    pending record, so a crash can lose up to max_delay of appended records.
+    sync() forces a commit. A torn record left at the end of the file by a
+    crash is dropped when the journal is opened.
+    """
+
+    def __init__(self, path: str, group_size: int = DEFAULT_GROUP_SIZE,
+                 max_delay: float = DEFAULT_MAX_DELAY, durable: bool = False):
+        self.path = path
+        self.group_size = group_size
+        self.max_delay = max_delay
+        self.durable = durable
+        self._file = open(path, 'ab')
+        size = self._file.seek(0, os.SEEK_END)
+        if size % RECORD_SIZE:
+            self._file.truncate(size - size % RECORD_SIZE)
+        self._committed = size // RECORD_SIZE
+        self._pending = bytearray()
+        self._pending_count = 0
+        self._writing = 0  # records being written and fsynced outside the lock
+        self._last_commit = time.monotonic()
+        self._lock = threading.Lock()
+        self._committed_cond = threading.Condition(self._lock)
+        self._timer = None
+
+    @property
+    def record_count(self) -> int:
+        """Number of records appended so far, committed or not"""
+        return self._committed + self._writing + self._pending_count
+
+    def append(self, record: bytes):
+        """Queues a packed record for the next group commit, waiting for it if durable"""
+        with self._lock:
+            self._pending += record
+            self._pending_count += 1
+            if self.durable:
+                position = self.record_count
+                while self._committed < position:
+                    if self._writing:
+                        self._committed_cond.wait()
+                    else:
+                        self._commit()
+            elif (self._pending_count >= self.group_size
+                    or time.monotonic() - self._last_commit >= self.max_delay):
+                self._commit()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.max_delay, self._commit_due)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def sync(self):
+        """Writes and fsyncs every pending record"""
+        with self._lock:
+            self._commit()
+
+    def _commit_due(self):
+        with self._lock:
+            if not self._file.closed:
+                self._commit()
+
+    def _commit(self):
+        """Writes and fsyncs the pending records; called with the lock held"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        while self._writing:
+            self._committed_cond.wait()
+        if self._pending:
+            pending, self._writing = bytes(self._pending), self._pending_count
+            self._pending.clear()
+            self._pending_count = 0
+            # Appends go on queueing the next group while this one is fsynced
+            self._lock.release()
+            try:
+                self._file.write(pending)
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException:
+                self._lock.acquire()
+                # Put the group back in front, so it is retried by the next commit
+                self._pending[:0] = pending
+                self._pending_count += self._writing
+                self._writing = 0
+                self._committed_cond.notify_all()
+                raise
+            self._lock.acquire()
+            self._committed += self._writing
+            self._writing = 0
+            self._committed_cond.notify_all()
+        self._last_commit = time.monotonic()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._file.close()
+
+def read_journal(path: str, start: int = 0) -> Iterator[Tuple]:
+    """Yields decoded records from a memory-mapped journal without copying the file.
+
+    Transaction records are (TRANSACTION_RECORD, account_id, day, code,
+    cents, sequence); rule records are (RULE_RECORD, rule_id, date, rate);
+    compaction and month-close records are (COMPACT_RECORD or CLOSE_RECORD,
+    account_id, last day of the month).
+    Records before index start are skipped.
+    """
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        size -= size % RECORD_SIZE
+        if size <= start * RECORD_SIZE:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            view = memoryview(mapped)
+            records = view[start * RECORD_SIZE:size]
+            try:
+                yield from iter_records(records)
+            finally:
+                # The mapping can only be closed once no buffer exports remain
+                records.release()
+                view.release()
+
+def iter_records(buffer) -> Iterator[Tuple]:
+    """Decodes packed records from any buffer holding a whole number of them"""
+    unpacked = _RECORD.iter_unpack(buffer)
+    keys: Dict[bytes, str] = {}
+    try:
+        for kind, code, exponent, day, sequence, value, raw_key in unpacked:
+            key = keys.get(raw_key)
+            if key is None:
+                key = keys[raw_key] = raw_key.rstrip(b'\0').decode('utf-8')
+            if kind == TRANSACTION_RECORD:
+                yield (kind, key, day, code, value, sequence)
+            elif kind == RULE_RECORD:
+                yield (kind, key, datetime.fromordinal(day), Decimal(f"{value}e{exponent}"))
+            elif kind in (COMPACT_RECORD, CLOSE_RECORD):
+                yield (kind, key, day)
+            else:
+                raise ValueError(f"Unknown journal record kind {kind}")
+    finally:
+        del unpacked
+
+def pack_transaction(account_id: str, day: int, code: int, cents: int, sequence: int) -> bytes:
+    try:
+        return _RECORD.pack(TRANSACTION_RECORD, code, 0, day, sequence, cents,
+                            _encode_key(account_id))
+    except struct.error:
+        raise ValueError("Transaction does not fit a journal record")
+
+def pack_rule(day: int, rule_id: str, rate: Decimal) -> bytes:
+    sign, digits, exponent = rate.as_tuple()
+    try:
+        mantissa = int(''.join(map(str, digits))) * (-1 if sign else 1)
+        return _RECORD.pack(RULE_RECORD, 0, exponent, day, 0, mantissa, _encode_key(rule_id))
+    except (struct.error, TypeError):
+        raise ValueError("Interest rule does not fit a journal record")
+
+def pack_compaction(account_id: str, day: int) -> bytes:
+    return _RECORD.pack(COMPACT_RECORD, 0, 0, day, 0, 0, _encode_key(account_id))
+
+def pack_close(account_id: str, day: int) -> bytes:
+    return _RECORD.pack(CLOSE_RECORD, 0, 0, day, 0, 0, _encode_key(account_id))
+
+def _encode_key(key: str) -> bytes:
+    encoded = key.encode('utf-8')
+    if len(encoded) > KEY_SIZE or b'\0' in encoded:
+        raise ValueError(f"ID must be at most {KEY_SIZE} bytes for the journal")
+    return encoded
@@ -0,0 +1,142 @@
+import os
+import struct
+import sys
+import threading
+from array import array
+from typing import Callable, ContextManager, List, Optional, Tuple
+
+from bank.models.account import BankAccount
+from bank.models.ledger import TransactionLedger
+from bank.models.money import Money
+from bank.storage.journal import RECORD_SIZE, iter_records, pack_rule
+
+_MAGIC = b'BANKSNP2'
+# magic, little-endian columns flag, journal records covered, account count, rule count
+_HEADER = struct.Struct('<8s?qII')
+# key length, balance cents, closed-through month (-1 for none), entries,
+# checkpoint-through month (-1 for none), checkpoints, month nets, stale months
+_ACCOUNT = struct.Struct('<HqqIqIII')
+_COLUMN_TYPECODES = ('i', 'q', 'b', 'I', 'q')
+
+class SnapshotView:
+    """Point-in-time copy of a bank's state that can be written without blocking writers"""
+
+    def __init__(self, journal_position: int,
+                 accounts: List[Tuple[str, int, Optional[int], TransactionLedger]],
+                 rules: List[bytes]):
+        self.journal_position = journal_position
+        self.accounts = accounts
+        self.rules = rules
+
+def capture(bank_service) -> SnapshotView:
+    """Copies the bank's state; ledgers are duplicated column by column with memcpy"""
+    position = 0
+    if bank_service.journal is not None:
+        bank_service.journal.sync()
+        position = bank_service.journal.record_count
+    accounts = [(account.account_id, account.balance.cents, account.closed_through,
+                 account.ledger.copy())
+                for account in bank_service.accounts.values()]
+    rules = [pack_rule(rule.date.toordinal(), rule.rule_id, rule.rate)
+             for rule in bank_service.interest_rules]
+    return SnapshotView(position, accounts, rules)
+
+def write_snapshot(view: SnapshotView, path: str):
+    """Writes a captured view and atomically replaces any previous snapshot at path"""
+    temp_path = path + '.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(_HEADER.pack(_MAGIC, sys.byteorder == 'little', view.journal_position,
+                             len(view.accounts), len(view.rules)))
+        for rule in view.rules:
+            f.write(rule)
+        for account_id, balance, closed_through, ledger in view.accounts:
+            columns, month_net, checkpoints, stale_months, through = ledger.export_state()
+            key = account_id.encode('utf-8')
+            f.write(_ACCOUNT.pack(len(key), balance,
+                                  -1 if closed_through is None else closed_through, len(ledger),
+                                  -1 if through is None else through,
+                                  len(checkpoints), len(month_net), len(stale_months)))
+            f.write(key)
+            for column in columns:
+                column.tofile(f)
+            for table in (checkpoints, month_net):
+                array('q', table.keys()).tofile(f)
+                array('q', table.values()).tofile(f)
+            array('q', stale_months).tofile(f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_path, path)
+
+def take_snapshot(bank_service, path: str, background: bool = False,
+                  exclusive: Optional[Callable[[], ContextManager]] = None
+                  ) -> Optional[threading.Thread]:
+    """Captures the bank's state and writes it, optionally from a background thread.
+
+    exclusive returns a context manager that keeps other threads from
+    changing the bank while it is captured. With one, a background snapshot
+    also captures on its own thread, so the caller never waits for it.
+    """
+    def capture_and_write():
+        with exclusive():
+            view = capture(bank_service)
+        write_snapshot(view, path)
+
+    if exclusive is not None:
+        if not background:
+            capture_and_write()
+            return None
+        thread = threading.Thread(target=capture_and_write, name="bank-snapshot")
+    else:
+        view = capture(bank_service)
+        if not background:
+            write_snapshot(view, path)
+            return None
+        thread = threading.Thread(target=write_snapshot, args=(view, path), name="bank-snapshot")
+    thread.start()
+    return thread
+
+def load_snapshot(bank_service, path: str) -> int:
+    """Loads a snapshot into an empty service; returns the journal records it covers"""
+    with open(path, 'rb') as f:
+        data = memoryview(f.read())
+    magic, little_endian, position, account_count, rule_count = _HEADER.unpack_from(data)
+    if magic != _MAGIC:
+        raise ValueError("Not a bank snapshot")
+    swap = little_endian != (sys.byteorder == 'little')
+    offset = _HEADER.size
+
+    rules_end = offset + rule_count * RECORD_SIZE
+    for _, rule_id, date, rate in iter_records(data[offset:rules_end]):
+        bank_service.add_interest_rule(date, rule_id, rate, correct_closed_months=False)
+    offset = rules_end
+
+    def read_array(typecode: str, count: int) -> array:
+        nonlocal offset
+        column = array(typecode)
+        end = offset + count * column.itemsize
+        column.frombytes(data[offset:end])
+        if swap:
+            column.byteswap()
+        offset = end
+        return column
+
+    indexed = bank_service.balance_engine == 'fenwick'
+    for _ in range(account_count):
+        (key_length, balance, closed_through, entries, through, checkpoint_count,
+         month_count, stale_count) = _ACCOUNT.unpack_from(data, offset)
+        offset += _ACCOUNT.size
+        account_id = bytes(data[offset:offset + key_length]).decode('utf-8')
+        offset += key_length
+
+        columns = tuple(read_array(typecode, entries) for typecode in _COLUMN_TYPECODES)
+        tables = []
+        for count in (checkpoint_count, month_count):
+            keys = read_array('q', count)
+            tables.append(dict(zip(keys, read_array('q', count))))
+        stale_months = set(read_array('q', stale_count))
+
+        ledger = TransactionLedger.from_state(account_id, columns, tables[1], tables[0],
+                                              stale_months, None if through < 0 else through)
+        bank_service.accounts[account_id] = BankAccount.from_ledger(
+            ledger, Money(balance), indexed, None if closed_through < 0 else closed_through)
+    return position
@@ -0,0 +1,273 @@
+import sqlite3
+from collections.abc import Mapping
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple
+
+from bank.models.interest_rule import InterestRule
+from bank.models.ledger import (format_transaction_id, month_first_day, month_key,
+                               transaction_sequence)
+from bank.models.money import Money
+from bank.models.transaction import TRANSACTION_TYPES, Transaction
+
+DEFAULT_BATCH_SIZE = 10_000
+STATEMENT_CACHE_SIZE = 64
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS accounts (
+    account_id TEXT PRIMARY KEY,
+    balance_cents INTEGER NOT NULL DEFAULT 0,
+    closed_through INTEGER  -- month key of the latest closed month
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS accounts_closed ON accounts (closed_through)
+    WHERE closed_through IS NOT NULL;
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    account_id TEXT NOT NULL,
+    day INTEGER NOT NULL,
+    code INTEGER NOT NULL,
+    delta INTEGER NOT NULL,
+    sequence INTEGER NOT NULL
+);
+-- Covers month slicing, same-day counts and balance sums; the implicit
+-- trailing id keeps same-day entries in arrival order
+CREATE INDEX IF NOT EXISTS transactions_account_day ON transactions (account_id, day, delta);
+CREATE TABLE IF NOT EXISTS interest_rules (
+    day INTEGER PRIMARY KEY,
+    rule_id TEXT NOT NULL,
+    rate TEXT NOT NULL
+);
+"""
+
+# Statements are kept as constants so the connection's statement cache prepares each once
+_INSERT_ACCOUNT = "INSERT OR IGNORE INTO accounts (account_id) VALUES (?)"
+_SELECT_ACCOUNT = "SELECT 1 FROM accounts WHERE account_id = ?"
+_SELECT_ACCOUNT_IDS = ("SELECT account_id FROM accounts WHERE account_id > ? "
+                       "ORDER BY account_id LIMIT ?")
+_COUNT_ACCOUNTS = "SELECT COUNT(*) FROM accounts"
+_SELECT_BALANCE = "SELECT balance_cents FROM accounts WHERE account_id = ?"
+_UPDATE_BALANCE = "UPDATE accounts SET balance_cents = balance_cents + ? WHERE account_id = ?"
+_INSERT_TRANSACTION = ("INSERT INTO transactions (account_id, day, code, delta, sequence) "
+                       "VALUES (?, ?, ?, ?, ?)")
+_SELECT_ENTRIES = ("SELECT day, code, delta, sequence FROM transactions "
+                   "WHERE account_id = ? AND day >= ? AND day < ? ORDER BY day, id")
+_SELECT_MOVEMENTS = ("SELECT day, delta FROM transactions "
+                     "WHERE account_id = ? AND day >= ? AND day < ? ORDER BY day, id")
+_COUNT_ON_DAY = "SELECT COUNT(*) FROM transactions WHERE account_id = ? AND day = ?"
+_SUM_BEFORE = ("SELECT COALESCE(SUM(delta), 0) FROM transactions "
+               "WHERE account_id = ? AND day < ?")
+_SELECT_CLOSED_THROUGH = "SELECT closed_through FROM accounts WHERE account_id = ?"
+_UPDATE_CLOSED_THROUGH = ("UPDATE accounts SET closed_through = ? WHERE account_id = ? "
+                          "AND (closed_through IS NULL OR closed_through < ?)")
+_SELECT_CLOSED_ACCOUNTS = "SELECT account_id FROM accounts WHERE closed_through >= ?"
+_SELECT_RULES = "SELECT day, rule_id, rate FROM interest_rules ORDER BY day"
+_UPSERT_RULE = "INSERT OR REPLACE INTO interest_rules (day, rule_id, rate) VALUES (?, ?, ?)"
+
+_MAX_DAY = datetime.max.toordinal() + 1
+
+def entry_cents(code: int, delta: int) -> int:
+    """Returns the ledger amount of a stored signed delta, undoing its type's sign"""
+    return TRANSACTION_TYPES[code].sign * delta
+
+class SqliteRepository:
+    """Accounts, transactions and interest rules kept in a SQLite database.
+
+    Writes run inside an open SQLite transaction that is committed every
+    batch_size writes and on flush() or close(); reads on the same
+    connection already see uncommitted writes. Ledger queries are range
+    scans or aggregates over the (account_id, day) index, so only the rows
+    a request needs are loaded into memory.
+    """
+
+    def __init__(self, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(path, cached_statements=STATEMENT_CACHE_SIZE)
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.execute("PRAGMA synchronous = NORMAL")
+        self.connection.executescript(_SCHEMA)
+        self.accounts = SqliteAccounts(self)
+        self._pending_writes = 0
+
+    def create_account(self, account_id: str) -> 'SqliteAccount':
+        self.connection.execute(_INSERT_ACCOUNT, (account_id,))
+        self._wrote()
+        return SqliteAccount(self, account_id)
+
+    def has_account(self, account_id: str) -> bool:
+        return self.connection.execute(_SELECT_ACCOUNT, (account_id,)).fetchone() is not None
+
+    def account_ids(self) -> Iterator[str]:
+        # Page by key so writes made while iterating cannot disturb an open cursor
+        last = ""
+        while True:
+            rows = self.connection.execute(_SELECT_ACCOUNT_IDS, (last, self.batch_size)).fetchall()
+            for (account_id,) in rows:
+                yield account_id
+            if len(rows) < self.batch_size:
+                return
+            last = rows[-1][0]
+
+    def account_count(self) -> int:
+        return self.connection.execute(_COUNT_ACCOUNTS).fetchone()[0]
+
+    def balance(self, account_id: str) -> int:
+        """Returns the account's current balance in cents"""
+        return self.connection.execute(_SELECT_BALANCE, (account_id,)).fetchone()[0]
+
+    def add_entry(self, account_id: str, day: int, code: int, delta: int, sequence: int):
+        """Stores a transaction given as (day ordinal, type code, signed cents, sequence)"""
+        self.connection.execute(_INSERT_TRANSACTION, (account_id, day, code, delta, sequence))
+        self.connection.execute(_UPDATE_BALANCE, (delta, account_id))
+        self._wrote()
+
+    def entries(self, account_id: str, start_day: int, end_day: int) -> List[Tuple[int, int, int, int]]:
+        """Returns (day, code, signed cents, sequence) of entries dated in [start_day, end_day)"""
+        return self.connection.execute(_SELECT_ENTRIES, (account_id, start_day, end_day)).fetchall()
+
+    def all_entries(self, account_id: str) -> List[Tuple[int, int, int, int]]:
+        return self.entries(account_id, 0, _MAX_DAY)
+
+    def movements(self, account_id: str, start_day: int, end_day: int) -> List[Tuple[int, int]]:
+        """Returns (day, signed cents) of entries dated in [start_day, end_day)"""
+        return self.connection.execute(_SELECT_MOVEMENTS, (account_id, start_day, end_day)).fetchall()
+
+    def count_on_day(self, account_id: str, day: int) -> int:
+        return self.connection.execute(_COUNT_ON_DAY, (account_id, day)).fetchone()[0]
+
+    def balance_before(self, account_id: str, day: int) -> int:
+        """Returns the sum in cents of every entry dated before day"""
+        return self.connection.execute(_SUM_BEFORE, (account_id, day)).fetchone()[0]
+
+    def closed_through(self, account_id: str) -> Optional[int]:
+        """Returns the month key of the account's latest closed month"""
+        return self.connection.execute(_SELECT_CLOSED_THROUGH, (account_id,)).fetchone()[0]
+
+    def close_through(self, account_id: str, key: int):
+        """Closes the account's months up to the keyed one, never reopening later ones"""
+        self.connection.execute(_UPDATE_CLOSED_THROUGH, (key, account_id, key))
+        self._wrote()
+
+    def accounts_closed_from(self, key: int) -> List[str]:
+        """Returns the accounts closed through the keyed month or a later one"""
+        return [account_id for (account_id,)
+                in self.connection.execute(_SELECT_CLOSED_ACCOUNTS, (key,))]
+
+    def load_rules(self) -> List[InterestRule]:
+        return [InterestRule(datetime.fromordinal(day), rule_id, Decimal(rate))
+                for day, rule_id, rate in self.connection.execute(_SELECT_RULES)]
+
+    def save_rule(self, rule: InterestRule):
+        """Stores a rule, replacing any rule effective on the same day"""
+        self.connection.execute(_UPSERT_RULE, (rule.date.toordinal(), rule.rule_id, str(rule.rate)))
+        self._wrote()
+
+    def flush(self):
+        """Commits every pending write"""
+        self.connection.commit()
+        self._pending_writes = 0
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def _wrote(self):
+        self._pending_writes += 1
+        if self._pending_writes >= self.batch_size:
+            self.flush()
+
+class SqliteAccounts(Mapping):
+    """Mapping view of the repository's accounts, loaded on access"""
+
+    def __init__(self, repository: SqliteRepository):
+        self._repository = repository
+
+    def __getitem__(self, account_id: str) -> 'SqliteAccount':
+        if not self._repository.has_account(account_id):
+            raise KeyError(account_id)
+        return SqliteAccount(self._repository, account_id)
+
+    def __contains__(self, account_id) -> bool:
+        return self._repository.has_account(account_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return self._repository.account_ids()
+
+    def __len__(self) -> int:
+        return self._repository.account_count()
+
+    def create(self, account_id: str) -> 'SqliteAccount':
+        return self._repository.create_account(account_id)
+
+class SqliteAccount:
+    """BankAccount counterpart whose ledger queries run against the repository"""
+    balance_index = None
+
+    def __init__(self, repository: SqliteRepository, account_id: str):
+        self.account_id = account_id
+        self._repository = repository
+
+    @property
+    def balance(self) -> Money:
+        return Money(self._repository.balance(self.account_id))
+
+    @property
+    def transactions(self) -> List[Transaction]:
+        return self._build(self._repository.all_entries(self.account_id))
+
+    @property
+    def closed_through(self) -> Optional[int]:
+        return self._repository.closed_through(self.account_id)
+
+    def close_through(self, key: int):
+        self._repository.close_through(self.account_id, key)
+
+    archived_through = None
+
+    def add_transaction(self, transaction: Transaction):
+        closed_through = self.closed_through
+        if (closed_through is not None
+                and month_key(transaction.date.year, transaction.date.month) <= closed_through):
+            raise ValueError("Month is closed")
+        transaction.apply(self.balance)
+        self._repository.add_entry(self.account_id, transaction.date.toordinal(), transaction.code,
+                                   transaction.signed_cents, transaction_sequence(transaction))
+
+    def add_entry(self, day: int, code: int, cents: int, sequence: int):
+        """Adds an already validated entry given as ledger columns"""
+        self._repository.add_entry(self.account_id, day, code,
+                                   TRANSACTION_TYPES[code].sign * cents, sequence)
+
+    def get_transactions_for_month(self, year: int, month: int) -> List[Transaction]:
+        return self._build(self._repository.entries(self.account_id, *self._month_days(year, month)))
+
+    def get_transactions_between(self, start_date: datetime, end_date: datetime) -> List[Transaction]:
+        return self._build(self._repository.entries(
+            self.account_id, start_date.toordinal(), end_date.toordinal() + 1))
+
+    def get_movements_for_month(self, year: int, month: int) -> List[Tuple[int, int]]:
+        return self._repository.movements(self.account_id, *self._month_days(year, month))
+
+    def get_movements_between(self, start_date: datetime, end_date: datetime) -> List[Tuple[int, int]]:
+        return self._repository.movements(self.account_id, start_date.toordinal(),
+                                          end_date.toordinal() + 1)
+
+    def count_transactions_on(self, date: datetime) -> int:
+        return self._repository.count_on_day(self.account_id, date.toordinal())
+
+    def get_month_end_balance(self, year: int, month: int) -> Money:
+        return Money(self._repository.balance_before(self.account_id,
+                                                     self._month_days(year, month)[1]))
+
+    def calculate_balance_up_to(self, date: datetime) -> Money:
+        return Money(self._repository.balance_before(self.account_id, date.toordinal() + 1))
+
+    def _month_days(self, year: int, month: int) -> Tuple[int, int]:
+        key = month_key(year, month)
+        return month_first_day(key), month_first_day(key + 1)
+
+    def _build(self, rows: List[Tuple[int, int, int, int]]) -> List[Transaction]:
+        return [TRANSACTION_TYPES[code](self.account_id, datetime.fromordinal(day),
+                                        Money(entry_cents(code, delta)),
+                                        format_transaction_id(day, sequence))
+                for day, code, delta, sequence in rows]
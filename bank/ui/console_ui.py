@@ -1,12 +1,15 @@
 from datetime import datetime
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
+from typing import IO, Iterable, Optional, Tuple
 from bank.models.transaction import Interest
 from bank.services.bank_service import BankService
-from bank.utils.date_utils import parse_date
+from bank.utils.date_utils import format_date, parse_date, parse_day
 
 class BankConsoleUI:
-    def __init__(self, bank_service: BankService):
+    def __init__(self, bank_service: BankService, output: Optional[IO[str]] = None):
         self.bank_service = bank_service
+        # Statements and script errors go here; None means sys.stdout
+        self.output = output
     
     def run(self):
         print("Welcome to AwesomeGIC Bank! What would you like to do?")
@@ -39,18 +42,8 @@ class BankConsoleUI:
                 break
             
             try:
-                parts = input_str.split()
-                if len(parts) != 4:
-                    raise ValueError("Invalid input format")
-                
-                date_str, account_id, txn_type, amount_str = parts
-                date = self._parse_date(date_str)
-                amount = Decimal(amount_str)
-                
-                if amount <= 0:
-                    raise ValueError("Amount must be positive")
-                
-                transaction = self.bank_service.add_transaction(account_id, date, txn_type, amount)
+                account_id, day, txn_type, amount = self._parse_transaction(input_str.split())
+                transaction = self.bank_service.add_transaction(account_id, day, txn_type, amount)
                 self._print_account_transactions(account_id)
                 break
             except ValueError as e:
@@ -65,17 +58,7 @@ class BankConsoleUI:
                 break
             
             try:
-                parts = input_str.split()
-                if len(parts) != 3:
-                    raise ValueError("Invalid input format")
-                
-                date_str, rule_id, rate_str = parts
-                date = self._parse_date(date_str)
-                rate = Decimal(rate_str)
-                
-                if not (0 < rate < 100):
-                    raise ValueError("Rate must be between 0 and 100")
-                
+                date, rule_id, rate = self._parse_rule(input_str.split())
                 self.bank_service.add_interest_rule(date, rule_id, rate)
                 self._print_interest_rules()
                 break
@@ -91,70 +74,121 @@ class BankConsoleUI:
                 break
             
             try:
-                parts = input_str.split()
-                if len(parts) != 2:
-                    raise ValueError("Invalid input format")
-                
-                account_id, month_str = parts
-                if len(month_str) != 6 or not month_str.isdigit():
-                    raise ValueError("Month should be in YYYYMM format")
-                
-                year = int(month_str[:4])
-                month = int(month_str[4:6])
-                
-                if account_id not in self.bank_service.accounts:
-                    raise ValueError("Account not found")
-                
-                interest = self.bank_service.calculate_interest_for_month(account_id, year, month)
-                last_day = datetime(year, month, 
-                                   self.bank_service._get_last_day_of_month(year, month).day)
-                interest_transaction = Interest(account_id, last_day, interest)
-                self.bank_service.accounts[account_id].add_transaction(interest_transaction)
-                
+                account_id, year, month = self._parse_statement_request(input_str.split())
                 self._print_monthly_statement(account_id, year, month)
                 break
             except ValueError as e:
                 print(f"Error: {str(e)}. Please try again.")
     
+    def run_script(self, script: Iterable[str]):
+        """Runs T, I and P commands non-interactively, one per line.
+
+        Lines look like "T <Date> <Account> <Type> <Amount>",
+        "I <Date> <RuleId> <Rate in %>" or "P <Account> <Year><Month>"; blank
+        lines and lines starting with # are skipped. Only statements and
+        errors are printed, so transactions and rules are not echoed back.
+        A bad line is reported with its line number and the script goes on.
+        """
+        for line_number, line in enumerate(script, start=1):
+            parts = line.split()
+            if not parts or parts[0].startswith('#'):
+                continue
+            command, args = parts[0].upper(), parts[1:]
+            try:
+                if command == 'T':
+                    self.bank_service.add_transaction(*self._parse_transaction(args))
+                elif command == 'I':
+                    self.bank_service.add_interest_rule(*self._parse_rule(args))
+                elif command == 'P':
+                    self._print_monthly_statement(*self._parse_statement_request(args))
+                else:
+                    raise ValueError("Invalid command")
+            except ValueError as e:
+                print(f"Error: {str(e)} (line {line_number})", file=self.output)
+
+    def _parse_transaction(self, parts) -> Tuple[str, int, str, Decimal]:
+        """Parses <Date> <Account> <Type> <Amount> into add_transaction arguments"""
+        if len(parts) != 4:
+            raise ValueError("Invalid input format")
+        
+        date_str, account_id, txn_type, amount_str = parts
+        day = parse_day(date_str)
+        amount = self._parse_decimal(amount_str, "Invalid amount")
+        
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+        return account_id, day, txn_type, amount
+
+    def _parse_rule(self, parts) -> Tuple[datetime, str, Decimal]:
+        """Parses <Date> <RuleId> <Rate in %> into add_interest_rule arguments"""
+        if len(parts) != 3:
+            raise ValueError("Invalid input format")
+        
+        date_str, rule_id, rate_str = parts
+        date = parse_date(date_str)
+        rate = self._parse_decimal(rate_str, "Invalid rate")
+        
+        if not (0 < rate < 100):
+            raise ValueError("Rate must be between 0 and 100")
+        return date, rule_id, rate
+
+    def _parse_statement_request(self, parts) -> Tuple[str, int, int]:
+        """Parses <Account> <Year><Month> for an existing account"""
+        if len(parts) != 2:
+            raise ValueError("Invalid input format")
+        
+        account_id, month_str = parts
+        if len(month_str) != 6 or not month_str.isdigit():
+            raise ValueError("Month should be in YYYYMM format")
+        
+        year = int(month_str[:4])
+        month = int(month_str[4:6])
+        
+        if account_id not in self.bank_service.accounts:
+            raise ValueError("Account not found")
+        return account_id, year, month
+
+    def _parse_decimal(self, value: str, message: str) -> Decimal:
+        try:
+            number = Decimal(value)
+        except InvalidOperation:
+            raise ValueError(message)
+        if not number.is_finite():
+            raise ValueError(message)
+        return number
+
     def _print_account_transactions(self, account_id: str):
         account = self.bank_service.accounts[account_id]
         print(f"\nAccount: {account_id}")
         print("| Date     | Txn Id      | Type | Amount |")
-        for txn in sorted(account.transactions, key=lambda t: t.date):
+        for txn in account.transactions:
             if isinstance(txn, Interest):
                 continue  # Skip interest transactions in this view
-            print(f"| {txn.date.strftime('%Y%m%d')} | {txn.transaction_id} | {txn.__class__.__name__[0]}    | {txn.amount:7.2f} |")
+            print(f"| {format_date(txn.date)} | {txn.transaction_id} | {txn.__class__.__name__[0]}    | {txn.amount:7.2f} |")
         print()
     
     def _print_interest_rules(self):
         print("\nInterest rules:")
         print("| Date     | RuleId | Rate (%) |")
         for rule in self.bank_service.interest_rules:
-            print(f"| {rule.date.strftime('%Y%m%d')} | {rule.rule_id:6} | {rule.rate:8.2f} |")
+            print(f"| {format_date(rule.date)} | {rule.rule_id:6} | {rule.rate:8.2f} |")
         print()
     
     def _print_monthly_statement(self, account_id: str, year: int, month: int):
         statement_lines = self.bank_service.get_account_statement(account_id, year, month)
         
-        print(f"\nAccount: {account_id}")
-        print("| Date     | Txn Id      | Type | Amount | Balance |")
+        print(f"\nAccount: {account_id}", file=self.output)
+        print("| Date     | Txn Id      | Type | Amount | Balance |", file=self.output)
         
         for line in statement_lines:
             print(
-                f"| {line['date'].strftime('%Y%m%d')} | "
+                f"| {format_date(line['date'])} | "
                 f"{line['txn_id']:11} | "
                 f"{line['type']:4} | "
                 f"{line['amount']:6.2f} | "
-                f"{line['balance']:7.2f} |"
+                f"{line['balance']:7.2f} |",
+                file=self.output
             )
-            
-    def _parse_date(self, date_str: str) -> datetime:
-        if len(date_str) != 8 or not date_str.isdigit():
-            raise ValueError("Date should be in YYYYMMDD format")
-        year = int(date_str[:4])
-        month = int(date_str[4:6])
-        day = int(date_str[6:8])
-        return datetime(year, month, day)
 
 # Main entry point
 if __name__ == "__main__":
@@ -0,0 +1,243 @@
+import asyncio
+import json
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal, InvalidOperation
+from typing import Callable, Dict, List, Optional, Set, Tuple, Union
+
+from bank.services.bank_service import BankService
+from bank.utils.date_utils import format_date, parse_date, parse_day
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_MAX_BATCH = 256
+# Pending connections the listening socket queues before refusing more
+DEFAULT_BACKLOG = 4096
+
+class BankServer:
+    """asyncio front-end serving a BankService over newline-delimited JSON.
+
+    Each request is a JSON object with an "op" and an optional "id" that is
+    echoed back; requests on one connection may be pipelined and are
+    answered as they complete:
+
+        {"id": 1, "op": "transaction", "date": "20230626", "account": "AC001",
+         "type": "D", "amount": "100.00"}
+        {"id": 2, "op": "rule", "date": "20230615", "rule_id": "RULE03", "rate": "2.20"}
+        {"id": 3, "op": "statement", "account": "AC001", "month": "202306"}
+        {"id": 4, "op": "close_month", "account": "AC001", "month": "202306"}
+
+    Responses are {"id": ..., "ok": true, "result": ...} or
+    {"id": ..., "ok": false, "error": "..."}. Requests for one account run
+    in arrival order through that account's queue, and posts that arrive
+    together are coalesced into one executor job; a rule waits for every
+    request queued before it. Every service call runs on the executor, so
+    the event loop only parses and routes requests.
+    """
+
+    def __init__(self, bank_service: BankService, executor: Optional[ThreadPoolExecutor] = None,
+                 max_batch: int = DEFAULT_MAX_BATCH):
+        if not bank_service.thread_safe:
+            raise ValueError("The server needs a thread-safe BankService")
+        self.bank_service = bank_service
+        self.executor = executor or ThreadPoolExecutor(thread_name_prefix="bank-server")
+        self.max_batch = max_batch
+        self.posts = 0
+        self.batches = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        # Each job is a post's (date, type, amount) or a call to run on its own
+        self._queues: Dict[str, List[Tuple[Union[Tuple, Callable], asyncio.Future]]] = {}
+        self._draining = set()
+        self._pending: Set[asyncio.Future] = set()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = 0,
+                    backlog: int = DEFAULT_BACKLOG) -> asyncio.AbstractServer:
+        self._server = await asyncio.start_server(self.handle_client, host, port, backlog=backlog)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+        self.executor.shutdown(wait=True)
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(self._respond(line, writer))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+        except ConnectionError:
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def handle_request(self, request: Dict) -> Dict:
+        """Runs one decoded request and returns its response object"""
+        response = {'id': request.get('id')}
+        try:
+            op = request.get('op')
+            if op == 'transaction':
+                result = await self._post_transaction(request)
+            elif op == 'rule':
+                result = await self._add_rule(request)
+            elif op == 'statement':
+                result = await self._statement(request)
+            elif op == 'close_month':
+                result = await self._close_month(request)
+            else:
+                raise ValueError("Unknown operation")
+            response.update(ok=True, result=result)
+        except (ValueError, KeyError, TypeError, InvalidOperation) as e:
+            message = f"Missing field {e}" if isinstance(e, KeyError) else str(e) or "Invalid request"
+            response.update(ok=False, error=message)
+        except Exception:
+            # Anything else is the server's fault; the request still gets its answer
+            response.update(ok=False, error="Internal error")
+        return response
+
+    async def _respond(self, line: bytes, writer: asyncio.StreamWriter):
+        try:
+            request = json.loads(line)
+            if not isinstance(request, dict):
+                raise ValueError
+        except ValueError:
+            response = {'id': None, 'ok': False, 'error': "Invalid JSON"}
+        else:
+            response = await self.handle_request(request)
+        writer.write(json.dumps(response).encode() + b"\n")
+        await writer.drain()
+
+    async def _post_transaction(self, request: Dict) -> Dict:
+        account_id = request['account']
+        day = parse_day(request['date'])
+        amount = Decimal(request['amount'])
+        if amount <= 0:
+            raise ValueError("Amount must be positive")
+
+        transaction = await self._enqueue(account_id, (day, request['type'], amount))
+        return {'transaction_id': transaction.transaction_id}
+
+    def _enqueue(self, account_id: str, job: Union[Tuple, Callable]) -> asyncio.Future:
+        """Queues a job behind the account's earlier requests and returns its future"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queues.setdefault(account_id, []).append((job, future))
+        self._pending.add(future)
+        future.add_done_callback(self._pending.discard)
+        if account_id not in self._draining:
+            self._draining.add(account_id)
+            loop.create_task(self._drain(account_id))
+        return future
+
+    async def _drain(self, account_id: str):
+        """Runs an account's queued jobs in order, one executor job per batch of posts"""
+        loop = asyncio.get_running_loop()
+        try:
+            # Yield once so posts arriving in the same loop pass join the batch
+            await asyncio.sleep(0)
+            while account_id in self._queues:
+                queue = self._queues.pop(account_id)
+                size = 1
+                if not callable(queue[0][0]):
+                    while (size < min(len(queue), self.max_batch)
+                           and not callable(queue[size][0])):
+                        size += 1
+                batch, rest = queue[:size], queue[size:]
+                if rest:
+                    self._queues[account_id] = rest
+                try:
+                    if callable(batch[0][0]):
+                        results = [await loop.run_in_executor(self.executor, batch[0][0])]
+                    else:
+                        results = await loop.run_in_executor(
+                            self.executor, self._post_batch, account_id,
+                            [record for record, _ in batch])
+                        self.batches += 1
+                        self.posts += len(batch)
+                except Exception as e:
+                    # The job never ran, so every request waiting on it fails
+                    results = [e] * len(batch)
+                for (_, future), result in zip(batch, results):
+                    if future.done():
+                        continue
+                    if isinstance(result, Exception):
+                        future.set_exception(result)
+                    else:
+                        future.set_result(result)
+        finally:
+            self._draining.discard(account_id)
+
+    def _post_batch(self, account_id: str, records: List[Tuple]) -> List:
+        results = []
+        for day, transaction_type, amount in records:
+            try:
+                results.append(self.bank_service.add_transaction(
+                    account_id, day, transaction_type, amount))
+            except Exception as e:  # fails that post only, not the rest of the batch
+                results.append(e)
+        return results
+
+    async def _add_rule(self, request: Dict) -> List[Dict]:
+        date = parse_date(request['date'])
+        rate = Decimal(request['rate'])
+        if not (0 < rate < 100):
+            raise ValueError("Rate must be between 0 and 100")
+        if self._pending:
+            # Requests that arrived before the rule are answered as they were sent
+            await asyncio.wait(set(self._pending))
+        await self._run(self.bank_service.add_interest_rule, date, request['rule_id'], rate)
+        return [{'date': format_date(rule.date), 'rule_id': rule.rule_id,
+                 'rate': f"{rule.rate:.2f}"} for rule in self.bank_service.interest_rules]
+
+    async def _statement(self, request: Dict) -> List[Dict]:
+        year, month = self._parse_month(request['month'])
+        account_id = request['account']
+        lines = await self._enqueue(account_id, partial(
+            self.bank_service.get_account_statement, account_id, year, month))
+        return [{'date': format_date(line['date']), 'txn_id': line['txn_id'],
+                 'type': line['type'], 'amount': f"{line['amount']:.2f}",
+                 'balance': f"{line['balance']:.2f}"} for line in lines]
+
+    async def _close_month(self, request: Dict) -> Dict:
+        year, month = self._parse_month(request['month'])
+        account_id = request['account']
+        interest = await self._enqueue(account_id, partial(
+            self.bank_service.close_month, account_id, year, month))
+        return {'interest': f"{interest:.2f}"}
+
+    async def _run(self, function, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    def _parse_month(self, month_str: str) -> Tuple[int, int]:
+        if len(month_str) != 6 or not month_str.isdigit():
+            raise ValueError("Month should be in YYYYMM format")
+        return int(month_str[:4]), int(month_str[4:6])
+
+def serve(bank_service: BankService, host: str = DEFAULT_HOST, port: int = 0):
+    """Runs a BankServer until interrupted"""
+    async def run():
+        server = BankServer(bank_service)
+        await server.start(host, port)
+        print(f"Serving on {host}:{server.port}", flush=True)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(run())
+    except KeyboardInterrupt:
+        pass
@@ -1,11 +1,73 @@
-from datetime import datetime, timedelta
+from datetime import datetime
+from functools import lru_cache
+from typing import Tuple
 
-def parse_date(date_str: str) -> datetime:
+# Dates are handled internally as proleptic Gregorian day ordinals
+# (datetime.toordinal()); datetime objects are built only for presentation.
+
+_DAYS_IN_MONTH = (31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31)
+
+def month_key(year: int, month: int) -> int:
+    return year * 12 + month - 1
+
+@lru_cache(maxsize=4096)
+def month_first_day(key: int) -> int:
+    """Returns the day ordinal of the first day of the keyed month"""
+    year, month0 = divmod(key, 12)
+    return datetime(year, month0 + 1, 1).toordinal()
+
+@lru_cache(maxsize=65536)
+def day_month_key(day: int) -> int:
+    """Returns the month key of a day ordinal"""
+    date = datetime.fromordinal(day)
+    return month_key(date.year, date.month)
+
+def is_month_end(day: int) -> bool:
+    return day_month_key(day + 1) != day_month_key(day)
+
+def days_in_month(year: int, month: int) -> int:
+    if month == 2 and year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
+        return 29
+    return _DAYS_IN_MONTH[month - 1]
+
+@lru_cache(maxsize=4096)
+def month_bounds(year: int, month: int) -> Tuple[int, int]:
+    """Returns the first and last day ordinals of a month"""
+    if not 1 <= month <= 12:
+        raise ValueError("month must be in 1..12")
+    first = month_first_day(month_key(year, month))
+    return first, first + days_in_month(year, month) - 1
+
+@lru_cache(maxsize=65536)
+def parse_day(date_str: str) -> int:
+    """Parses YYYYMMDD into a day ordinal without building a datetime"""
+    # Cached: input dates repeat heavily
     if len(date_str) != 8 or not date_str.isdigit():
         raise ValueError("Date should be in YYYYMMDD format")
-    return datetime(int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8]))
+    year, month, day = int(date_str[:4]), int(date_str[4:6]), int(date_str[6:8])
+    if not year:
+        raise ValueError(f"year {year} is out of range")
+    first, last = month_bounds(year, month)
+    if not 1 <= day <= last - first + 1:
+        raise ValueError("day is out of range for month")
+    return first + day - 1
+
+@lru_cache(maxsize=65536)
+def day_date(day: int) -> datetime:
+    # Cached: datetimes are immutable and shared by every entry on the day
+    return datetime.fromordinal(day)
+
+def parse_date(date_str: str) -> datetime:
+    return day_date(parse_day(date_str))
+
+@lru_cache(maxsize=65536)
+def format_day(day: int) -> str:
+    """Formats a day ordinal as YYYYMMDD"""
+    date = datetime.fromordinal(day)
+    return f"{date.year:04d}{date.month:02d}{date.day:02d}"
+
+def format_date(date: datetime) -> str:
+    return format_day(date.toordinal())
 
 def get_last_day_of_month(year: int, month: int) -> datetime:
-    if month == 12:
-        return datetime(year, 12, 31)
-    return datetime(year, month + 1, 1) - timedelta(days=1)
\ No newline at end of file
+    return datetime.fromordinal(month_bounds(year, month)[1])
@@ -0,0 +1,80 @@
+import threading
+from contextlib import contextmanager
+from typing import Hashable
+
+DEFAULT_STRIPES = 64
+
+class StripedLock:
+    """Fixed pool of reentrant locks picked by key hash, so unrelated keys rarely contend"""
+
+    def __init__(self, stripes: int = DEFAULT_STRIPES):
+        self._locks = [threading.RLock() for _ in range(stripes)]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    def index(self, key: Hashable) -> int:
+        return hash(key) % len(self._locks)
+
+    def __call__(self, key: Hashable) -> threading.RLock:
+        return self._locks[self.index(key)]
+
+class ReadWriteLock:
+    """Many concurrent readers or one writer, with waiting writers served first.
+
+    Both modes are reentrant, and a thread holding the write lock may also
+    read. Upgrading a read lock to a write lock would deadlock and raises
+    RuntimeError instead.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._waiting_writers = 0
+        self._writer = None
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self):
+        depth = getattr(self._local, 'reads', 0)
+        if depth or self._writer == threading.get_ident():
+            self._local.reads = depth + 1
+            try:
+                yield
+            finally:
+                self._local.reads = depth
+            return
+        with self._condition:
+            while self._writer is not None or self._waiting_writers:
+                self._condition.wait()
+            self._readers += 1
+        self._local.reads = 1
+        try:
+            yield
+        finally:
+            self._local.reads = 0
+            with self._condition:
+                self._readers -= 1
+                if not self._readers:
+                    self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        if self._writer == me:
+            yield
+            return
+        if getattr(self._local, 'reads', 0):
+            raise RuntimeError("Cannot upgrade a read lock to a write lock")
+        with self._condition:
+            self._waiting_writers += 1
+            while self._writer is not None or self._readers:
+                self._condition.wait()
+            self._waiting_writers -= 1
+            self._writer = me
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._writer = None
+                self._condition.notify_all()
@@ -0,0 +1,211 @@
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter as Tally
+from functools import wraps
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Latency samples kept per summary for percentiles
+DEFAULT_RESERVOIR_SIZE = 1024
+QUANTILES = (0.5, 0.9, 0.99)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: int = 1):
+        self.value += amount
+
+class Summary:
+    """Count and sum of observations, with percentiles from a uniform reservoir sample"""
+
+    def __init__(self, reservoir_size: int = DEFAULT_RESERVOIR_SIZE):
+        self.count = 0
+        self.sum = 0.0
+        self._reservoir: List[float] = []
+        self._reservoir_size = reservoir_size
+        self._random = random.Random(0)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        if len(self._reservoir) < self._reservoir_size:
+            self._reservoir.append(value)
+        else:
+            slot = self._random.randrange(self.count)
+            if slot < self._reservoir_size:
+                self._reservoir[slot] = value
+
+    def quantile(self, q: float) -> float:
+        if not self._reservoir:
+            return 0.0
+        ordered = sorted(self._reservoir)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+class MetricsRegistry:
+    """In-process counters, summaries and gauges, dumped as JSON or Prometheus text.
+
+    Metrics are created on first use and identified by name plus labels.
+    Updates take the registry lock, so threads may share a registry. A
+    registry only costs anything once something is instrumented with it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, Labels], Counter] = {}
+        self._summaries: Dict[Tuple[str, Labels], Summary] = {}
+        self._gauges: Dict[Tuple[str, Labels], Callable[[], float]] = {}
+        self._help: Dict[str, str] = {}
+
+    def counter(self, name: str, help_text: str = "", **labels) -> Counter:
+        return self._get(self._counters, Counter, name, help_text, labels)
+
+    def summary(self, name: str, help_text: str = "", **labels) -> Summary:
+        return self._get(self._summaries, Summary, name, help_text, labels)
+
+    def gauge(self, name: str, function: Callable[[], float], help_text: str = "", **labels):
+        """Registers a value read from function whenever the registry is dumped"""
+        with self._lock:
+            self._gauges[(name, _labels(labels))] = function
+            self._help.setdefault(name, help_text)
+
+    def inc(self, counter: Counter, amount: int = 1):
+        with self._lock:
+            counter.inc(amount)
+
+    def observe(self, summary: Summary, value: float):
+        with self._lock:
+            summary.observe(value)
+
+    def timed(self, function: Callable, name: str, **labels) -> Callable:
+        """Wraps function to record its latency in seconds in a summary"""
+        summary = self.summary(name, "Call latency in seconds", **labels)
+        clock = time.perf_counter
+
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            started = clock()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.observe(summary, clock() - started)
+        return wrapper
+
+    def instrument(self, target, methods: Iterable[str], name: str = "bank_call_seconds"):
+        """Replaces target's bound methods with timed ones, labelled by method name"""
+        for method in methods:
+            setattr(target, method, self.timed(getattr(target, method), name, method=method))
+
+    def to_json(self) -> Dict:
+        with self._lock:
+            return {
+                'counters': [_entry(name, labels, value=c.value)
+                             for (name, labels), c in self._counters.items()],
+                'summaries': [_entry(name, labels, count=s.count, sum=s.sum,
+                                     quantiles={str(q): s.quantile(q) for q in QUANTILES})
+                              for (name, labels), s in self._summaries.items()],
+                'gauges': [_entry(name, labels, value=function())
+                           for (name, labels), function in self._gauges.items()],
+            }
+
+    def dump_json(self) -> str:
+        return json.dumps(self.to_json(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Renders the text exposition format"""
+        lines = []
+        with self._lock:
+            self._render(lines, 'counter', self._counters,
+                         lambda name, labels, c: [f"{name}{_format(labels)} {c.value}"])
+            self._render(lines, 'summary', self._summaries, _summary_lines)
+            self._render(lines, 'gauge', self._gauges,
+                         lambda name, labels, function: [f"{name}{_format(labels)} {function()}"])
+        return "\n".join(lines) + "\n"
+
+    def _get(self, metrics: Dict, factory, name: str, help_text: str, labels: Dict):
+        key = (name, _labels(labels))
+        metric = metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = metrics.setdefault(key, factory())
+                self._help.setdefault(name, help_text)
+        return metric
+
+    def _render(self, lines: List[str], kind: str, metrics: Dict, render):
+        seen = set()
+        for (name, labels), metric in sorted(metrics.items(), key=lambda item: item[0]):
+            if name not in seen:
+                seen.add(name)
+                if self._help.get(name):
+                    lines.append(f"# HELP {name} {self._help[name]}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.extend(render(name, labels, metric))
+
+class SamplingProfiler:
+    """Samples every thread's current function at a fixed interval into a registry.
+
+    Each sample increments profile_samples_total labelled with the sampled
+    file, line and function, so hot spots show up next to the latency
+    metrics. Runs on a daemon thread between start() and stop().
+    """
+
+    def __init__(self, registry: MetricsRegistry, interval: float = 0.005):
+        self.registry = registry
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="metrics-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> 'SamplingProfiler':
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            samples = Tally()
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id != me:
+                    code = frame.f_code
+                    samples[(code.co_filename, str(frame.f_lineno), code.co_name)] += 1
+            for (filename, line, function), count in samples.items():
+                self.registry.inc(self.registry.counter(
+                    "profile_samples_total", "Sampled stack tops",
+                    file=filename, line=line, function=function), count)
+
+def _labels(labels: Dict) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+def _format(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"') for _, value in pairs)
+    return "{" + ",".join(f'{key}="{value}"' for (key, _), value in zip(pairs, escaped)) + "}"
+
+def _entry(name: str, labels: Labels, **fields) -> Dict:
+    return {'name': name, 'labels': dict(labels), **fields}
+
+def _summary_lines(name: str, labels: Labels, summary: Summary) -> List[str]:
+    lines = [f"{name}{_format(labels, (('quantile', str(q)),))} {summary.quantile(q)}"
+             for q in QUANTILES]
+    lines.append(f"{name}_sum{_format(labels)} {summary.sum}")
+    lines.append(f"{name}_count{_format(labels)} {summary.count}")
+    return lines
@@ -0,0 +1,39 @@
+"""Seeded generators for synthetic banks of any size."""
+import random
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterator, List, Tuple
+
+def account_ids(accounts: int) -> List[str]:
+    return [f"AC{i:07d}" for i in range(accounts)]
+
+def transactions(count: int, accounts: int, start: datetime, days: int,
+                 seed: int) -> Iterator[Tuple[datetime, str, str, Decimal]]:
+    """Yields (date, account_id, type, amount) records in date order.
+
+    About a third are withdrawals, and a withdrawal never exceeds its
+    account's balance, so every record can be posted.
+    """
+    rng = random.Random(seed)
+    ids = account_ids(accounts)
+    balances = [0] * accounts
+    first_day = start.toordinal()
+    for i in range(count):
+        date = datetime.fromordinal(first_day + i * days // count)
+        index = rng.randrange(accounts)
+        cents = rng.randrange(1, 100_000)
+        if rng.random() < 0.35 and balances[index] >= cents:
+            balances[index] -= cents
+            yield date, ids[index], "W", Decimal(cents).scaleb(-2)
+        else:
+            balances[index] += cents
+            yield date, ids[index], "D", Decimal(cents).scaleb(-2)
+
+def interest_rules(count: int, start: datetime, days: int,
+                   seed: int) -> List[Tuple[datetime, str, Decimal]]:
+    """Returns (date, rule_id, rate) rules on distinct days, with rates in (0, 10)"""
+    rng = random.Random(seed)
+    offsets = sorted(rng.sample(range(days), min(count, days)))
+    return [(start + timedelta(days=offset), f"RULE{i:04d}",
+             Decimal(rng.randrange(1, 1000)).scaleb(-2))
+            for i, offset in enumerate(offsets)]
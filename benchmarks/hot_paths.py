@@ -0,0 +1,196 @@
+"""Times the BankService hot paths on a synthetic bank and compares runs.
+
+    python -m benchmarks.hot_paths --transactions 1000000 --output baseline.json
+    python -m benchmarks.hot_paths --transactions 1000000 --compare baseline.json
+
+Each benchmark is run --repeat times and reported by its median; the
+spread between runs is kept as its noise, and a comparison only reports a
+slowdown larger than both the threshold and the noise of either side.
+"""
+import argparse
+import json
+import platform
+import random
+import resource
+import statistics
+import sys
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from benchmarks import generators
+from bank.services.bank_service import BankService
+
+START = datetime(2021, 1, 1)
+DAYS = 730
+# Months fully covered by the generated transactions
+MONTHS = [(2021 + m // 12, m % 12 + 1) for m in range(DAYS // 31)]
+METRICS = ('p50_us', 'p90_us', 'p99_us', 'max_us', 'ops_per_sec')
+
+def summarize(latencies: List[float], elapsed: Optional[float] = None,
+              operations: Optional[int] = None) -> Dict[str, float]:
+    """Latency percentiles in microseconds and throughput in operations per second"""
+    ordered = sorted(latencies)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1e6
+
+    elapsed = sum(latencies) if elapsed is None else elapsed
+    operations = len(latencies) if operations is None else operations
+    return {'samples': len(latencies), 'p50_us': percentile(0.50),
+            'p90_us': percentile(0.90), 'p99_us': percentile(0.99),
+            'max_us': ordered[-1] * 1e6, 'ops_per_sec': operations / elapsed}
+
+def time_calls(call: Callable[[int], object], samples: int) -> List[float]:
+    latencies = []
+    for i in range(samples):
+        started = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - started)
+    return latencies
+
+def peak_memory_kb() -> int:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+def run(transactions: int, accounts: int, rules: int, samples: int, seed: int) -> Dict:
+    rng = random.Random(seed)
+    # Memoization off, so repeated statements measure the computation itself
+    service = BankService(result_cache_size=0)
+    for date, rule_id, rate in generators.interest_rules(rules, START, DAYS, seed):
+        service.add_interest_rule(date, rule_id, rate)
+
+    # Records are generated as they are loaded, so this includes generating them
+    started = time.perf_counter()
+    service.add_transactions_bulk(generators.transactions(transactions, accounts, START, DAYS,
+                                                          seed))
+    results = {'add_transactions_bulk': summarize([time.perf_counter() - started],
+                                                  operations=transactions)}
+    ids = generators.account_ids(accounts)
+
+    def random_month_call(method):
+        def call(_):
+            year, month = rng.choice(MONTHS)
+            method(rng.choice(ids), year, month)
+        return call
+
+    # New activity lands after the generated history, so no month is closed
+    latest = datetime.fromordinal(START.toordinal() + DAYS + 1)
+    results['add_transaction'] = summarize(time_calls(
+        lambda _: service.add_transaction(rng.choice(ids), latest, "D", 1), samples))
+    results['get_account_statement'] = summarize(time_calls(
+        random_month_call(service.get_account_statement), samples))
+    results['calculate_interest_for_month'] = summarize(time_calls(
+        random_month_call(service.calculate_interest_for_month), samples))
+
+    rule_dates = generators.interest_rules(samples, START, DAYS, seed + 1)
+    results['add_interest_rule'] = summarize(time_calls(
+        lambda i: service.add_interest_rule(*rule_dates[i % len(rule_dates)]),
+        min(samples, len(rule_dates))))
+
+    year, month = MONTHS[-1]
+    started = time.perf_counter()
+    statements = service.get_account_statements(ids, year, month)
+    elapsed = time.perf_counter() - started
+    results['bank_wide_statements'] = summarize(
+        [elapsed], elapsed, sum(len(lines) for lines in statements.values()))
+
+    return {'config': {'transactions': transactions, 'accounts': accounts, 'rules': rules,
+                       'samples': samples, 'seed': seed},
+            'python': platform.python_version(), 'peak_memory_kb': peak_memory_kb(),
+            'results': results}
+
+def run_repeated(repeats: int, transactions: int, accounts: int, rules: int, samples: int,
+                 seed: int) -> Dict:
+    """Runs the benchmarks repeats times and keeps each metric's median and spread.
+
+    A metric's noise is its max - min over the runs, relative to the median.
+    """
+    reports = [run(transactions, accounts, rules, samples, seed) for _ in range(repeats)]
+    report = reports[-1]
+    for name, result in report['results'].items():
+        noise = {}
+        for metric in METRICS:
+            values = [r['results'][name][metric] for r in reports]
+            median = statistics.median(values)
+            result[metric] = median
+            noise[metric] = (max(values) - min(values)) / median if median else 0.0
+        result['noise'] = noise
+    report['config']['repeat'] = repeats
+    return report
+
+def compare(baseline: Dict, current: Dict, threshold: float) -> List[str]:
+    """Returns a message for each benchmark that got slower beyond threshold and noise.
+
+    A metric is only reported when it moved by more than threshold and by
+    more than the run-to-run noise recorded on either side.
+    """
+    regressions = []
+    for name, before in baseline['results'].items():
+        after = current['results'].get(name)
+        if after is None:
+            continue
+
+        def allowed(metric: str) -> float:
+            return max(threshold, before.get('noise', {}).get(metric, 0.0),
+                       after.get('noise', {}).get(metric, 0.0))
+
+        if after['ops_per_sec'] < before['ops_per_sec'] * (1 - allowed('ops_per_sec')):
+            regressions.append(f"{name}: throughput {before['ops_per_sec']:.0f} -> "
+                               f"{after['ops_per_sec']:.0f} ops/s")
+        if after['p99_us'] > before['p99_us'] * (1 + allowed('p99_us')) and after['samples'] > 1:
+            regressions.append(f"{name}: p99 {before['p99_us']:.1f} -> "
+                               f"{after['p99_us']:.1f} us")
+    if current['peak_memory_kb'] > baseline['peak_memory_kb'] * (1 + threshold):
+        regressions.append(f"peak memory {baseline['peak_memory_kb']} -> "
+                           f"{current['peak_memory_kb']} KB")
+    return regressions
+
+def print_results(report: Dict):
+    print(f"{'benchmark':30} {'p50 us':>10} {'p90 us':>10} {'p99 us':>10} {'ops/s':>12}")
+    for name, result in report['results'].items():
+        print(f"{name:30} {result['p50_us']:10.1f} {result['p90_us']:10.1f} "
+              f"{result['p99_us']:10.1f} {result['ops_per_sec']:12.0f}")
+    print(f"peak memory: {report['peak_memory_kb']} KB")
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=100_000)
+    parser.add_argument("--accounts", type=int, default=1_000)
+    parser.add_argument("--rules", type=int, default=50)
+    parser.add_argument("--samples", type=int, default=1_000,
+                        help="timed calls per single-operation benchmark")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="runs per benchmark; medians are reported (default: %(default)s)")
+    parser.add_argument("--output", metavar="PATH", help="write the results as a JSON baseline")
+    parser.add_argument("--compare", metavar="PATH",
+                        help="baseline to compare against; exits 1 on a regression")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="smallest relative slowdown reported as a regression")
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+
+    report = run_repeated(args.repeat, args.transactions, args.accounts, args.rules,
+                          args.samples, args.seed)
+    print_results(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as output:
+            json.dump(report, output, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline['config'] != report['config']:
+            print("warning: baseline was recorded with a different configuration")
+        regressions = compare(baseline, report, args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("no regressions")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
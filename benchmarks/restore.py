@@ -0,0 +1,60 @@
+"""Times a full journal replay against loading a snapshot plus the journal tail.
+
+    python -m benchmarks.restore --transactions 10000000 --accounts 100000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from bank.models.transaction import Deposit, Withdrawal
+from bank.services.bank_service import BankService
+from bank.storage.journal import Journal, pack_transaction
+
+def write_journal(path: str, transactions: int, accounts: int, start: datetime, seed: int):
+    """Appends random in-order deposits and withdrawals spread over two years from start"""
+    rng = random.Random(seed)
+    first_day = start.toordinal()
+    journal = Journal(path, group_size=1 << 16)
+    for i in range(transactions):
+        day = first_day + i * 730 // transactions
+        code = Withdrawal.code if rng.random() < 0.3 else Deposit.code
+        journal.append(pack_transaction(f"AC{rng.randrange(accounts):07d}", day, code,
+                                        rng.randrange(1, 10_000), 1))
+    journal.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--transactions", type=int, default=1_000_000)
+    parser.add_argument("--accounts", type=int, default=10_000)
+    parser.add_argument("--tail", type=float, default=0.01,
+                        help="fraction of the journal written after the snapshot")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        journal_path = os.path.join(tmpdir, "bank.journal")
+        snapshot_path = os.path.join(tmpdir, "bank.snapshot")
+        snapshot_at = int(args.transactions * (1 - args.tail))
+        write_journal(journal_path, snapshot_at, args.accounts, datetime(2021, 1, 1), seed=1)
+
+        service = BankService.restore(journal_path)
+        service.snapshot(snapshot_path)
+        service.close()
+        write_journal(journal_path, args.transactions - snapshot_at, args.accounts,
+                      datetime(2023, 1, 1), seed=2)
+
+        started = time.perf_counter()
+        BankService.restore(journal_path).close()
+        replay = time.perf_counter() - started
+
+        started = time.perf_counter()
+        BankService.restore(journal_path, snapshot_path).close()
+        snapshot = time.perf_counter() - started
+
+    print(f"full replay:       {replay:8.2f}s")
+    print(f"snapshot + tail:   {snapshot:8.2f}s  ({replay / snapshot:.1f}x faster)")
+
+if __name__ == "__main__":
+    main()
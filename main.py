@@ -1,10 +1,62 @@
+import argparse
+import sys
+
 from bank.services.bank_service import BankService
 from bank.ui.console_ui import BankConsoleUI
+from bank.ui.json_server import DEFAULT_HOST, serve
+
+OUTPUT_BUFFER_SIZE = 1 << 20
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AwesomeGIC Bank")
+    parser.add_argument("--journal", metavar="PATH",
+                        help="journal file to restore state from and append changes to")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="snapshot file to load before replaying the journal tail")
+    parser.add_argument("--snapshot-interval", type=int, default=0, metavar="RECORDS",
+                        help="write a new snapshot every RECORDS journal records")
+    parser.add_argument("--write-behind", action="store_true",
+                        help="acknowledge changes before the journal is fsynced; a crash can "
+                             "lose the last group commit")
+    parser.add_argument("--script", metavar="PATH",
+                        help="run T/I/P commands from PATH ('-' for stdin) instead of the menu")
+    parser.add_argument("--port", type=int, metavar="PORT",
+                        help="serve JSON-line requests on PORT instead of the console menu")
+    parser.add_argument("--host", default=DEFAULT_HOST,
+                        help="address to serve on with --port (default: %(default)s)")
+    args = parser.parse_args(argv)
+    if args.snapshot and not args.journal:
+        parser.error("--snapshot requires --journal")
+    if args.script and args.port is not None:
+        parser.error("--script and --port cannot be combined")
+
+    options = {'thread_safe': args.port is not None}
+    if args.journal:
+        bank_service = BankService.restore(args.journal, args.snapshot, args.snapshot_interval,
+                                           not args.write_behind, **options)
+    else:
+        bank_service = BankService(**options)
+    try:
+        if args.port is not None:
+            serve(bank_service, args.host, args.port)
+        elif args.script:
+            run_script(bank_service, args.script)
+        else:
+            ui = BankConsoleUI(bank_service)
+            ui.run()
+    finally:
+        bank_service.close()
 
-def main():
-    bank_service = BankService()
-    ui = BankConsoleUI(bank_service)
-    ui.run()
+def run_script(bank_service: BankService, path: str):
+    """Streams a command script through the UI with block-buffered output"""
+    with open(sys.stdout.fileno(), "w", buffering=OUTPUT_BUFFER_SIZE, encoding="utf-8",
+              closefd=False) as output:
+        ui = BankConsoleUI(bank_service, output)
+        if path == "-":
+            ui.run_script(sys.stdin)
+        else:
+            with open(path, encoding="utf-8") as script:
+                ui.run_script(script)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -42,6 +42,15 @@ class TestConsoleUI(unittest.TestCase):
         self.assertEqual(output.count("20230630"), 1)
         self.assertIn("| 20230630 |             | I    |   0.39 |  130.39 |", output)
 
+    @patch('sys.stdout', new_callable=StringIO)
+    @patch('builtins.input', side_effect=['P', 'AC001 202306', 'P', 'AC001 202306', 'Q'])
+    def test_printing_a_statement_closes_nothing(self, mock_input, mock_stdout):
+        self.ui.run()
+        output = mock_stdout.getvalue()
+        self.assertEqual(output.count("| 20230630 |             | I    |   0.39 |  130.39 |"), 2)
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('130.00'))
+        self.assertIsNone(self.service.accounts["AC001"].closed_through)
+
     @patch('sys.stdout', new_callable=StringIO)
     @patch('builtins.input', side_effect=['P', 'AC001 202305', '', 'Q'])
     def test_print_statement_previous_month(self, mock_input, mock_stdout):
@@ -82,3 +91,35 @@ class TestConsoleUI(unittest.TestCase):
         output = mock_stdout.getvalue()
         self.assertIn("RULE03 |     2.20 |", output)
 
+
+    def test_run_script(self):
+        output = StringIO()
+        ui = BankConsoleUI(self.service, output)
+        ui.run_script([
+            "# extra withdrawal, then the statement",
+            "T 20230626 AC001 W 20.00",
+            "",
+            "T 20230627 AC001 W abc",
+            "I 20230615 RULE03 2.20",
+            "X",
+            "P AC001 202306",
+        ])
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[:2], ["Error: Invalid amount (line 4)",
+                                     "Error: Invalid command (line 6)"])
+        self.assertIn("| 20230626 | 20230626-03 | W    |  20.00 |  110.00 |", lines)
+        self.assertNotIn("| Date     | Txn Id      | Type | Amount |", lines)
+
+    def test_run_script_rejects_non_finite_numbers(self):
+        output = StringIO()
+        ui = BankConsoleUI(self.service, output)
+        ui.run_script([
+            "T 20230627 AC001 D NaN",
+            "T 20230627 AC001 D Infinity",
+            "I 20230615 RULE04 -Infinity",
+            "I 20230615 RULE04 sNaN",
+        ])
+        self.assertEqual(output.getvalue().splitlines(),
+                         ["Error: Invalid amount (line 1)", "Error: Invalid amount (line 2)",
+                          "Error: Invalid rate (line 3)", "Error: Invalid rate (line 4)"])
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('130.00'))
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+from bank.services.bank_service import BankService
+from bank.ui.json_server import BankServer
+
+class TestJsonServer(unittest.TestCase):
+    def setUp(self):
+        self.service = BankService(thread_safe=True)
+        self.server = BankServer(self.service)
+
+    def _run(self, client):
+        async def main():
+            await self.server.start()
+            try:
+                return await client()
+            finally:
+                await self.server.close()
+        return asyncio.run(main())
+
+    async def _request(self, *requests):
+        reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+        for request in requests:
+            writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        responses = [json.loads(await reader.readline()) for _ in requests]
+        writer.close()
+        return sorted(responses, key=lambda response: response['id'])
+
+    def test_transactions_rules_and_statement(self):
+        async def client():
+            await self._request(
+                {'id': 1, 'op': 'transaction', 'date': '20230505', 'account': 'AC001',
+                 'type': 'D', 'amount': '100.00'},
+                {'id': 2, 'op': 'transaction', 'date': '20230601', 'account': 'AC001',
+                 'type': 'D', 'amount': '150.00'},
+                {'id': 3, 'op': 'transaction', 'date': '20230626', 'account': 'AC001',
+                 'type': 'W', 'amount': '20.00'},
+                {'id': 4, 'op': 'transaction', 'date': '20230626', 'account': 'AC001',
+                 'type': 'W', 'amount': '100.00'})
+            await self._request(
+                {'id': 5, 'op': 'rule', 'date': '20230601', 'rule_id': 'RULE02', 'rate': '1.90'},
+                {'id': 6, 'op': 'rule', 'date': '20230615', 'rule_id': 'RULE03', 'rate': '2.20'})
+            return await self._request(
+                {'id': 7, 'op': 'close_month', 'account': 'AC001', 'month': '202306'},
+                {'id': 8, 'op': 'statement', 'account': 'AC001', 'month': '202306'})
+
+        close, statement = self._run(client)
+        self.assertEqual(close, {'id': 7, 'ok': True, 'result': {'interest': '0.39'}})
+        self.assertTrue(statement['ok'])
+        self.assertEqual([line['txn_id'] for line in statement['result']],
+                         ['20230601-01', '20230626-01', '20230626-02', ''])
+        self.assertEqual(statement['result'][-1]['balance'], '130.39')
+
+    def test_errors(self):
+        async def client():
+            reader, writer = await asyncio.open_connection('127.0.0.1', self.server.port)
+            writer.write(b"not json\n")
+            invalid = json.loads(await reader.readline())
+            writer.close()
+            responses = await self._request(
+                {'id': 1, 'op': 'transaction', 'date': '20230626', 'account': 'AC001',
+                 'type': 'W', 'amount': '10.00'},
+                {'id': 2, 'op': 'transaction', 'date': '20230626', 'account': 'AC001',
+                 'type': 'D', 'amount': '-1'},
+                {'id': 3, 'op': 'rule', 'date': '20230615', 'rule_id': 'RULE01', 'rate': '100'},
+                {'id': 4, 'op': 'statement', 'account': 'AC001', 'month': '2023-6'},
+                {'id': 5, 'op': 'unknown'},
+                {'id': 6, 'op': 'statement', 'month': '202306'})
+            return [invalid] + responses
+
+        responses = self._run(client)
+        self.assertEqual(responses[0], {'id': None, 'ok': False, 'error': 'Invalid JSON'})
+        self.assertTrue(all(not response['ok'] for response in responses))
+        self.assertEqual([response['error'] for response in responses[2:]],
+                         ["Amount must be positive", "Rate must be between 0 and 100",
+                          "Month should be in YYYYMM format", "Unknown operation",
+                          "Missing field 'account'"])
+
+    def test_unexpected_errors_are_answered(self):
+        add_transaction = self.service.add_transaction
+
+        def failing_add(account_id, date, transaction_type, amount):
+            if amount == 13:
+                raise RuntimeError("disk full")
+            return add_transaction(account_id, date, transaction_type, amount)
+
+        async def client():
+            return await self._request(
+                {'id': 1, 'op': 'transaction', 'date': '20230601', 'account': 'AC001',
+                 'type': 'D', 'amount': '13'},
+                {'id': 2, 'op': 'transaction', 'date': '20230601', 'account': 'AC001',
+                 'type': 'D', 'amount': '5.00'},
+                {'id': 3, 'op': 'statement', 'account': 'AC001', 'month': '202306'})
+
+        with patch.object(self.service, 'add_transaction', side_effect=failing_add), \
+                patch.object(self.service, 'get_account_statement',
+                             side_effect=RuntimeError("boom")):
+            failed, posted, statement = self._run(client)
+        self.assertEqual(failed, {'id': 1, 'ok': False, 'error': 'Internal error'})
+        self.assertTrue(posted['ok'])
+        self.assertEqual(statement, {'id': 3, 'ok': False, 'error': 'Internal error'})
+        self.assertEqual(self.service.accounts['AC001'].balance, Decimal('5.00'))
+
+    def test_concurrent_posts_to_one_account_are_batched(self):
+        clients = 50
+
+        async def post(index):
+            return await self._request({'id': index, 'op': 'transaction', 'date': '20230601',
+                                        'account': 'AC001', 'type': 'D', 'amount': '1.00'})
+
+        async def client():
+            return await asyncio.gather(*(post(index) for index in range(clients)))
+
+        responses = [response for batch in self._run(client) for response in batch]
+        self.assertTrue(all(response['ok'] for response in responses))
+        self.assertEqual(len({response['result']['transaction_id'] for response in responses}),
+                         clients)
+        self.assertEqual(self.service.accounts['AC001'].balance, Decimal(clients))
+        self.assertEqual(self.server.posts, clients)
+        self.assertLessEqual(self.server.batches, clients)
+
+    def test_pipelined_requests_keep_their_order(self):
+        async def client():
+            return await self._request(
+                {'id': 1, 'op': 'transaction', 'date': '20230601', 'account': 'AC009',
+                 'type': 'D', 'amount': '100.00'},
+                {'id': 2, 'op': 'transaction', 'date': '20230610', 'account': 'AC009',
+                 'type': 'W', 'amount': '40.00'},
+                {'id': 3, 'op': 'statement', 'account': 'AC009', 'month': '202306'},
+                {'id': 4, 'op': 'close_month', 'account': 'AC009', 'month': '202306'},
+                {'id': 5, 'op': 'transaction', 'date': '20230615', 'account': 'AC009',
+                 'type': 'D', 'amount': '1.00'},
+                {'id': 6, 'op': 'rule', 'date': '20230101', 'rule_id': 'RULE01', 'rate': '2.00'})
+
+        responses = self._run(client)
+        self.assertTrue(all(response['ok'] for response in responses[:4]))
+        self.assertEqual([line['balance'] for line in responses[2]['result']],
+                         ['100.00', '60.00'])
+        self.assertEqual(responses[4], {'id': 5, 'ok': False, 'error': 'Month is closed'})
+        self.assertTrue(responses[5]['ok'])
+        # The rule waited for the close, so it corrected the closed June
+        self.assertGreater(self.service.accounts['AC009'].balance, Decimal('60.00'))
+
+    def test_requires_thread_safe_service(self):
+        with self.assertRaises(ValueError):
+            BankServer(BankService())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -26,6 +26,16 @@ class TestBankAccount(unittest.TestCase):
         self.assertEqual(self.account.balance, Decimal('50.00'))
         self.assertEqual(len(self.account.transactions), 2)
 
+    def test_rejected_entry_changes_nothing(self):
+        self.account.add_transaction(Deposit("AC001", self.test_date,
+                                             Decimal('92233720368547758.07')))
+        with self.assertRaises(ValueError):
+            self.account.add_transaction(self.deposit)  # month total would overflow
+        self.assertEqual(self.account.balance, Decimal('92233720368547758.07'))
+        self.assertEqual(len(self.account.transactions), 1)
+        self.assertEqual(self.account.get_month_end_balance(2023, 6),
+                         Decimal('92233720368547758.07'))
+
     def test_get_transactions_for_month(self):
         may_date = datetime(2023, 5, 15)
         may_deposit = Deposit("AC001", may_date, Decimal('200.00'))
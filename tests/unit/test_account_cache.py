@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.models.transaction import Interest
+from bank.services.bank_service import BankService
+from bank.storage.account_cache import AccountCache
+from bank.storage.sqlite_repository import SqliteRepository
+
+class TestAccountCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bank.db")
+        self.service = BankService(repository=SqliteRepository(self.path), cache_accounts=2)
+
+    def tearDown(self):
+        self.service.close()
+        self.tmpdir.cleanup()
+
+    def _deposit(self, account_id: str, day: int, amount: str):
+        self.service.add_transaction(account_id, datetime(2023, 6, day), "D", Decimal(amount))
+
+    def test_hits_misses_and_evictions(self):
+        self._deposit("AC001", 1, '100.00')  # miss, then created
+        self._deposit("AC001", 2, '50.00')   # hit
+        self._deposit("AC002", 1, '10.00')
+        self._deposit("AC003", 1, '20.00')   # evicts AC001
+
+        cache = self.service.account_cache
+        self.assertEqual(cache.stats()['accounts'], 2)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(self.service.repository.balance("AC001"), 15000)
+        self.assertEqual(self.service.repository.balance("AC003"), 0)
+
+        misses = cache.misses
+        account = self.service.accounts["AC001"]
+        self.assertEqual(cache.misses, misses + 1)
+        self.assertEqual(account.balance, Decimal('150.00'))
+        self.assertEqual([t.transaction_id for t in account.transactions],
+                         ["20230601-01", "20230602-01"])
+        self.assertGreater(cache.hits, 0)
+
+    def test_reloaded_negative_interest_keeps_its_sign(self):
+        self._deposit("AC001", 1, '10.00')
+        self.service.accounts["AC001"].add_entry(datetime(2023, 6, 30).toordinal(),
+                                                 Interest.code, -25, 1)
+        self._deposit("AC002", 1, '10.00')
+        self._deposit("AC003", 1, '10.00')  # evicts AC001
+
+        account = self.service.accounts["AC001"]
+        self.assertEqual(account.balance, Decimal('9.75'))
+        self.assertEqual([t.signed_amount for t in account.transactions],
+                         [Decimal('10.00'), Decimal('-0.25')])
+        self.assertEqual(account.get_month_end_balance(2023, 6), Decimal('9.75'))
+
+    def test_cold_accounts_keep_transaction_ids_and_statements(self):
+        memory = BankService()
+        for service in (memory, self.service):
+            service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+            for account_id in ("AC001", "AC002", "AC003", "AC001"):
+                service.add_transaction(account_id, datetime(2023, 6, 26), "D", Decimal('40.00'))
+        self.assertEqual(self.service.accounts["AC001"].count_transactions_on(datetime(2023, 6, 26)),
+                         2)
+        for account_id in ("AC001", "AC002", "AC003"):
+            self.assertEqual(self.service.get_account_statement(account_id, 2023, 6),
+                             memory.get_account_statement(account_id, 2023, 6))
+
+    def test_rule_corrections_reach_evicted_accounts(self):
+        memory = BankService()
+        for service in (memory, self.service):
+            service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+            for account_id in ("AC001", "AC002", "AC003"):
+                service.add_transaction(account_id, datetime(2023, 6, 1), "D", Decimal('900.00'))
+                service.close_month(account_id, 2023, 6)
+            corrections = service.add_interest_rule(datetime(2023, 6, 1), "RULE02",
+                                                    Decimal('4.00'))
+            self.assertEqual(len(corrections), 3)
+        for account_id in ("AC001", "AC002", "AC003"):
+            self.assertEqual(self.service.accounts[account_id].balance,
+                             memory.accounts[account_id].balance)
+
+    def test_close_writes_back_dirty_accounts(self):
+        self._deposit("AC001", 1, '100.00')
+        self.service.close()
+
+        self.service = BankService(repository=SqliteRepository(self.path), cache_bytes=1 << 20)
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('100.00'))
+        self.assertEqual(self.service.account_cache.misses, 1)
+
+    def test_memory_budget(self):
+        cache = AccountCache(self.service.repository, max_bytes=1)
+        cache.create("AC001")
+        cache.create("AC002")
+        self.assertEqual(cache.stats()['accounts'], 1)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_requires_a_budget_and_repository(self):
+        with self.assertRaises(ValueError):
+            AccountCache(self.service.repository)
+        with self.assertRaises(ValueError):
+            BankService(cache_accounts=10)
+
+if __name__ == '__main__':
+    unittest.main()
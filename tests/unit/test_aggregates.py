@@ -0,0 +1,62 @@
+import unittest
+from datetime import datetime
+
+from bank.models.aggregates import BankAggregates, RankedIndex
+from bank.models.transaction import BalanceForward, Deposit, Interest, Withdrawal
+from bank.utils.date_utils import month_key
+
+def day(year, month, d):
+    return datetime(year, month, d).toordinal()
+
+class TestRankedIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = RankedIndex()
+        for key, value in (("A", 300), ("B", 100), ("C", 200), ("D", 200)):
+            self.index.add(key, value)
+
+    def test_top_and_above(self):
+        self.assertEqual(self.index.top(3), [("A", 300), ("C", 200), ("D", 200)])
+        self.assertEqual(self.index.above(150), [("A", 300), ("C", 200), ("D", 200)])
+        self.assertEqual(self.index.above(200), [("A", 300)])
+        self.assertEqual(self.index.top(0), [])
+
+    def test_updates_move_keys(self):
+        self.index.top(1)
+        self.index.add("B", 250)
+        self.index.add("E", 50)
+        self.assertEqual(self.index.top(5), [("B", 350), ("A", 300), ("C", 200), ("D", 200),
+                                             ("E", 50)])
+        # Few moved keys are re-placed one by one
+        self.index.add("E", 1000)
+        self.assertEqual(self.index.top(2), [("E", 1050), ("B", 350)])
+        self.assertEqual(self.index.get("E"), 1050)
+        self.assertEqual(len(self.index), 5)
+
+class TestBankAggregates(unittest.TestCase):
+    def test_month_totals_and_rankings(self):
+        aggregates = BankAggregates()
+        aggregates.add_entry("AC001", day(2023, 6, 1), Deposit.code, 10000)
+        aggregates.add_entry("AC001", day(2023, 6, 2), Withdrawal.code, 2500)
+        aggregates.add_entry("AC001", day(2023, 6, 30), Interest.code, 12)
+        aggregates.add_history("AC002", 50000, [(day(2023, 5, 31), BalanceForward.code, 50000)])
+        aggregates.add_account("AC003")
+
+        totals = aggregates.month_totals(month_key(2023, 6))
+        self.assertEqual(totals[Deposit.code], 10000)
+        self.assertEqual(totals[Withdrawal.code], 2500)
+        self.assertEqual(totals[Interest.code], 12)
+        # Balance-forward entries only move balances
+        self.assertEqual(aggregates.month_totals(month_key(2023, 5)), [0] * 5)
+        self.assertEqual(aggregates.top_balances(3),
+                         [("AC002", 50000), ("AC001", 7512), ("AC003", 0)])
+        self.assertEqual(aggregates.balances_above(7512), [("AC002", 50000)])
+        self.assertEqual(aggregates.top_interest_paid(5), [("AC001", 12)])
+
+    def test_rule_interest(self):
+        aggregates = BankAggregates()
+        aggregates.add_rule_interest({"RULE01": 30, "RULE02": 10})
+        aggregates.add_rule_interest({"RULE01": -5})
+        self.assertEqual(aggregates.rule_interest(), {"RULE01": 25, "RULE02": 10})
+
+if __name__ == '__main__':
+    unittest.main()
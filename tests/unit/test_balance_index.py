@@ -0,0 +1,39 @@
+import unittest
+from datetime import datetime
+
+from bank.models.balance_index import FenwickBalanceIndex
+
+def day(year, month, d):
+    return datetime(year, month, d).toordinal()
+
+class TestFenwickBalanceIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = FenwickBalanceIndex()
+
+    def test_empty_index(self):
+        self.assertEqual(self.index.balance_on(day(2023, 6, 1)), 0)
+        self.assertEqual(self.index.balance_days(day(2023, 6, 1), day(2023, 6, 30)), 0)
+
+    def test_balance_on(self):
+        self.index.add(day(2023, 6, 1), 10000)
+        self.index.add(day(2023, 6, 15), -3000)
+        self.assertEqual(self.index.balance_on(day(2023, 5, 31)), 0)
+        self.assertEqual(self.index.balance_on(day(2023, 6, 14)), 10000)
+        self.assertEqual(self.index.balance_on(day(2023, 6, 15)), 7000)
+        self.assertEqual(self.index.balance_on(day(2030, 1, 1)), 7000)
+
+    def test_balance_days(self):
+        self.index.add(day(2023, 6, 1), 10000)
+        self.index.add(day(2023, 6, 11), -5000)
+        # 10 days at 100.00 and 20 days at 50.00, in cents
+        self.assertEqual(self.index.balance_days(day(2023, 6, 1), day(2023, 6, 30)), 200000)
+        self.assertEqual(self.index.balance_days(day(2023, 6, 10), day(2023, 6, 11)), 15000)
+
+    def test_rebase_keeps_history(self):
+        self.index.add(day(2023, 6, 1), 10000)
+        self.index.add(day(2019, 1, 1), 100)
+        self.index.add(day(2031, 1, 1), 200)
+        self.assertEqual(self.index.balance_on(day(2019, 1, 1)), 100)
+        self.assertEqual(self.index.balance_on(day(2023, 6, 1)), 10100)
+        self.assertEqual(self.index.balance_on(day(2031, 1, 1)), 10300)
+        self.assertEqual(self.index.balance_days(day(2023, 6, 1), day(2023, 6, 3)), 30300)
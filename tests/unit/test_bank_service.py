@@ -1,8 +1,13 @@
+import os
+import tempfile
 import unittest
 from datetime import datetime
 from decimal import Decimal
+from unittest.mock import patch
 
 from bank.services.bank_service import BankService
+from bank.storage.journal import read_journal
+from bank.utils.date_utils import month_key
 
 class TestBankService(unittest.TestCase):
     def setUp(self):
@@ -20,6 +25,18 @@ class TestBankService(unittest.TestCase):
         self.assertEqual(self.service.accounts[self.account_id].balance, Decimal('100.00'))
         self.assertEqual(transaction.transaction_id, "20230626-01")
 
+    def test_transactions_accept_day_ordinals(self):
+        day = self.test_date.toordinal()
+        transaction = self.service.add_transaction(self.account_id, day, "D", Decimal('100.00'))
+        self.assertEqual(transaction.date, self.test_date)
+        self.assertEqual(self.service.add_transactions_bulk(
+            [(day, self.account_id, "W", Decimal('10.00')),
+             (self.test_date, self.account_id, "D", Decimal('5.00'))]), [])
+        account = self.service.accounts[self.account_id]
+        self.assertEqual([t.transaction_id for t in account.transactions],
+                         ["20230626-01", "20230626-02", "20230626-03"])
+        self.assertEqual(account.balance, Decimal('95.00'))
+
     def test_transaction_id_generation(self):
         # First transaction
         txn1 = self.service.add_transaction(
@@ -60,3 +77,336 @@ class TestBankService(unittest.TestCase):
         interest = self.service.calculate_interest_for_month(self.account_id, 2023, 6)
         self.assertEqual(interest, Decimal('0.39'))
 
+
+    def _setup_interest_scenario(self, service):
+        service.add_transaction(self.account_id, datetime(2023, 5, 5), "D", Decimal('100.00'))
+        service.add_transaction(self.account_id, datetime(2023, 6, 1), "D", Decimal('150.00'))
+        service.add_transaction(self.account_id, datetime(2023, 6, 26), "W", Decimal('20.00'))
+        service.add_transaction(self.account_id, datetime(2023, 6, 26), "W", Decimal('100.00'))
+        service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+        service.add_interest_rule(datetime(2023, 5, 20), "RULE02", Decimal('1.90'))
+        service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('2.20'))
+
+    def test_fenwick_engine_interest_matches_ledger(self):
+        service = BankService(balance_engine='fenwick')
+        self._setup_interest_scenario(service)
+        self.assertEqual(service.calculate_interest_for_month(self.account_id, 2023, 6), Decimal('0.39'))
+
+    def test_invalid_balance_engine(self):
+        with self.assertRaises(ValueError):
+            BankService(balance_engine='unknown')
+
+    def test_interest_for_range(self):
+        for engine in ('ledger', 'fenwick'):
+            service = BankService(balance_engine=engine)
+            self._setup_interest_scenario(service)
+            month = service.calculate_interest_for_range(
+                self.account_id, datetime(2023, 6, 1), datetime(2023, 6, 30))
+            self.assertEqual(month, Decimal('0.39'))
+            span = service.calculate_interest_for_range(
+                self.account_id, datetime(2023, 5, 10), datetime(2023, 6, 20))
+            self.assertEqual(span, Decimal('0.39'))
+
+    def test_rule_change_invalidates_cached_month_periods(self):
+        self._setup_interest_scenario(self.service)
+        self.assertEqual(self.service.calculate_interest_for_month(self.account_id, 2023, 6), Decimal('0.39'))
+        self.service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('5.00'))
+        self.assertEqual(self.service.calculate_interest_for_month(self.account_id, 2023, 6), Decimal('0.65'))
+
+    def test_add_transactions_bulk(self):
+        self.service.add_transaction(self.account_id, self.test_date, "D", Decimal('10.00'))
+        errors = self.service.add_transactions_bulk([
+            (self.test_date, self.account_id, "W", Decimal('50.00')),
+            (datetime(2023, 6, 1), self.account_id, "D", Decimal('100.00')),
+            (self.test_date, self.account_id, "D", Decimal('5.00')),
+            (self.test_date, "AC002", "X", Decimal('5.00')),
+            (self.test_date, self.account_id, "D", Decimal('Infinity')),
+            (self.test_date, self.account_id, 1, Decimal('5.00')),
+        ])
+        self.assertEqual([position for position, _ in errors], [3, 4, 5])
+        self.assertEqual(errors[0], (3, "Invalid transaction type"))
+        account = self.service.accounts[self.account_id]
+        self.assertEqual(account.balance, Decimal('65.00'))
+        self.assertEqual([t.transaction_id for t in account.transactions],
+                         ["20230601-01", "20230626-01", "20230626-02", "20230626-03"])
+
+    def test_post_month_end_interest(self):
+        self._setup_interest_scenario(self.service)
+        self.service.add_transaction("AC002", datetime(2023, 6, 10), "D", Decimal('1000.00'))
+        self.service.add_transaction("AC003", datetime(2023, 7, 1), "D", Decimal('1000.00'))
+        expected = {
+            "AC001": self.service.calculate_interest_for_month("AC001", 2023, 6),
+            "AC002": self.service.calculate_interest_for_month("AC002", 2023, 6),
+        }
+
+        posted = self.service.post_month_end_interest(2023, 6, workers=2, shard_size=1)
+        self.assertEqual(posted, expected)
+        # May was still open, so it was closed first with its own 0.14
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('130.53'))
+        interest_txn = self.service.accounts["AC002"].transactions[-1]
+        self.assertEqual(interest_txn.date, datetime(2023, 6, 30))
+        self.assertEqual(interest_txn.amount, expected["AC002"])
+
+    def test_post_month_end_interest_is_idempotent(self):
+        self._setup_interest_scenario(self.service)
+        self.service.post_month_end_interest(2023, 6, workers=1)
+        self.assertEqual(self.service.post_month_end_interest(2023, 6, workers=1), {})
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('130.53'))
+
+    def test_post_month_end_interest_closes_earlier_months_like_close_month(self):
+        expected = BankService()
+        for service in (self.service, expected):
+            service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('5.00'))
+            service.add_transaction(self.account_id, datetime(2023, 5, 5), "D",
+                                    Decimal('1000.00'))
+            service.add_transaction("AC002", datetime(2023, 6, 10), "D", Decimal('100.00'))
+        june = expected.close_month(self.account_id, 2023, 6)
+
+        posted = self.service.post_month_end_interest(2023, 6, workers=1)
+        self.assertEqual(posted[self.account_id], june)
+        self.assertEqual(self.service.accounts[self.account_id].balance, Decimal('1007.82'))
+        self.assertEqual(self.service.accounts[self.account_id].balance,
+                         expected.accounts[self.account_id].balance)
+        self.assertEqual([t.date for t in self.service.accounts[self.account_id].transactions],
+                         [datetime(2023, 5, 5), datetime(2023, 5, 31), datetime(2023, 6, 30)])
+        self.assertEqual(len(self.service.accounts["AC002"].transactions), 2)
+
+    def test_post_month_end_interest_closes_dormant_accounts_without_entries(self):
+        self.service.add_transaction("AC002", datetime(2023, 6, 10), "D", Decimal('1000.00'))
+        self.assertEqual(self.service.post_month_end_interest(2023, 6, workers=1), {})
+        account = self.service.accounts["AC002"]
+        self.assertEqual(len(account.transactions), 1)
+        self.assertEqual(account.closed_through, month_key(2023, 6))
+
+    def test_post_month_end_interest_sees_posts_made_during_accrual(self):
+        self._setup_interest_scenario(self.service)
+        accrue = self.service._accrue_batch
+
+        def accrue_during_deposit(periods, snapshots):
+            if self.service._accrue_batch is not accrue:
+                self.service._accrue_batch = accrue
+                self.service.add_transaction(self.account_id, datetime(2023, 6, 20), "D",
+                                             Decimal('1000.00'))
+            return accrue(periods, snapshots)
+
+        self.service._accrue_batch = accrue_during_deposit
+        posted = self.service.post_month_end_interest(2023, 6, workers=1)
+
+        expected = BankService()
+        self._setup_interest_scenario(expected)
+        expected.add_transaction(self.account_id, datetime(2023, 6, 20), "D", Decimal('1000.00'))
+        self.assertEqual(posted, expected.post_month_end_interest(2023, 6, workers=1))
+        self.assertEqual(self.service.accounts[self.account_id].balance,
+                         expected.accounts[self.account_id].balance)
+        self.assertEqual(self.service._account_versions, {})
+
+    def test_close_month_posts_interest_once(self):
+        self._setup_interest_scenario(self.service)
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 6), Decimal('0.39'))
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 6), Decimal('0.39'))
+        # May was still open, so it was closed first with its own interest
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 5), Decimal('0.14'))
+        self.assertEqual(self.service.accounts[self.account_id].balance, Decimal('130.53'))
+
+        statement = self.service.get_account_statement(self.account_id, 2023, 6)
+        self.assertEqual(statement[-1]['type'], 'I')
+        self.assertEqual(statement[-1]['balance'], Decimal('130.53'))
+        with self.assertRaisesRegex(ValueError, "Month is closed"):
+            self.service.add_transaction(self.account_id, datetime(2023, 5, 30), "D",
+                                         Decimal('10.00'))
+        self.service.add_transaction(self.account_id, datetime(2023, 7, 1), "D", Decimal('10.00'))
+
+    def test_close_month_closes_earlier_open_months_in_order(self):
+        self._setup_interest_scenario(self.service)
+        expected = BankService()
+        self._setup_interest_scenario(expected)
+        may = expected.close_month(self.account_id, 2023, 5)
+        june = expected.close_month(self.account_id, 2023, 6)
+
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 6), june)
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 5), may)
+        self.assertGreater(may, 0)
+        self.assertEqual(self.service.accounts[self.account_id].balance,
+                         expected.accounts[self.account_id].balance)
+
+    def test_compact_closed_months(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_path = os.path.join(tmpdir, "bank.journal")
+            archive_path = os.path.join(tmpdir, "bank.archive")
+            service = BankService.restore(journal_path)
+            self._setup_interest_scenario(service)
+            service.add_transaction(self.account_id, datetime(2023, 7, 10), "W", Decimal('30.00'))
+            service.close_month(self.account_id, 2023, 6)
+            july = service.get_account_statement(self.account_id, 2023, 7)
+
+            self.assertEqual(service.compact_closed_months(archive_path), 6)
+            self.assertEqual(service.compact_closed_months(archive_path), 0)
+            account = service.accounts[self.account_id]
+            self.assertEqual(len(account.transactions), 2)
+            self.assertEqual(account.balance, Decimal('100.53'))
+            self.assertEqual(service.get_account_statement(self.account_id, 2023, 7), july)
+            with self.assertRaisesRegex(ValueError, "archived"):
+                service.get_account_statement(self.account_id, 2023, 6)
+            self.assertEqual(len(list(read_journal(archive_path))), 6)
+            service.close()
+
+            restored = BankService.restore(journal_path)
+            self.assertEqual(len(restored.accounts[self.account_id].transactions), 2)
+            self.assertEqual(restored.get_account_statement(self.account_id, 2023, 7), july)
+            restored.close()
+
+    def test_statements_are_memoized_until_account_or_rules_change(self):
+        self._setup_interest_scenario(self.service)
+        with patch.object(self.service, '_calculate_month_interest',
+                          wraps=self.service._calculate_month_interest) as compute:
+            first = self.service.get_account_statement(self.account_id, 2023, 6)
+            self.assertIs(self.service.get_account_statement(self.account_id, 2023, 6), first)
+            self.assertEqual(compute.call_count, 1)
+
+            self.service.add_transaction("AC002", datetime(2023, 6, 2), "D", Decimal('5.00'))
+            self.assertIs(self.service.get_account_statement(self.account_id, 2023, 6), first)
+
+            self.service.add_transaction(self.account_id, datetime(2023, 6, 2), "D", Decimal('5.00'))
+            self.assertEqual(self.service.get_account_statement(self.account_id, 2023, 6)[-1]['balance'],
+                             Decimal('135.40'))
+            self.service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('5.00'))
+            self.service.get_account_statement(self.account_id, 2023, 6)
+            self.assertEqual(compute.call_count, 3)
+
+    def test_back_dated_rule_corrects_closed_months(self):
+        self._setup_interest_scenario(self.service)
+        self.service.add_transaction(self.account_id, datetime(2023, 7, 3), "D", Decimal('500.00'))
+        self.service.close_month(self.account_id, 2023, 6)
+        self.service.close_month(self.account_id, 2023, 7)
+        self.service.add_transaction("AC002", datetime(2023, 8, 1), "D", Decimal('80.00'))
+
+        corrections = self.service.add_interest_rule(datetime(2023, 6, 15), "RULE03",
+                                                     Decimal('9.00'))
+        # June's rate changed; July's rate too, as RULE03 is still in effect
+        self.assertEqual([(c.account_id, c.year, c.month) for c in corrections],
+                         [(self.account_id, 2023, 6), (self.account_id, 2023, 7)])
+
+        # Same result as if the rule had been in place before the months closed
+        expected = BankService()
+        self._setup_interest_scenario(expected)
+        expected.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('9.00'))
+        expected.add_transaction(self.account_id, datetime(2023, 7, 3), "D", Decimal('500.00'))
+        for month in (6, 7):
+            interest = expected.close_month(self.account_id, 2023, month)
+            self.assertEqual(self.service.close_month(self.account_id, 2023, month), interest)
+            self.assertEqual(self.service.get_account_statement(self.account_id, 2023, month),
+                             expected.get_account_statement(self.account_id, 2023, month))
+        self.assertEqual(corrections[0].delta, corrections[0].corrected - Decimal('0.39'))
+        self.assertEqual(self.service.accounts[self.account_id].balance,
+                         expected.accounts[self.account_id].balance)
+
+        # Lowering the rate again reverses the extra interest
+        self.service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('2.20'))
+        self.assertEqual(self.service.close_month(self.account_id, 2023, 6), Decimal('0.39'))
+
+    def test_rule_change_outside_closed_months_posts_nothing(self):
+        self._setup_interest_scenario(self.service)
+        self.service.close_month(self.account_id, 2023, 6)
+        self.assertEqual(self.service.add_interest_rule(datetime(2023, 7, 1), "RULE04",
+                                                        Decimal('3.00')), [])
+        # RULE00 gives way to RULE01 before the first closed month
+        self.assertEqual(self.service.add_interest_rule(datetime(2022, 1, 1), "RULE00",
+                                                        Decimal('4.00')), [])
+
+    def test_closed_month_index_follows_closes(self):
+        for account_id in ("AC003", "AC002", "AC001"):
+            self.service.add_transaction(account_id, datetime(2023, 6, 1), "D",
+                                         Decimal('1000.00'))
+        self.service.close_month("AC003", 2023, 6)
+        corrections = self.service.add_interest_rule(datetime(2023, 6, 1), "RULE01",
+                                                     Decimal('2.00'))
+        self.assertEqual([c.account_id for c in corrections], ["AC003"])
+
+        self.service.close_month("AC001", 2023, 7)  # closes June on the way
+        corrections = self.service.add_interest_rule(datetime(2023, 6, 1), "RULE01",
+                                                     Decimal('3.00'))
+        self.assertEqual([(c.account_id, c.month) for c in corrections],
+                         [("AC001", 6), ("AC001", 7), ("AC003", 6)])
+        self.assertEqual(self.service._closed_index,
+                         {month_key(2023, 6): {"AC003"}, month_key(2023, 7): {"AC001"}})
+
+    def test_rule_change_keeps_results_for_other_months(self):
+        self._setup_interest_scenario(self.service)
+        with patch.object(self.service, '_calculate_month_interest',
+                          wraps=self.service._calculate_month_interest) as compute:
+            may = self.service.get_account_statement(self.account_id, 2023, 5)
+            self.service.get_account_statement(self.account_id, 2023, 6)
+            self.service.add_interest_rule(datetime(2023, 6, 20), "RULE04", Decimal('3.00'))
+            self.assertIs(self.service.get_account_statement(self.account_id, 2023, 5), may)
+            self.service.get_account_statement(self.account_id, 2023, 6)
+            self.assertEqual(compute.call_count, 3)
+
+    def test_corrections_survive_journal_replay(self):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            journal_path = os.path.join(tmpdir, "bank.journal")
+            service = BankService.restore(journal_path)
+            self._setup_interest_scenario(service)
+            service.close_month(self.account_id, 2023, 6)
+            service.add_interest_rule(datetime(2023, 6, 1), "RULE05", Decimal('0.50'))
+            june = service.get_account_statement(self.account_id, 2023, 6)
+            balance = service.accounts[self.account_id].balance
+            service.close()
+
+            restored = BankService.restore(journal_path)
+            self.assertEqual(restored.accounts[self.account_id].balance, balance)
+            self.assertEqual(restored.get_account_statement(self.account_id, 2023, 6), june)
+            restored.close()
+
+    def test_reporting_queries(self):
+        self._setup_interest_scenario(self.service)
+        self.service.add_transaction("AC002", datetime(2023, 6, 5), "D", Decimal('40.00'))
+        self.assertEqual(self.service.top_accounts_by_balance(5),
+                         [(self.account_id, Decimal('130.00')), ("AC002", Decimal('40.00'))])
+        self.service.close_month(self.account_id, 2023, 6)
+
+        self.assertEqual(self.service.monthly_totals(2023, 6),
+                         {'Deposit': Decimal('190.00'), 'Withdrawal': Decimal('120.00'),
+                          'Interest': Decimal('0.39'), 'InterestReversal': Decimal('0.00')})
+        self.assertEqual(self.service.accounts_with_balance_above(Decimal('40.00')),
+                         [(self.account_id, Decimal('130.53'))])
+        # Closing June closed May first, with its own interest
+        self.assertEqual(self.service.top_accounts_by_interest(1),
+                         [(self.account_id, Decimal('0.53'))])
+        # RULE01 covers May 5-19, RULE02 May 20 to June 14 and RULE03 June 15-30
+        self.assertEqual(self.service.interest_by_rule(),
+                         {'RULE01': Decimal('0.08'), 'RULE02': Decimal('0.24'),
+                          'RULE03': Decimal('0.21')})
+
+    def test_reporting_follows_corrections(self):
+        self._setup_interest_scenario(self.service)
+        self.service.interest_by_rule()  # kept up to date from here on
+        self.service.close_month(self.account_id, 2023, 6)
+        self.service.add_interest_rule(datetime(2023, 6, 10), "RULE04", Decimal('5.00'))
+
+        rebuilt = BankService()
+        self._setup_interest_scenario(rebuilt)
+        rebuilt.close_month(self.account_id, 2023, 6)
+        rebuilt.add_interest_rule(datetime(2023, 6, 10), "RULE04", Decimal('5.00'))
+        self.assertEqual(self.service.interest_by_rule(), rebuilt.interest_by_rule())
+        self.assertEqual(self.service.monthly_totals(2023, 6), rebuilt.monthly_totals(2023, 6))
+        self.assertEqual(sum(self.service.interest_by_rule().values(), Decimal(0)),
+                         self.service.close_month(self.account_id, 2023, 5)
+                         + self.service.close_month(self.account_id, 2023, 6))
+
+    def test_account_versions_are_evicted_with_their_results(self):
+        service = BankService(result_cache_size=2)
+        for n in range(5):
+            service.add_transaction(f"AC{n:03}", datetime(2023, 6, 1), "D", Decimal('10.00'))
+            service.get_account_statement(f"AC{n:03}", 2023, 6)
+        self.assertEqual(list(service._account_versions), ["AC004"])
+
+        service.add_transaction("AC000", datetime(2023, 6, 2), "D", Decimal('5.00'))
+        self.assertEqual(service.get_account_statement("AC000", 2023, 6)[-1]['balance'],
+                         Decimal('15.00'))
+
+    def test_result_cache_can_be_disabled(self):
+        service = BankService(result_cache_size=0)
+        self._setup_interest_scenario(service)
+        first = service.get_account_statement(self.account_id, 2023, 6)
+        self.assertIsNot(service.get_account_statement(self.account_id, 2023, 6), first)
+        self.assertEqual(service.get_account_statement(self.account_id, 2023, 6), first)
@@ -1,7 +1,8 @@
 import unittest
 from datetime import datetime
 
-from bank.utils.date_utils import parse_date, get_last_day_of_month
+from bank.utils.date_utils import (format_day, get_last_day_of_month, month_bounds, parse_date,
+                                   parse_day)
 
 class TestDateUtils(unittest.TestCase):
     def test_parse_date_valid(self):
@@ -23,4 +24,25 @@ class TestDateUtils(unittest.TestCase):
         # February leap
         self.assertEqual(get_last_day_of_month(2024, 2), datetime(2024, 2, 29))
         # December
-        self.assertEqual(get_last_day_of_month(2023, 12), datetime(2023, 12, 31))
\ No newline at end of file
+        self.assertEqual(get_last_day_of_month(2023, 12), datetime(2023, 12, 31))
+
+    def test_parse_day_matches_datetime_ordinals(self):
+        for date_str, date in (("20230615", datetime(2023, 6, 15)),
+                               ("20240229", datetime(2024, 2, 29)),
+                               ("19991231", datetime(1999, 12, 31))):
+            self.assertEqual(parse_day(date_str), date.toordinal())
+            self.assertEqual(format_day(date.toordinal()), date_str)
+
+    def test_parse_day_rejects_impossible_dates(self):
+        for date_str, message in (("20231301", "month must be in 1..12"),
+                                  ("20230229", "day is out of range for month"),
+                                  ("20230400", "day is out of range for month"),
+                                  ("00000101", "year 0 is out of range")):
+            with self.assertRaisesRegex(ValueError, message):
+                parse_day(date_str)
+
+    def test_month_bounds(self):
+        self.assertEqual(month_bounds(2024, 2), (datetime(2024, 2, 1).toordinal(),
+                                                 datetime(2024, 2, 29).toordinal()))
+        with self.assertRaises(ValueError):
+            month_bounds(2024, 0)
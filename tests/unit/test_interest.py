@@ -0,0 +1,54 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from fractions import Fraction
+
+from bank.services.interest import (accrue_interest, accrue_interest_batch, allocate_cents,
+                                    period_balance_days)
+
+def day(year, month, d):
+    return datetime(year, month, d).toordinal()
+
+class TestInterestAccrual(unittest.TestCase):
+    def setUp(self):
+        self.periods = [
+            (day(2023, 6, 1), day(2023, 6, 14), Decimal('0.019')),
+            (day(2023, 6, 15), day(2023, 6, 30), Decimal('0.022')),
+        ]
+        self.movements = [
+            (day(2023, 6, 1), 15000),
+            (day(2023, 6, 26), -2000),
+            (day(2023, 6, 26), -10000),
+        ]
+
+    def test_accrue_interest(self):
+        interest = accrue_interest(self.periods, self.movements, 10000)
+        self.assertEqual(interest, Decimal('0.39'))
+
+    def test_accrue_interest_is_exact_for_large_balances(self):
+        periods = [(day(2023, 6, 1), day(2023, 6, 30), Decimal('0.05'))]
+        interest = accrue_interest(periods, [], 123456789012)
+        # 1,234,567,890.12 x 5% x 30 / 365 = 5,073,566.671726...
+        self.assertEqual(interest, Decimal('5073566.67'))
+
+    def test_accrue_interest_without_movements(self):
+        interest = accrue_interest(self.periods, [], 0)
+        self.assertEqual(interest, Decimal('0.00'))
+
+    def test_accrue_interest_batch(self):
+        results = accrue_interest_batch(self.periods, [
+            ("AC001", 10000, self.movements),
+            ("AC002", 0, []),
+        ])
+        self.assertEqual(results, [("AC001", Decimal('0.39')), ("AC002", Decimal('0.00'))])
+
+    def test_period_balance_days(self):
+        # 10000 x 0 days, then 25000 x 14 days; 25000 x 11 days, then 13000 x 5 days
+        self.assertEqual(period_balance_days(self.periods, self.movements, 10000),
+                         [350000, 340000])
+
+    def test_allocate_cents(self):
+        self.assertEqual(allocate_cents(10, [Fraction(1), Fraction(1), Fraction(1)]), [4, 3, 3])
+        self.assertEqual(allocate_cents(-10, [Fraction(1), Fraction(2)]), [-3, -7])
+        self.assertEqual(allocate_cents(5, [Fraction(0), Fraction(0)]), [0, 5])
+        self.assertEqual(sum(allocate_cents(101, [Fraction(1, 3), Fraction(2, 7)])), 101)
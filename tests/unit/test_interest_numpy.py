@@ -0,0 +1,73 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.services.bank_service import BankService
+from bank.services.interest import accrue_interest_batch
+
+try:
+    from bank.services.interest_numpy import accrue_interest_batch_numpy
+except ImportError:  # numpy is optional
+    accrue_interest_batch_numpy = None
+
+def day(year, month, d):
+    return datetime(year, month, d).toordinal()
+
+@unittest.skipIf(accrue_interest_batch_numpy is None, "numpy is not installed")
+class TestNumpyInterestBackend(unittest.TestCase):
+    def setUp(self):
+        self.periods = [
+            (day(2023, 6, 1), day(2023, 6, 14), Decimal('0.019')),
+            (day(2023, 6, 15), day(2023, 6, 30), Decimal('0.022')),
+        ]
+        self.snapshots = [
+            ("AC001", 10000, [
+                (day(2023, 6, 1), 15000),
+                (day(2023, 6, 26), -2000),
+                (day(2023, 6, 26), -10000),
+            ]),
+            ("AC002", 0, []),
+            ("AC003", 250050, [(day(2023, 6, 30), 9999)]),
+            ("AC004", 123456789012, []),
+        ]
+
+    def test_matches_decimal_engine(self):
+        self.assertEqual(accrue_interest_batch_numpy(self.periods, self.snapshots),
+                         accrue_interest_batch(self.periods, self.snapshots))
+
+    def test_large_balances_do_not_overflow(self):
+        snapshots = [("AC001", 10 ** 17, [])]
+        self.assertEqual(accrue_interest_batch_numpy(self.periods, snapshots),
+                         accrue_interest_batch(self.periods, snapshots))
+
+    def test_balances_beyond_int64_fall_back_to_exact_arithmetic(self):
+        snapshots = [("AC001", 9223372036854775800, [(day(2023, 6, 5), 100)]),
+                     ("AC002", 2 ** 64, [])]
+        self.assertEqual(accrue_interest_batch_numpy(self.periods, snapshots),
+                         accrue_interest_batch(self.periods, snapshots))
+
+    def test_precise_rates_fall_back_to_exact_arithmetic(self):
+        periods = [(day(2023, 6, 1), day(2023, 6, 30), Decimal('1.0000000000000000001'))]
+        snapshots = [("AC001", 100, [])]
+        self.assertEqual(accrue_interest_batch_numpy(periods, snapshots),
+                         accrue_interest_batch(periods, snapshots))
+
+    def test_empty_batch(self):
+        self.assertEqual(accrue_interest_batch_numpy(self.periods, []), [])
+
+    def test_service_backend(self):
+        results = {}
+        for backend in ('decimal', 'numpy'):
+            service = BankService(interest_backend=backend)
+            service.add_transaction("AC001", datetime(2023, 5, 5), "D", Decimal('100.00'))
+            service.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('150.00'))
+            service.add_transaction("AC001", datetime(2023, 6, 26), "W", Decimal('20.00'))
+            service.add_interest_rule(datetime(2023, 6, 1), "RULE02", Decimal('1.90'))
+            service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('2.20'))
+            results[backend] = service.calculate_interest_for_month("AC001", 2023, 6)
+        self.assertEqual(results['numpy'], results['decimal'])
+
+class TestInterestBackendSelection(unittest.TestCase):
+    def test_invalid_interest_backend(self):
+        with self.assertRaises(ValueError):
+            BankService(interest_backend='unknown')
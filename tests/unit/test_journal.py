@@ -0,0 +1,131 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from bank.services.bank_service import BankService
+from bank.storage.journal import (RECORD_SIZE, RULE_RECORD, TRANSACTION_RECORD, Journal,
+                                  pack_rule, pack_transaction, read_journal)
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bank.journal")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_round_trip(self):
+        journal = Journal(self.path)
+        day = datetime(2023, 6, 1).toordinal()
+        journal.append(pack_transaction("AC001", day, 0, 15000, 1))
+        journal.append(pack_rule(day, "RULE01", Decimal('1.95')))
+        journal.close()
+
+        self.assertEqual(list(read_journal(self.path)), [
+            (TRANSACTION_RECORD, "AC001", day, 0, 15000, 1),
+            (RULE_RECORD, "RULE01", datetime(2023, 6, 1), Decimal('1.95')),
+        ])
+
+    def test_group_commit(self):
+        journal = Journal(self.path, group_size=2, max_delay=3600)
+        journal.append(pack_transaction("AC001", 1, 0, 100, 1))
+        self.assertEqual(os.path.getsize(self.path), 0)
+        journal.append(pack_transaction("AC001", 1, 0, 100, 2))
+        self.assertEqual(os.path.getsize(self.path), 2 * RECORD_SIZE)
+        journal.close()
+
+    def test_idle_journal_commits_after_max_delay(self):
+        journal = Journal(self.path, group_size=100, max_delay=0.01)
+        journal.append(pack_transaction("AC001", 1, 0, 100, 1))
+        deadline = time.monotonic() + 5
+        while os.path.getsize(self.path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
+        journal.close()
+
+    def test_durable_append_returns_once_fsynced(self):
+        journal = Journal(self.path, group_size=100, max_delay=3600, durable=True)
+        journal.append(pack_transaction("AC001", 1, 0, 100, 1))
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
+        journal.close()
+
+    def test_concurrent_durable_appends_share_fsyncs(self):
+        journal = Journal(self.path, durable=True)
+        fsyncs, unsynced = [], []
+        fsync = os.fsync
+
+        def slow_fsync(fd):
+            fsyncs.append(fd)
+            time.sleep(0.01)
+            fsync(fd)
+
+        def append(thread):
+            for sequence in range(20):
+                journal.append(pack_transaction(f"AC{thread:03d}", 1, 0, 100, sequence))
+                # Every acknowledged record is already on disk
+                if os.path.getsize(self.path) < (sequence + 1) * RECORD_SIZE:
+                    unsynced.append((thread, sequence))
+
+        with patch('bank.storage.journal.os.fsync', side_effect=slow_fsync):
+            threads = [threading.Thread(target=append, args=(i,)) for i in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        journal.close()
+        self.assertEqual(unsynced, [])
+        self.assertEqual(len(list(read_journal(self.path))), 160)
+        self.assertLess(len(fsyncs), 160)
+
+    def test_torn_tail_is_dropped(self):
+        journal = Journal(self.path)
+        journal.append(pack_transaction("AC001", 1, 0, 100, 1))
+        journal.close()
+        with open(self.path, "ab") as f:
+            f.write(b"\x01\x02\x03")
+        self.assertEqual(len(list(read_journal(self.path))), 1)
+
+        Journal(self.path).close()
+        self.assertEqual(os.path.getsize(self.path), RECORD_SIZE)
+
+    def test_rejects_oversized_ids(self):
+        with self.assertRaises(ValueError):
+            pack_transaction("A" * 33, 1, 0, 100, 1)
+
+    def test_service_restore(self):
+        service = BankService.restore(self.path)
+        service.add_transaction("AC001", datetime(2023, 5, 5), "D", Decimal('100.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 26), "W", Decimal('20.00'))
+        service.add_interest_rule(datetime(2023, 6, 1), "RULE02", Decimal('1.90'))
+        interest = service.calculate_interest_for_month("AC001", 2023, 6)
+        service.post_interest("AC001", datetime(2023, 6, 28), interest)
+        with self.assertRaises(ValueError):
+            service.add_transaction("AC001", datetime(2023, 6, 27), "W", Decimal('500.00'))
+        service.close()
+
+        restored = BankService.restore(self.path)
+        account = restored.accounts["AC001"]
+        self.assertEqual(account.balance, service.accounts["AC001"].balance)
+        self.assertEqual([(t.transaction_id, t.amount) for t in account.transactions],
+                         [(t.transaction_id, t.amount) for t in service.accounts["AC001"].transactions])
+        self.assertEqual(restored.interest_rules[0].rate, Decimal('1.90'))
+        self.assertEqual(restored.add_transaction("AC001", datetime(2023, 6, 26), "D",
+                                                  Decimal('1.00')).transaction_id, "20230626-02")
+        restored.close()
+
+    def test_restore_replays_closes_without_interest(self):
+        service = BankService.restore(self.path)
+        service.add_transaction("AC001", datetime(2023, 6, 5), "D", Decimal('100.00'))
+        self.assertEqual(service.close_month("AC001", 2023, 6), Decimal('0.00'))
+        service.close()
+
+        restored = BankService.restore(self.path)
+        self.assertEqual(len(restored.accounts["AC001"].transactions), 1)
+        with self.assertRaisesRegex(ValueError, "Month is closed"):
+            restored.add_transaction("AC001", datetime(2023, 6, 30), "D", Decimal('1.00'))
+        restored.close()
@@ -0,0 +1,99 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.models.ledger import TransactionLedger
+from bank.models.transaction import Deposit, Interest, Withdrawal
+
+class TestTransactionLedger(unittest.TestCase):
+    def setUp(self):
+        self.ledger = TransactionLedger()
+
+    def test_keeps_date_order_with_back_dated_insert(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 15), Decimal('100.00'), "20230615-01"))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('50.00'), "20230601-01"))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 15), Decimal('25.00'), "20230615-02"))
+        self.assertEqual([t.transaction_id for t in self.ledger],
+                         ["20230601-01", "20230615-01", "20230615-02"])
+
+    def test_entries_are_rebuilt_as_transactions(self):
+        ledger = TransactionLedger("AC001")
+        ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('50.00'), "20230601-01"))
+        ledger.insert(Withdrawal("AC001", datetime(2023, 6, 2), Decimal('20.00'), "20230602-01"))
+        ledger.insert(Interest("AC001", datetime(2023, 6, 30), Decimal('0.05')))
+        withdrawal, interest = ledger[1], ledger[-1]
+        self.assertIsInstance(withdrawal, Withdrawal)
+        self.assertEqual(withdrawal.account_id, "AC001")
+        self.assertEqual(withdrawal.date, datetime(2023, 6, 2))
+        self.assertEqual(withdrawal.amount, Decimal('20.00'))
+        self.assertIsInstance(interest, Interest)
+        self.assertEqual(interest.transaction_id, "")
+        self.assertEqual(len(ledger[0:2]), 2)
+        with self.assertRaises(IndexError):
+            ledger[3]
+
+    def test_rejects_non_canonical_transaction_id(self):
+        with self.assertRaises(ValueError):
+            self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('1.00'), "20230602-01"))
+
+    def test_negative_interest(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('10.00')))
+        self.ledger.insert(Interest("AC001", datetime(2023, 6, 30), Decimal('-0.25')))
+        self.assertEqual(self.ledger[-1].signed_amount, Decimal('-0.25'))
+        self.assertEqual(self.ledger.month_end_balance(2023, 6), Decimal('9.75'))
+
+    def test_movements(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('50.00')))
+        self.ledger.insert(Withdrawal("AC001", datetime(2023, 6, 2), Decimal('20.00')))
+        day = datetime(2023, 6, 1).toordinal()
+        self.assertEqual(self.ledger.movements(0, 2), [(day, 5000), (day + 1, -2000)])
+
+    def test_memory_per_entry(self):
+        for i in range(10000):
+            self.ledger.insert(Deposit("AC001", datetime(2023, 1, 1 + i % 28), Decimal('1.00')))
+        self.assertLess(self.ledger.memory_usage() / len(self.ledger), 40)
+
+    def test_count_on_day(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('10.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('10.00')))
+        self.assertEqual(self.ledger.count_on_day(datetime(2023, 6, 1)), 2)
+        self.assertEqual(self.ledger.count_on_day(datetime(2023, 6, 2)), 0)
+
+    def test_month_slice(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 5, 31), Decimal('10.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('20.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 30), Decimal('30.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 7, 1), Decimal('40.00')))
+        june = self.ledger.month_slice(2023, 6)
+        self.assertEqual([t.amount for t in june], [Decimal('20.00'), Decimal('30.00')])
+        self.assertEqual(self.ledger.month_slice(2023, 12), [])
+
+    def test_balance_up_to_after_back_dated_insert(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 1), Decimal('100.00')))
+        self.ledger.insert(Withdrawal("AC001", datetime(2023, 6, 20), Decimal('30.00')))
+        self.assertEqual(self.ledger.balance_up_to(datetime(2023, 6, 30)), Decimal('70.00'))
+
+        self.ledger.insert(Deposit("AC001", datetime(2023, 6, 10), Decimal('5.00')))
+        self.assertEqual(self.ledger.balance_up_to(datetime(2023, 5, 31)), Decimal('0'))
+        self.assertEqual(self.ledger.balance_up_to(datetime(2023, 6, 10)), Decimal('105.00'))
+        self.assertEqual(self.ledger.balance_up_to(datetime(2023, 6, 30)), Decimal('75.00'))
+
+    def test_month_end_balance_checkpoints(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 1, 10), Decimal('100.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 3, 10), Decimal('50.00')))
+        self.assertEqual(self.ledger.month_end_balance(2022, 12), Decimal('0'))
+        self.assertEqual(self.ledger.month_end_balance(2023, 2), Decimal('100.00'))
+        self.assertEqual(self.ledger.month_end_balance(2023, 6), Decimal('150.00'))
+
+    def test_back_dated_insert_invalidates_later_checkpoints(self):
+        self.ledger.insert(Deposit("AC001", datetime(2023, 1, 10), Decimal('100.00')))
+        self.ledger.insert(Deposit("AC001", datetime(2023, 3, 10), Decimal('50.00')))
+        self.assertEqual(self.ledger.month_end_balance(2023, 3), Decimal('150.00'))
+
+        self.ledger.insert(Withdrawal("AC001", datetime(2023, 2, 5), Decimal('20.00')))
+        self.assertEqual(self.ledger.month_end_balance(2023, 1), Decimal('100.00'))
+        self.assertEqual(self.ledger.month_end_balance(2023, 2), Decimal('80.00'))
+        self.assertEqual(self.ledger.month_end_balance(2023, 3), Decimal('130.00'))
+
+        self.ledger.insert(Deposit("AC001", datetime(2022, 11, 1), Decimal('1.00')))
+        self.assertEqual(self.ledger.month_end_balance(2023, 3), Decimal('131.00'))
@@ -0,0 +1,93 @@
+import threading
+import time
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.services.bank_service import BankService
+from bank.utils.locks import ReadWriteLock, StripedLock
+
+class TestLocks(unittest.TestCase):
+    def test_striped_lock_is_stable_per_key(self):
+        locks = StripedLock(8)
+        self.assertIs(locks("AC001"), locks("AC001"))
+        self.assertEqual(len({locks.index(f"AC{i:03d}") for i in range(100)}), 8)
+
+    def test_readers_share_and_writers_exclude(self):
+        lock = ReadWriteLock()
+        read_entered = threading.Event()
+        write_entered = threading.Event()
+
+        def read():
+            with lock.read():
+                read_entered.set()
+
+        def write():
+            with lock.write():
+                write_entered.set()
+
+        with lock.read():
+            reader = threading.Thread(target=read)
+            reader.start()
+            reader.join(1)
+            self.assertTrue(read_entered.is_set())
+            with lock.read():  # reentrant
+                writer = threading.Thread(target=write)
+                writer.start()
+                time.sleep(0.05)
+                self.assertFalse(write_entered.is_set())
+        writer.join(1)
+        self.assertTrue(write_entered.is_set())
+
+    def test_upgrade_raises(self):
+        lock = ReadWriteLock()
+        with lock.read():
+            with self.assertRaises(RuntimeError):
+                with lock.write():
+                    pass
+        with lock.write():
+            with lock.read():
+                with lock.write():
+                    pass
+
+class TestThreadSafeService(unittest.TestCase):
+    def test_concurrent_posting_and_statements(self):
+        service = BankService(thread_safe=True, lock_stripes=4)
+        service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+        errors = []
+
+        def client(account_id: str):
+            try:
+                for day in range(1, 21):
+                    service.add_transaction(account_id, datetime(2023, 6, day), "D", Decimal('10.00'))
+                    service.add_transaction("SHARED", datetime(2023, 6, 1), "D", Decimal('1.00'))
+                    service.get_account_statement(account_id, 2023, 6)
+                    if day == 10:
+                        service.add_interest_rule(datetime(2023, 6, 15), "RULE02", Decimal('2.00'))
+            except Exception as e:  # surfaced by the assertion below
+                errors.append(e)
+
+        threads = [threading.Thread(target=client, args=(f"AC{i:03d}",)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        for i in range(8):
+            self.assertEqual(service.accounts[f"AC{i:03d}"].balance, Decimal('200.00'))
+        shared = service.accounts["SHARED"]
+        self.assertEqual(shared.balance, Decimal('160.00'))
+        self.assertEqual({t.transaction_id for t in shared.transactions},
+                         {f"20230601-{n:02d}" for n in range(1, 161)})
+
+        expected = BankService()
+        expected.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+        expected.add_interest_rule(datetime(2023, 6, 15), "RULE02", Decimal('2.00'))
+        for day in range(1, 21):
+            expected.add_transaction("AC000", datetime(2023, 6, day), "D", Decimal('10.00'))
+        self.assertEqual(service.get_account_statement("AC000", 2023, 6),
+                         expected.get_account_statement("AC000", 2023, 6))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import time
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.services.bank_service import BankService
+from bank.utils.metrics import MetricsRegistry, SamplingProfiler, Summary
+
+class TestMetricsRegistry(unittest.TestCase):
+    def test_summary_quantiles(self):
+        summary = Summary(reservoir_size=100)
+        for value in range(1, 1001):
+            summary.observe(value)
+        self.assertEqual(summary.count, 1000)
+        self.assertEqual(summary.sum, 500500)
+        self.assertLess(abs(summary.quantile(0.5) - 500), 150)
+
+    def test_prometheus_and_json(self):
+        registry = MetricsRegistry()
+        registry.inc(registry.counter("requests_total", "Requests", op="post"), 3)
+        registry.observe(registry.summary("latency_seconds", "Latency"), 0.25)
+        registry.gauge("queue_depth", lambda: 7, "Queued items")
+        text = registry.to_prometheus()
+        self.assertIn("# TYPE requests_total counter", text)
+        self.assertIn('requests_total{op="post"} 3', text)
+        self.assertIn('latency_seconds{quantile="0.5"} 0.25', text)
+        self.assertIn("latency_seconds_count 1", text)
+        self.assertIn("queue_depth 7", text)
+        dumped = json.loads(registry.dump_json())
+        self.assertEqual(dumped['counters'],
+                         [{'name': 'requests_total', 'labels': {'op': 'post'}, 'value': 3}])
+
+    def test_sampling_profiler(self):
+        registry = MetricsRegistry()
+        with SamplingProfiler(registry, interval=0.001):
+            deadline = time.perf_counter() + 0.05
+            while time.perf_counter() < deadline:
+                pass
+        functions = {entry['labels']['function'] for entry in registry.to_json()['counters']}
+        self.assertIn("test_sampling_profiler", functions)
+
+class TestServiceMetrics(unittest.TestCase):
+    def test_disabled_by_default(self):
+        service = BankService()
+        self.assertIsNone(service.metrics)
+        self.assertNotIn('add_transaction', vars(service))
+
+    def test_instrumented_service(self):
+        registry = MetricsRegistry()
+        service = BankService(metrics=registry)
+        service.add_interest_rule(datetime(2023, 6, 1), "RULE01", Decimal('2.00'))
+        for day in (1, 5, 26):
+            service.add_transaction("AC001", datetime(2023, 6, day), "D", Decimal('100.00'))
+        service.get_account_statement("AC001", 2023, 6)
+        service.get_account_statement("AC001", 2023, 6)
+
+        metrics = registry.to_json()
+        calls = {entry['labels']['method']: entry['count'] for entry in metrics['summaries']
+                 if entry['name'] == 'bank_call_seconds'}
+        self.assertEqual(calls['add_transaction'], 3)
+        self.assertEqual(calls['get_account_statement'], 2)
+        scans = [entry for entry in metrics['summaries']
+                 if entry['name'] == 'bank_statement_transactions_scanned']
+        self.assertEqual((scans[0]['count'], scans[0]['sum']), (1, 3))
+        cache = {entry['labels']['result']: entry['value'] for entry in metrics['counters']}
+        self.assertEqual(cache['hit'], 1)
+        self.assertIn('bank_account_read_seconds{method="get_transactions_for_month"',
+                      registry.to_prometheus())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import unittest
+from decimal import Decimal
+from fractions import Fraction
+
+from bank.models.money import Money, round_cents
+
+class TestMoney(unittest.TestCase):
+    def test_of(self):
+        self.assertEqual(Money.of(Decimal('100.50')).cents, 10050)
+        self.assertEqual(Money.of('0.07').cents, 7)
+        self.assertEqual(Money.of(3).cents, 300)
+        with self.assertRaises(ValueError):
+            Money.of(Decimal('1.005'))
+        with self.assertRaises(TypeError):
+            Money.of(1.5)
+
+    def test_of_rejects_amounts_a_ledger_cannot_hold(self):
+        for value in ('NaN', 'Infinity', '-Infinity', '1e20', '-1e999999999'):
+            with self.assertRaises(ValueError):
+                Money.of(Decimal(value))
+        with self.assertRaises(ValueError):
+            Money.of(10 ** 17)
+        self.assertEqual(Money.of(Decimal('92233720368547758.07')).cents, (1 << 63) - 1)
+
+    def test_arithmetic_is_exact_at_any_magnitude(self):
+        balance = Money.of(Decimal('123456789.01')) + Money.of(Decimal('0.99'))
+        self.assertEqual(balance, Decimal('123456790.00'))
+        self.assertEqual((balance - Money.of(Decimal('0.01'))).cents, 12345678999)
+
+    def test_mixed_with_decimal(self):
+        self.assertEqual(Decimal('50.00') + Money(10000), Decimal('150.00'))
+        self.assertEqual(Decimal('150.00') - Money(10000), Money(5000))
+        self.assertTrue(Decimal('50.00') < Money(10000))
+        self.assertTrue(Money(1) > 0)
+        self.assertEqual(hash(Money(10000)), hash(Decimal('100.00')))
+
+    def test_format(self):
+        self.assertEqual(f"{Money(13039):7.2f}", " 130.39")
+        self.assertEqual(str(Money(-5)), "-0.05")
+
+    def test_round_cents_half_even(self):
+        self.assertEqual(round_cents(Fraction(5, 2)).cents, 2)
+        self.assertEqual(round_cents(Fraction(7, 2)).cents, 4)
+        self.assertEqual(round_cents(Fraction(-5, 2)).cents, -2)
@@ -0,0 +1,31 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.models.interest_rule import InterestRule
+from bank.models.rule_timeline import InterestRuleTimeline
+
+class TestInterestRuleTimeline(unittest.TestCase):
+    def setUp(self):
+        self.timeline = InterestRuleTimeline()
+        self.timeline.upsert(InterestRule(datetime(2023, 6, 15), "RULE03", Decimal('2.20')))
+        self.timeline.upsert(InterestRule(datetime(2023, 1, 1), "RULE01", Decimal('1.95')))
+        self.timeline.upsert(InterestRule(datetime(2023, 5, 20), "RULE02", Decimal('1.90')))
+
+    def test_rules_sorted_by_date(self):
+        self.assertEqual([r.rule_id for r in self.timeline], ["RULE01", "RULE02", "RULE03"])
+
+    def test_upsert_replaces_same_day_rule(self):
+        self.timeline.upsert(InterestRule(datetime(2023, 5, 20), "RULE04", Decimal('3.00')))
+        self.assertEqual(len(self.timeline), 3)
+        self.assertEqual(self.timeline[1].rule_id, "RULE04")
+
+    def test_rules_in_window(self):
+        rules = self.timeline.rules_in_window(datetime(2023, 6, 1), datetime(2023, 6, 30))
+        self.assertEqual([r.rule_id for r in rules], ["RULE02", "RULE03"])
+
+        rules = self.timeline.rules_in_window(datetime(2023, 6, 15), datetime(2023, 6, 30))
+        self.assertEqual([r.rule_id for r in rules], ["RULE03"])
+
+        rules = self.timeline.rules_in_window(datetime(2022, 12, 1), datetime(2022, 12, 31))
+        self.assertEqual(rules, [])
@@ -0,0 +1,96 @@
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.services.bank_service import BankService
+from bank.services.sharded_service import ShardedBankService, shard_of
+
+ACCOUNTS = [f"AC{i:03d}" for i in range(20)]
+
+class TestShardedBankService(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.sharded = ShardedBankService(shards=3)
+        cls.single = BankService()
+        records = []
+        for day in range(1, 29):
+            for i, account_id in enumerate(ACCOUNTS):
+                records.append((datetime(2023, 6, day), account_id, "D", Decimal(i + day)))
+        records.append((datetime(2023, 6, 2), "AC001", "W", Decimal('1000000')))
+        for service in (cls.sharded, cls.single):
+            service.add_interest_rule(datetime(2023, 6, 1), "RULE01", Decimal('1.95'))
+            service.add_interest_rule(datetime(2023, 6, 15), "RULE02", Decimal('2.20'))
+            cls.errors = service.add_transactions_bulk(records)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.sharded.close()
+
+    def test_accounts_spread_over_shards(self):
+        self.assertEqual({shard_of(account_id, 3) for account_id in ACCOUNTS}, {0, 1, 2})
+        self.assertEqual(shard_of("AC001", 3), shard_of("AC001", 3))
+
+    def test_same_results_as_a_single_service(self):
+        self.assertEqual(self.errors, [(len(ACCOUNTS) * 28, "Insufficient funds")])
+        self.assertEqual(self.sharded.get_account_statements(ACCOUNTS, 2023, 6),
+                         self.single.get_account_statements(ACCOUNTS, 2023, 6))
+        transaction = self.sharded.add_transaction("AC005", datetime(2023, 7, 3), "W",
+                                                   Decimal('1.00'))
+        self.assertEqual(transaction.transaction_id, "20230703-01")
+        self.assertEqual(self.sharded.calculate_interest_for_month("AC005", 2023, 6),
+                         self.single.calculate_interest_for_month("AC005", 2023, 6))
+        self.assertEqual([(r.rule_id, r.rate) for r in self.sharded.interest_rules],
+                         [("RULE01", Decimal('1.95')), ("RULE02", Decimal('2.20'))])
+
+    def test_errors_are_raised_in_the_caller(self):
+        with self.assertRaisesRegex(ValueError, "Account not found"):
+            self.sharded.get_account_statement("MISSING", 2023, 6)
+        with self.assertRaisesRegex(ValueError, "Insufficient funds"):
+            self.sharded.add_transaction("AC002", datetime(2023, 6, 28), "W", Decimal('1000000'))
+        self.assertTrue(self.sharded.has_account("AC002"))
+        self.assertFalse(self.sharded.has_account("MISSING"))
+
+    def test_unexpected_errors_leave_the_shard_serving(self):
+        with self.assertRaises(TypeError):
+            self.sharded.add_transaction("AC003", datetime(2023, 6, 28), "D", 1.5)
+        self.assertTrue(self.sharded.has_account("AC003"))
+
+    def test_month_end_interest_matches(self):
+        sharded = ShardedBankService(shards=2)
+        single = BankService()
+        try:
+            for service in (sharded, single):
+                service.add_interest_rule(datetime(2023, 5, 1), "RULE01", Decimal('2.00'))
+                for account_id in ACCOUNTS[:6]:
+                    service.add_transaction(account_id, datetime(2023, 5, 3), "D",
+                                            Decimal('500.00'))
+            self.assertEqual(sharded.post_month_end_interest(2023, 5),
+                             single.post_month_end_interest(2023, 5, workers=1))
+            self.assertEqual(sharded.close_month("AC001", 2023, 5),
+                             single.close_month("AC001", 2023, 5))
+        finally:
+            sharded.close()
+
+    def test_reporting_merges_shards(self):
+        sharded = ShardedBankService(shards=2)
+        single = BankService()
+        try:
+            for service in (sharded, single):
+                service.add_interest_rule(datetime(2023, 5, 1), "RULE01", Decimal('2.00'))
+                for i, account_id in enumerate(ACCOUNTS[:6]):
+                    service.add_transaction(account_id, datetime(2023, 5, 3), "D",
+                                            Decimal(100 * (i % 3) + 50))
+            sharded.post_month_end_interest(2023, 5)
+            single.post_month_end_interest(2023, 5, workers=1)
+            self.assertEqual(sharded.monthly_totals(2023, 5), single.monthly_totals(2023, 5))
+            self.assertEqual(sharded.top_accounts_by_balance(4), single.top_accounts_by_balance(4))
+            self.assertEqual(sharded.top_accounts_by_interest(2),
+                             single.top_accounts_by_interest(2))
+            self.assertEqual(sharded.accounts_with_balance_above(Decimal('100.00')),
+                             single.accounts_with_balance_above(Decimal('100.00')))
+            self.assertEqual(sharded.interest_by_rule(), single.interest_by_rule())
+        finally:
+            sharded.close()
+
+if __name__ == '__main__':
+    unittest.main()
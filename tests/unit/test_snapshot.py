@@ -0,0 +1,138 @@
+import os
+import tempfile
+import threading
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.services.bank_service import BankService
+from bank.storage.journal import read_journal
+from bank.storage.snapshot import load_snapshot
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.journal_path = os.path.join(self.tmpdir.name, "bank.journal")
+        self.snapshot_path = os.path.join(self.tmpdir.name, "bank.snapshot")
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _populate(self, service: BankService):
+        service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+        service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('2.20'))
+        service.add_transaction("AC001", datetime(2023, 5, 5), "D", Decimal('100.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('150.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 1), "W", Decimal('20.00'))
+        service.add_transaction("AC002", datetime(2023, 6, 26), "D", Decimal('75.50'))
+        # A back-dated entry leaves a stale month and trimmed checkpoints behind
+        service.accounts["AC001"].get_month_end_balance(2023, 6)
+        service.add_transaction("AC001", datetime(2023, 5, 20), "W", Decimal('10.00'))
+
+    def test_round_trip(self):
+        service = BankService()
+        self._populate(service)
+        service.snapshot(self.snapshot_path)
+
+        restored = BankService()
+        self.assertEqual(load_snapshot(restored, self.snapshot_path), 0)
+        self.assertEqual([(r.date, r.rule_id, r.rate) for r in restored.interest_rules],
+                         [(r.date, r.rule_id, r.rate) for r in service.interest_rules])
+        for account_id, account in service.accounts.items():
+            copy = restored.accounts[account_id]
+            self.assertEqual(copy.balance, account.balance)
+            self.assertEqual([(t.date, t.transaction_id, t.signed_amount)
+                              for t in copy.transactions],
+                             [(t.date, t.transaction_id, t.signed_amount)
+                              for t in account.transactions])
+            self.assertEqual(copy.get_month_end_balance(2023, 6),
+                             account.get_month_end_balance(2023, 6))
+        self.assertEqual(restored.get_account_statement("AC001", 2023, 6),
+                         service.get_account_statement("AC001", 2023, 6))
+
+        restored.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('5.00'))
+        self.assertEqual(restored.accounts["AC001"].transactions[-1].transaction_id,
+                         "20230601-03")
+
+    def test_round_trip_keeps_closed_months(self):
+        service = BankService()
+        self._populate(service)
+        service.close_month("AC002", 2023, 6)
+        service.snapshot(self.snapshot_path)
+
+        restored = BankService()
+        load_snapshot(restored, self.snapshot_path)
+        self.assertEqual(restored.accounts["AC002"].closed_through, 2023 * 12 + 5)
+        self.assertIsNone(restored.accounts["AC001"].closed_through)
+        self.assertEqual(restored.add_interest_rule(datetime(2023, 6, 26), "RULE02",
+                                                    Decimal('3.00'))[0].account_id, "AC002")
+
+    def test_restore_replays_only_the_tail(self):
+        service = BankService.restore(self.journal_path, self.snapshot_path)
+        self._populate(service)
+        service.snapshot(self.snapshot_path)
+        service.add_transaction("AC002", datetime(2023, 7, 3), "W", Decimal('25.50'))
+        expected = service.get_account_statement("AC002", 2023, 7)
+        service.close()
+
+        restored = BankService.restore(self.journal_path, self.snapshot_path)
+        self.assertEqual(restored.accounts["AC002"].balance, Decimal('50.00'))
+        self.assertEqual(restored.get_account_statement("AC002", 2023, 7), expected)
+        restored.close()
+        self.assertEqual(len(list(read_journal(self.journal_path, 7))), 1)
+
+    def test_restore_with_fenwick_engine(self):
+        service = BankService.restore(self.journal_path, self.snapshot_path)
+        self._populate(service)
+        service.snapshot(self.snapshot_path)
+        expected = service.calculate_interest_for_month("AC001", 2023, 6)
+        service.close()
+
+        restored = BankService.restore(self.journal_path, self.snapshot_path,
+                                       balance_engine='fenwick')
+        self.assertEqual(restored.calculate_interest_for_month("AC001", 2023, 6), expected)
+        restored.close()
+
+    def test_background_snapshots_at_interval(self):
+        service = BankService.restore(self.journal_path, self.snapshot_path,
+                                      snapshot_interval=3)
+        self._populate(service)
+        service.close()
+        self.assertTrue(os.path.exists(self.snapshot_path))
+
+        restored = BankService()
+        position = load_snapshot(restored, self.snapshot_path)
+        self.assertGreaterEqual(position, 3)
+        restored.replay_journal(self.journal_path, position)
+        self.assertEqual(restored.accounts["AC001"].balance, Decimal('220.00'))
+
+    def test_background_snapshots_while_threads_post(self):
+        service = BankService.restore(self.journal_path, self.snapshot_path,
+                                      snapshot_interval=50, thread_safe=True)
+
+        def client(account_id: str):
+            for day in range(1, 29):
+                service.add_transaction(account_id, datetime(2023, 6, day), "D", Decimal('1.00'))
+
+        threads = [threading.Thread(target=client, args=(f"AC{i:03d}",)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        service.close()
+
+        restored = BankService.restore(self.journal_path, self.snapshot_path)
+        self.assertEqual(len(restored.accounts), 6)
+        for account in restored.accounts.values():
+            self.assertEqual(account.balance, Decimal('28.00'))
+            self.assertEqual(len(account.transactions), 28)
+        restored.close()
+
+    def test_rejects_other_files(self):
+        with open(self.snapshot_path, "wb") as f:
+            f.write(b"\0" * 64)
+        with self.assertRaises(ValueError):
+            load_snapshot(BankService(), self.snapshot_path)
+
+if __name__ == '__main__':
+    unittest.main()
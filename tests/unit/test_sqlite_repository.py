@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+
+from bank.models.transaction import Interest
+from bank.services.bank_service import BankService
+from bank.storage.sqlite_repository import SqliteRepository
+
+class TestSqliteRepository(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, "bank.db")
+        self.service = BankService(repository=SqliteRepository(self.path, batch_size=3))
+
+    def tearDown(self):
+        self.service.close()
+        self.tmpdir.cleanup()
+
+    def _populate(self, service: BankService):
+        service.add_interest_rule(datetime(2023, 1, 1), "RULE01", Decimal('1.95'))
+        service.add_interest_rule(datetime(2023, 5, 20), "RULE02", Decimal('1.90'))
+        service.add_interest_rule(datetime(2023, 6, 15), "RULE03", Decimal('2.20'))
+        service.add_transaction("AC001", datetime(2023, 5, 5), "D", Decimal('100.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('150.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 26), "W", Decimal('20.00'))
+        service.add_transaction("AC001", datetime(2023, 6, 26), "W", Decimal('100.00'))
+        service.add_transaction("AC002", datetime(2023, 6, 10), "D", Decimal('75.25'))
+
+    def test_matches_in_memory_service(self):
+        memory = BankService()
+        self._populate(memory)
+        self._populate(self.service)
+
+        self.assertEqual(sorted(self.service.accounts), ["AC001", "AC002"])
+        self.assertEqual(self.service.get_account_statement("AC001", 2023, 6),
+                         memory.get_account_statement("AC001", 2023, 6))
+        self.assertEqual(self.service.calculate_interest_for_month("AC001", 2023, 6),
+                         Decimal('0.39'))
+        self.assertEqual(
+            self.service.calculate_interest_for_range("AC001", datetime(2023, 5, 10),
+                                                      datetime(2023, 6, 20)),
+            memory.calculate_interest_for_range("AC001", datetime(2023, 5, 10),
+                                                datetime(2023, 6, 20)))
+        self.assertEqual(self.service.post_month_end_interest(2023, 6, workers=1),
+                         memory.post_month_end_interest(2023, 6, workers=1))
+
+    def test_indexed_queries(self):
+        self._populate(self.service)
+        account = self.service.accounts["AC001"]
+        self.assertEqual(account.balance, Decimal('130.00'))
+        self.assertEqual(account.count_transactions_on(datetime(2023, 6, 26)), 2)
+        self.assertEqual(account.get_month_end_balance(2023, 5), Decimal('100.00'))
+        self.assertEqual(account.calculate_balance_up_to(datetime(2023, 6, 25)), Decimal('250.00'))
+        self.assertEqual([t.transaction_id for t in account.get_transactions_for_month(2023, 6)],
+                         ["20230601-01", "20230626-01", "20230626-02"])
+        self.assertEqual(account.get_movements_for_month(2023, 6),
+                         [(datetime(2023, 6, 1).toordinal(), 15000),
+                          (datetime(2023, 6, 26).toordinal(), -2000),
+                          (datetime(2023, 6, 26).toordinal(), -10000)])
+
+    def test_insufficient_funds_is_not_stored(self):
+        self.service.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('10.00'))
+        with self.assertRaises(ValueError):
+            self.service.add_transaction("AC001", datetime(2023, 6, 2), "W", Decimal('20.00'))
+        self.assertEqual(len(self.service.accounts["AC001"].transactions), 1)
+
+    def test_negative_interest_keeps_its_sign(self):
+        self.service.add_transaction("AC001", datetime(2023, 6, 1), "D", Decimal('10.00'))
+        account = self.service.accounts["AC001"]
+        account.add_entry(datetime(2023, 6, 30).toordinal(), Interest.code, -25, 1)
+        self.assertEqual(account.balance, Decimal('9.75'))
+        self.assertEqual([t.signed_amount for t in account.transactions],
+                         [Decimal('10.00'), Decimal('-0.25')])
+
+    def test_persists_across_reopen(self):
+        self._populate(self.service)
+        self.service.close()
+
+        self.service = BankService(repository=SqliteRepository(self.path))
+        self.assertEqual([rule.rule_id for rule in self.service.interest_rules],
+                         ["RULE01", "RULE02", "RULE03"])
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('130.00'))
+        transaction = self.service.add_transaction("AC001", datetime(2023, 6, 26), "D",
+                                                   Decimal('5.00'))
+        self.assertEqual(transaction.transaction_id, "20230626-03")
+
+    def test_closed_months_persist_across_reopen(self):
+        self._populate(self.service)
+        self.service.close_month("AC002", 2023, 6)
+        self.service.close()
+
+        self.service = BankService(repository=SqliteRepository(self.path))
+        self.assertEqual(self.service.accounts["AC002"].closed_through, 2023 * 12 + 5)
+        self.assertIsNone(self.service.accounts["AC001"].closed_through)
+        with self.assertRaisesRegex(ValueError, "Month is closed"):
+            self.service.add_transaction("AC002", datetime(2023, 6, 30), "D", Decimal('1.00'))
+
+    def test_rejects_fenwick_engine(self):
+        with self.assertRaises(ValueError):
+            BankService(balance_engine='fenwick', repository=self.service.repository)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import csv
+import os
+import tempfile
+import unittest
+from datetime import datetime
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from bank.services.bank_service import BankService
+from bank.services.statement_export import export_statements
+from bank.ui.console_ui import BankConsoleUI
+
+ACCOUNTS = [f"AC{i:03d}" for i in range(7)]
+
+class TestStatementExport(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.service = BankService()
+        self.service.add_interest_rule(datetime(2023, 6, 1), "RULE01", Decimal('1.95'))
+        self.service.add_interest_rule(datetime(2023, 6, 15), "RULE02", Decimal('2.20'))
+        for i, account_id in enumerate(ACCOUNTS):
+            self.service.add_transaction(account_id, datetime(2023, 5, 5), "D", Decimal(100 + i))
+            self.service.add_transaction(account_id, datetime(2023, 6, 1), "D", Decimal('150.00'))
+            self.service.add_transaction(account_id, datetime(2023, 6, 26), "W", Decimal('20.50'))
+            self.service.add_transaction(account_id, datetime(2023, 6, 30), "D", Decimal('5.00'))
+        self.service.close_month("AC001", 2023, 6)
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def _expected_rows(self):
+        rows = []
+        for account_id in ACCOUNTS:
+            for line in self.service.get_account_statement(account_id, 2023, 6):
+                rows.append([account_id, line['date'].strftime('%Y%m%d'), line['txn_id'],
+                             line['type'], f"{line['amount']:.2f}", f"{line['balance']:.2f}"])
+        return rows
+
+    def test_combined_csv_matches_statements(self):
+        path = os.path.join(self.tmpdir.name, "statements.csv")
+        for workers in (1, 2):
+            report = export_statements(self.service, 2023, 6, path, workers=workers,
+                                       chunk_size=3)
+            with open(path, newline="") as exported:
+                rows = list(csv.reader(exported))
+            self.assertEqual(rows[0], ["account", "date", "txn_id", "type", "amount", "balance"])
+            self.assertEqual(rows[1:], self._expected_rows())
+            self.assertEqual(report.accounts, len(ACCOUNTS))
+            self.assertEqual(report.lines, len(rows) - 1)
+
+    def test_per_account_text_matches_console(self):
+        directory = os.path.join(self.tmpdir.name, "statements")
+        export_statements(self.service, 2023, 6, directory, export_format='text',
+                          per_account=True, workers=1)
+        self.assertEqual(sorted(os.listdir(directory)), [f"{a}.txt" for a in ACCOUNTS])
+        with patch('sys.stdout', new_callable=StringIO) as stdout:
+            BankConsoleUI(self.service)._print_monthly_statement("AC002", 2023, 6)
+        with open(os.path.join(directory, "AC002.txt")) as exported:
+            self.assertEqual(exported.read(), stdout.getvalue())
+
+    def test_per_account_rejects_ids_that_are_not_file_names(self):
+        self.service.add_transaction("../evil", datetime(2023, 6, 1), "D", Decimal('1.00'))
+        directory = os.path.join(self.tmpdir.name, "statements")
+        with self.assertRaisesRegex(ValueError, "not a valid file name"):
+            export_statements(self.service, 2023, 6, directory, per_account=True, workers=1)
+        self.assertFalse(os.path.exists(os.path.join(self.tmpdir.name, "evil.csv")))
+
+    def test_invalid_format(self):
+        with self.assertRaises(ValueError):
+            export_statements(self.service, 2023, 6, self.tmpdir.name, export_format='pdf')
+
+if __name__ == '__main__':
+    unittest.main()
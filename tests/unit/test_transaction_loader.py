@@ -0,0 +1,41 @@
+import unittest
+from decimal import Decimal
+from io import StringIO
+
+from bank.services.bank_service import BankService
+from bank.services.transaction_loader import load_transactions
+
+class TestTransactionLoader(unittest.TestCase):
+    def setUp(self):
+        self.service = BankService()
+
+    def test_load_whitespace_and_csv_lines(self):
+        source = StringIO(
+            "20230626 AC001 D 100.00\n"
+            "\n"
+            "20230601,AC001,D,50.00\n"
+            "20230626 AC002 D 10.00\n"
+        )
+        report = load_transactions(self.service, source, chunk_size=2)
+        self.assertEqual(report.loaded, 3)
+        self.assertEqual(report.errors, [])
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('150.00'))
+        ids = [t.transaction_id for t in self.service.accounts["AC001"].transactions]
+        self.assertEqual(ids, ["20230601-01", "20230626-01"])
+
+    def test_reports_bad_lines_without_aborting(self):
+        source = StringIO(
+            "20230601 AC001 D 100.00\n"
+            "2023-06-02 AC001 D 10.00\n"
+            "20230603 AC001 X 10.00\n"
+            "20230604 AC001 W 500.00\n"
+            "20230605 AC001 D -1\n"
+            "20230606 AC001 W 40.00\n"
+            "20230607 AC001 D NaN\n"
+            "20230608 AC001 D Infinity\n"
+        )
+        report = load_transactions(self.service, source)
+        self.assertEqual(report.loaded, 2)
+        self.assertEqual([line for line, _ in report.errors], [2, 3, 4, 5, 7, 8])
+        self.assertIn("Insufficient funds", dict(report.errors)[4])
+        self.assertEqual(self.service.accounts["AC001"].balance, Decimal('60.00'))